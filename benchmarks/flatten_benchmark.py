@@ -0,0 +1,65 @@
+"""Compares per-record flatten_data with the batch flattener built from a model schema.
+
+Speed-ups are given against flatten_data alone, and against flatten_data
+plus gathering its rows into the column arrays the flattener returns.
+
+Run from the repository root:
+
+    python -m benchmarks.flatten_benchmark [rows]
+"""
+
+import sys
+import time
+from pyddb import Parameter
+from pyddb.ddb_decode import loads
+from pyddb.utils.flatten_data import compile_flattener, flatten_data
+from benchmarks.payloads import parameters_response
+
+
+def per_record(records: list):
+    return [flatten_data(x) for x in records]
+
+
+def per_record_columns(records: list):
+    # What it takes to get column arrays out of flatten_data's ragged rows
+    columns = {}
+    for i, row in enumerate(per_record(records)):
+        for name, value in row.items():
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = [None] * len(records)
+            column[i] = value
+    return columns
+
+
+def seconds(flatten, records: list, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        flatten(records)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    records = loads(parameters_response(rows))["parameters"]
+    flattener = compile_flattener(Parameter)
+    projected = compile_flattener(
+        Parameter, ["id", "parameter_type_name", "revision_values_0_value"]
+    )
+    before = seconds(per_record, records)
+    gathered = seconds(per_record_columns, records)
+    after = seconds(flattener, records)
+    only = seconds(projected, records)
+    print(f"{rows} parameters, {len(flattener.columns)} columns")
+    print(f"flatten_data per record:  {rows / before:>12,.0f} rows/s")
+    print(f"flatten_data to columns:  {rows / gathered:>12,.0f} rows/s")
+    print(
+        f"flattener, all columns:   {rows / after:>12,.0f} rows/s "
+        f"({before / after:.1f}x, {gathered / after:.1f}x)"
+    )
+    print(
+        f"flattener, 3 columns:     {rows / only:>12,.0f} rows/s "
+        f"({before / only:.1f}x, {gathered / only:.1f}x)"
+    )
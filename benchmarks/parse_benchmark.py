@@ -0,0 +1,40 @@
+"""Compares validated and fast-path parsing of a get_parameters response.
+
+Run from the repository root:
+
+    python -m benchmarks.parse_benchmark [rows]
+"""
+
+import json
+import sys
+import time
+from pyddb import Parameter
+from pyddb.ddb_decode import construct_trusted, loads
+from benchmarks.payloads import parameters_response
+
+
+def validated(raw: bytes):
+    return [Parameter.parse_obj(x) for x in json.loads(raw)["parameters"]]
+
+
+def fast(raw: bytes):
+    return [construct_trusted(Parameter, x) for x in loads(raw)["parameters"]]
+
+
+def rows_per_second(parse, raw: bytes, rows: int, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(raw)
+        best = min(best, time.perf_counter() - start)
+    return rows / best
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    raw = parameters_response(rows)
+    before = rows_per_second(validated, raw, rows)
+    after = rows_per_second(fast, raw, rows)
+    print(f"{rows} parameters, {len(raw) / 1e6:.1f} MB")
+    print(f"json + parse_obj:          {before:>10,.0f} rows/s")
+    print(f"orjson + construct_trusted: {after:>10,.0f} rows/s ({after / before:.1f}x)")
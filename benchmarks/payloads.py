@@ -0,0 +1,111 @@
+"""Synthetic DDB API payloads shaped like real responses, for benchmarks."""
+
+import json
+from uuid import uuid4
+
+TIMESTAMP = "2022-07-20T10:15:00.000Z"
+
+
+def unit(i: int) -> dict:
+    return {
+        "id": str(uuid4()),
+        "name": f"unit {i}",
+        "created_at": TIMESTAMP,
+        "updated_at": TIMESTAMP,
+        "deleted_at": None,
+        "unit_type_id": str(uuid4()),
+        "unit_system_id": str(uuid4()),
+    }
+
+
+def asset(i: int, project_id: str) -> dict:
+    return {
+        "id": str(uuid4()),
+        "name": f"asset {i}",
+        "project_id": project_id,
+        "parent": None,
+        "parent_id": None,
+        "created_at": TIMESTAMP,
+        "updated_at": TIMESTAMP,
+        "deleted_at": None,
+        "asset_sub_type": None,
+        "children": [],
+        "asset_type": {
+            "id": str(uuid4()),
+            "name": "building",
+            "created_at": TIMESTAMP,
+            "updated_at": TIMESTAMP,
+            "asset_sub_type": False,
+            "deleted_at": None,
+            "asset_type_group": {"id": str(uuid4()), "name": "buildings"},
+            "parent_id": None,
+        },
+    }
+
+
+def source(i: int, project_id: str) -> dict:
+    return {
+        "id": str(uuid4()),
+        "created_at": TIMESTAMP,
+        "updated_at": TIMESTAMP,
+        "deleted_at": None,
+        "title": f"Source {i}",
+        "reference": f"Reference {i}",
+        "reference_id": project_id,
+        "reference_table": "projects",
+        "reference_url": "https://ddb.arup.com/project",
+        "source_type_id": str(uuid4()),
+    }
+
+
+def parameter(i: int, project_id: str, units_per_type: int = 8) -> dict:
+    units = [unit(u) for u in range(units_per_type)]
+    return {
+        "id": str(uuid4()),
+        "created_at": TIMESTAMP,
+        "project_id": project_id,
+        "created_by": "someone@arup.com",
+        "deleted_at": None,
+        "parameter_type": {
+            "id": str(uuid4()),
+            "name": f"parameter type {i % 500}",
+            "data_type": "number",
+            "created_at": TIMESTAMP,
+            "updated_at": TIMESTAMP,
+            "global_parameter": True,
+            "deleted_at": None,
+            "default_unit": units[0],
+            "units": units,
+            "unit_type": {
+                "id": str(uuid4()),
+                "name": "length",
+                "created_at": TIMESTAMP,
+                "updated_at": TIMESTAMP,
+            },
+        },
+        "parents": [asset(i, project_id)],
+        "revision": {
+            "id": str(uuid4()),
+            "status": "unanswered",
+            "source": source(i, project_id),
+            "comment": "Empty",
+            "location_in_source": "Empty",
+            "values": [{"id": str(uuid4()), "value": i * 1.5, "unit": units[0]}],
+            "created_at": TIMESTAMP,
+            "created_by": {
+                "staff_id": 12345,
+                "staff_name": "Some One",
+                "email": "someone@arup.com",
+                "company_centre_arup_unit": "Buildings",
+                "location_name": "London",
+                "grade_level": 5,
+                "my_people_page_url": "https://people.arup.com/someone",
+            },
+        },
+    }
+
+
+def parameters_response(rows: int) -> bytes:
+    project_id = str(uuid4())
+    body = {"parameters": [parameter(i, project_id) for i in range(rows)]}
+    return json.dumps(body).encode()
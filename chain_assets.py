@@ -1,12 +1,10 @@
 from typing import List
-import asyncio
-from pyddb import Project, Asset, NewAsset, DDB, AssetType
+from pyddb import Project, Asset, NewAsset, SyncDDB, AssetType
 
 
-async def main():
-    ddb = DDB()
-    project = await ddb.post_project(project_number="21515700")
-    asset_types = await ddb.get_asset_types()
+def main(ddb: SyncDDB):
+    project = ddb.post_project(project_number="21515700")
+    asset_types = ddb.get_asset_types()
 
     new_assets = [
         my_site := NewAsset(
@@ -31,10 +29,10 @@ async def main():
         ),
     ]
 
-    await project.post_assets(assets=new_assets)
+    project.post_assets(assets=new_assets)
 
 
 if __name__ == "__main__":
 
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(main())
+    with SyncDDB() as ddb:
+        main(ddb)
@@ -1,2 +1,3 @@
 from pyddb.models import *
 from pyddb.utils import *
+from pyddb.ddb_sync import SyncDDB
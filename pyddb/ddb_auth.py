@@ -5,10 +5,11 @@
 
 """
 
-import appdirs
+import asyncio
 import os
-import msal
 import atexit
+import time
+from typing import Optional
 
 
 class DDB_Exception(Exception):
@@ -17,6 +18,13 @@ class DDB_Exception(Exception):
 
 class DDBAuth:
     def acquire_new_access_content(self, refreshToken=None):
+        return self.acquire_token()['access_token']
+
+    def acquire_token(self):
+        """Returns the MSAL token response, including 'access_token' and 'expires_in'."""
+        # Imported here so that importing pyddb stays cheap
+        import appdirs
+        import msal
 
         tenant = '4ae48b41-0137-4599-8661-fc641fe77bea'
         clientId = '817ad43f-c825-491f-9130-8cc4da1d4924'
@@ -71,4 +79,76 @@ class DDBAuth:
           # Force the cache to write in case we're in an emulator that doesn't exit (like juypter)
         exit_func()
 
-        return result['access_token']
+        return result
+
+
+class TokenProvider:
+    """Lazily acquires and refreshes the DDB access token.
+
+    The token is acquired on the first request rather than at import time and
+    is kept in memory. Once it is within `refresh_margin` seconds of expiring,
+    callers keep receiving the current token while a refresh runs in the
+    background. Concurrent refreshes are collapsed into a single acquisition.
+
+    Args:
+        auth (DDBAuth): Source of MSAL token responses.
+        refresh_margin (float): Seconds before expiry to start refreshing.
+    """
+
+    def __init__(self, auth: Optional[DDBAuth] = None, refresh_margin: float = 300):
+        self.auth = auth or DDBAuth()
+        self.refresh_margin = refresh_margin
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._refresh: Optional[asyncio.Future] = None
+
+    async def get_token(self) -> str:
+        now = time.monotonic()
+        if self._token and now < self._expires_at - self.refresh_margin:
+            return self._token
+        refresh = self._start_refresh()
+        if self._token and now < self._expires_at:
+            return self._token
+        await refresh
+        return self._token
+
+    def invalidate(self):
+        """Forgets the current token so the next request acquires a new one."""
+        self._token = None
+        self._expires_at = 0.0
+
+    def _start_refresh(self) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if (
+            self._refresh is None
+            or self._refresh.done()
+            or self._refresh.get_loop() is not loop
+        ):
+            self._refresh = loop.create_task(self._acquire())
+            self._refresh.add_done_callback(_consume_exception)
+        return self._refresh
+
+    async def _acquire(self):
+        result = await asyncio.get_running_loop().run_in_executor(
+            None, self.auth.acquire_token
+        )
+        self._token = result['access_token']
+        self._expires_at = time.monotonic() + float(result.get('expires_in', 3600))
+
+
+def _consume_exception(task: asyncio.Future):
+    # Background refreshes may fail with nobody awaiting them; the next
+    # request that needs the token will retry and surface the error.
+    if not task.cancelled():
+        task.exception()
+
+
+_default_token_provider: Optional[TokenProvider] = None
+
+
+def default_token_provider() -> TokenProvider:
+    """Process-wide token provider shared by every DDB client."""
+    global _default_token_provider
+    if _default_token_provider is None:
+        _default_token_provider = TokenProvider()
+    return _default_token_provider
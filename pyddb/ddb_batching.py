@@ -0,0 +1,212 @@
+"""
+   Batching Service
+
+    Splits bulk posts into batches sized by item count and payload bytes,
+    growing the batch size while the server keeps up and shrinking it when
+    it does not.
+
+"""
+
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, List, Optional, Tuple
+import aiohttp
+from .ddb_scheduler import backoff_delay, parse_retry_after
+
+# Statuses that mean the batch was too big or too slow for the server
+SHRINK_STATUSES = {413, 500, 502, 503, 504}
+
+
+def payload_size(item: Any) -> int:
+    """Bytes `item` adds to a JSON array body, including its separator."""
+    return len(json.dumps(item, separators=(",", ":")).encode("utf-8")) + 1
+
+
+class AdaptiveBatcher:
+    """Sizes batches of a bulk post from how the server responds.
+
+    A batch is cut when it reaches `batch_size` items or `max_bytes` of
+    serialized payload, whichever comes first. After each batch that
+    succeeds within `target_latency`, the batch size grows by `growth`; a
+    slow batch shrinks it slightly. A 413, 5xx or timeout halves it, and the
+    batch's items are re-queued and sent again in smaller batches; a 413
+    also lowers `max_bytes` below the rejected payload. A 429 waits for
+    Retry-After without changing the size.
+
+    The size it settles on is kept between runs, so one batcher can be
+    reused across calls to the same endpoint.
+
+    Args:
+        batch_size (int): Items in the first batch.
+        min_size (int): Smallest batch size.
+        max_size (int): Largest batch size.
+        max_bytes (int): Largest serialized payload per batch.
+        target_latency (float): Seconds a healthy batch is expected to take.
+        growth (float): Factor the batch size grows by after a healthy batch.
+        concurrency (int): Batches in flight at once.
+        max_retries (int): Times an item is re-sent before the failure is
+            returned.
+        base_delay (float): Backoff delay in seconds after the first failure.
+        max_delay (float): Upper bound in seconds on any single wait.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 40,
+        min_size: int = 1,
+        max_size: int = 2000,
+        max_bytes: int = 1024 * 1024,
+        target_latency: float = 5,
+        growth: float = 1.5,
+        concurrency: int = 4,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30,
+    ):
+        self.batch_size = batch_size
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.target_latency = target_latency
+        self.growth = growth
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.batches = 0
+        self.items = 0
+        self.bytes = 0
+        self.failures = 0
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Items posted per second, over every run so far."""
+        return self.items / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return str(
+            f"Batch size: {self.batch_size}, Batches: {self.batches}, "
+            f"Items: {self.items}, Failures: {self.failures}, "
+            f"Throughput: {self.throughput:.1f} items/s"
+        )
+
+    def _grow(self, latency: float):
+        if latency <= self.target_latency:
+            size = max(int(self.batch_size * self.growth), self.batch_size + 1)
+        else:
+            size = int(self.batch_size * 0.75)
+        self.batch_size = max(self.min_size, min(self.max_size, size))
+
+    def _shrink(self, failed_size: int):
+        size = min(self.batch_size, failed_size) // 2
+        self.batch_size = max(self.min_size, min(self.max_size, size))
+
+    def _limit_bytes(self, failed_bytes: int):
+        # The server rejected this many bytes outright, so never send as many again
+        self.max_bytes = min(self.max_bytes, failed_bytes - 1)
+
+    def _take(self, queue: Deque[Tuple[Any, int, int]]) -> List[Tuple[Any, int, int]]:
+        batch = [queue.popleft()]
+        size = batch[0][1]
+        while (
+            queue
+            and len(batch) < self.batch_size
+            and size + queue[0][1] <= self.max_bytes
+        ):
+            entry = queue.popleft()
+            batch.append(entry)
+            size += entry[1]
+        return batch
+
+    async def run(
+        self,
+        items: List[Any],
+        send: Callable[[List[Any]], Awaitable[aiohttp.ClientResponse]],
+    ) -> List[aiohttp.ClientResponse]:
+        """Sends `items` in adaptive batches and returns the final responses.
+
+        `send` posts one batch and should not retry on its own. Responses
+        are returned in completion order; a batch that still fails after
+        `max_retries` returns its last response, or raises its last error.
+        A failed batch is only re-queued once its backoff is over, and the
+        first error raised cancels the batches still in flight.
+        """
+        queue: Deque[Tuple[Any, int, int]] = deque(
+            (item, payload_size(item), 0) for item in items
+        )
+        responses: List[aiohttp.ClientResponse] = []
+        started = time.monotonic()
+        # Batches waiting out their backoff, and a signal that one is back
+        retrying = 0
+        requeued = asyncio.Event()
+
+        async def worker():
+            nonlocal retrying
+            while queue or retrying:
+                if not queue:
+                    requeued.clear()
+                    await requeued.wait()
+                    continue
+                batch = self._take(queue)
+                batch_items = [item for item, _, _ in batch]
+                attempts = max(attempt for _, _, attempt in batch)
+                sent_at = time.monotonic()
+                error: Optional[Exception] = None
+                response: Optional[aiohttp.ClientResponse] = None
+                try:
+                    response = await send(batch_items)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    error = e
+                latency = time.monotonic() - sent_at
+
+                if response is not None and not (
+                    response.status == 429 or response.status in SHRINK_STATUSES
+                ):
+                    self.batches += 1
+                    self.items += len(batch)
+                    self.bytes += sum(size for _, size, _ in batch)
+                    self._grow(latency)
+                    responses.append(response)
+                    continue
+
+                self.failures += 1
+                if attempts >= self.max_retries:
+                    if error is not None:
+                        raise error
+                    responses.append(response)
+                    continue
+                if response is not None and response.status == 429:
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    delay = (
+                        backoff_delay(attempts, self.base_delay, self.max_delay)
+                        if retry_after is None
+                        else min(retry_after, self.max_delay)
+                    )
+                else:
+                    self._shrink(len(batch))
+                    if response is not None and response.status == 413:
+                        self._limit_bytes(sum(size for _, size, _ in batch))
+                    delay = backoff_delay(attempts, self.base_delay, self.max_delay)
+                retrying += 1
+                try:
+                    await asyncio.sleep(delay)
+                finally:
+                    retrying -= 1
+                queue.extendleft(
+                    (item, size, attempt + 1) for item, size, attempt in reversed(batch)
+                )
+                requeued.set()
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # On the first error, stop the other workers sending
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.elapsed += time.monotonic() - started
+        return responses
@@ -0,0 +1,266 @@
+"""
+   Cache Service
+
+    Keeps responses of the slow-changing reference data endpoints (units,
+    types, tags) so they are not fetched again on every call.
+
+"""
+
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Seconds a response of each reference endpoint is served without refetching
+REFERENCE_TTLS: Dict[str, float] = {
+    "units": 24 * 3600,
+    "unit_types": 24 * 3600,
+    "unit_systems": 24 * 3600,
+    "source_types": 24 * 3600,
+    "asset_types": 3600,
+    "asset_type_groups": 3600,
+    "item_types": 3600,
+    "parameter_types": 3600,
+    "tag_types": 3600,
+    "tags": 600,
+}
+
+# (endpoint, base url, normalised params)
+CacheKey = Tuple[str, str, Hashable]
+
+
+class CacheEntry:
+    """One cached response.
+
+    Args:
+        objects (list): The parsed response objects.
+        stored_at (float): Wall-clock time the response was fetched.
+    """
+
+    __slots__ = ("objects", "stored_at")
+
+    def __init__(self, objects: list, stored_at: Optional[float] = None):
+        self.objects = objects
+        self.stored_at = time.time() if stored_at is None else stored_at
+
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+
+class CacheStore(ABC):
+    """Storage tier of a ResponseCache.
+
+    Subclass it to keep responses elsewhere, e.g. in a shared service.
+    """
+
+    @abstractmethod
+    def get(self, key: CacheKey, parse: Callable[[dict], Any]) -> Optional[CacheEntry]:
+        """Stored entry for `key`, with records rebuilt by `parse` if need be."""
+
+    @abstractmethod
+    def set(self, key: CacheKey, entry: CacheEntry):
+        """Stores `entry` under `key`."""
+
+    @abstractmethod
+    def invalidate(self, endpoint: Optional[str] = None):
+        """Drops every entry of `endpoint`, or every entry."""
+
+
+class MemoryStore(CacheStore):
+    """In-memory tier, dropping the least recently used entry when full.
+
+    Args:
+        max_entries (int): Most responses kept at once.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key, parse):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint=None):
+        if endpoint is None:
+            self._entries.clear()
+            return
+        for key in [key for key in self._entries if key[0] == endpoint]:
+            del self._entries[key]
+
+
+class DiskStore(CacheStore):
+    """On-disk tier, one JSON file per response, that survives restarts.
+
+    Args:
+        directory (str): Folder the responses are kept in. Created if missing.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: CacheKey) -> str:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+        return os.path.join(self.directory, f"{key[0]}-{digest}.json")
+
+    def get(self, key, parse):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(
+            [parse(record) for record in stored["records"]], stored["stored_at"]
+        )
+
+    def set(self, key, entry):
+        path = self._path(key)
+        records = [json.loads(obj.json()) for obj in entry.objects]
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"stored_at": entry.stored_at, "records": records}, f)
+        os.replace(f"{path}.tmp", path)
+
+    def invalidate(self, endpoint=None):
+        prefix = f"{endpoint}-" if endpoint is not None else ""
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith(".json"):
+                os.remove(os.path.join(self.directory, name))
+
+
+class ResponseCache:
+    """Caches parsed responses of reference data endpoints.
+
+    A response younger than its endpoint's TTL is served from the cache.
+    Writes made through a client drop the cached responses of the
+    collection written to, but changes made elsewhere are only seen once
+    a response expires.
+    One that has expired by less than `stale_while_revalidate` seconds is
+    still served, while a single background request refreshes it. Anything
+    older, or not cached, is fetched before returning. Lookups try the
+    memory tier first, then the disk tier if there is one.
+
+    Callers share the cached objects, so they should not be modified.
+
+    Args:
+        ttls (Dict[str, float]): Seconds each endpoint's responses stay fresh.
+            Only these endpoints are cached. Defaults to REFERENCE_TTLS.
+        max_entries (int): Most responses kept in memory.
+        stale_while_revalidate (float): Seconds past its TTL a response is
+            still served while it is refreshed.
+        directory (str): Folder for an on-disk tier. None keeps responses in
+            memory only.
+        memory (CacheStore): Replaces the in-memory tier.
+        disk (CacheStore): Replaces the on-disk tier.
+
+    Attributes:
+        hits (int): Lookups served fresh from the cache.
+        stale_hits (int): Lookups served stale while being refreshed.
+        misses (int): Lookups that had to wait for a request.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = 1024,
+        stale_while_revalidate: float = 3600,
+        directory: Optional[str] = None,
+        memory: Optional[CacheStore] = None,
+        disk: Optional[CacheStore] = None,
+    ):
+        self.ttls = dict(REFERENCE_TTLS if ttls is None else ttls)
+        self.stale_while_revalidate = stale_while_revalidate
+        self.memory = memory or MemoryStore(max_entries)
+        self.disk = disk or (DiskStore(directory) if directory else None)
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+        self._refreshing: Dict[CacheKey, asyncio.Task] = {}
+
+    def __str__(self) -> str:
+        return str(
+            f"Hits: {self.hits}, Stale hits: {self.stale_hits}, "
+            f"Misses: {self.misses}"
+        )
+
+    def caches(self, endpoint: str) -> bool:
+        return endpoint in self.ttls
+
+    def invalidate(self, endpoint: Optional[str] = None):
+        """Drops the cached responses of `endpoint`, or of every endpoint."""
+        self.memory.invalidate(endpoint)
+        if self.disk is not None:
+            self.disk.invalidate(endpoint)
+
+    def _lookup(
+        self, key: CacheKey, parse: Callable[[dict], Any]
+    ) -> Optional[CacheEntry]:
+        entry = self.memory.get(key, parse)
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key, parse)
+            if entry is not None:
+                self.memory.set(key, entry)
+        return entry
+
+    def _store(self, key: CacheKey, objects: list):
+        entry = CacheEntry(objects)
+        self.memory.set(key, entry)
+        if self.disk is not None:
+            self.disk.set(key, entry)
+
+    async def _refresh(self, key: CacheKey, fetch: Callable[[], Awaitable[list]]):
+        try:
+            self._store(key, await fetch())
+        except Exception:
+            # The stale response is served until a refresh succeeds
+            self.refresh_errors += 1
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def get(
+        self,
+        key: CacheKey,
+        fetch: Callable[[], Awaitable[list]],
+        parse: Callable[[dict], Any],
+    ) -> List[Any]:
+        """Cached objects for `key`, calling `fetch` when they are missing or stale.
+
+        Args:
+            key (CacheKey): The endpoint, base url and normalised params.
+            fetch (Callable): Requests and parses the response.
+            parse (Callable): Builds an object from a record of the disk tier.
+        """
+        ttl = self.ttls[key[0]]
+        entry = self._lookup(key, parse)
+        if entry is not None:
+            age = entry.age()
+            if age < ttl:
+                self.hits += 1
+                return entry.objects
+            if age < ttl + self.stale_while_revalidate:
+                self.stale_hits += 1
+                if key not in self._refreshing:
+                    self._refreshing[key] = asyncio.ensure_future(
+                        self._refresh(key, fetch)
+                    )
+                return entry.objects
+        self.misses += 1
+        objects = await fetch()
+        self._store(key, objects)
+        return objects
@@ -0,0 +1,65 @@
+"""
+   Coalescing Service
+
+    Shares one request, and one parse of its response, between callers that
+    ask for the same thing while it is still in flight.
+
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+def normalise_params(params: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+    """Hashable form of query parameters, independent of their order.
+
+    List filters match any of their values, so their order and duplicates
+    do not change the result either.
+    """
+    normalised = []
+    for key, value in params.items():
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted({str(v) for v in value}))
+        elif value is not None:
+            value = str(value)
+        normalised.append((key, value))
+    return tuple(sorted(normalised))
+
+
+class SingleFlight:
+    """Runs one call per key at a time, sharing its result with every caller.
+
+    A caller that arrives while a call with the same key is in flight awaits
+    that call instead of starting another. Once the call completes, the next
+    caller starts a new one, so results are never reused after the fact.
+    A caller that is cancelled does not cancel the call for the others.
+
+    Attributes:
+        calls (int): Calls made through `run`.
+        coalesced (int): Calls that shared a call already in flight.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def __str__(self) -> str:
+        return str(f"Calls: {self.calls}, Coalesced: {self.coalesced}")
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        future = self._in_flight.get(key)
+        # A call left over from another event loop cannot be awaited here
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            future = asyncio.ensure_future(call())
+            self._in_flight[key] = future
+
+            def forget(done: asyncio.Future):
+                if self._in_flight.get(key) is done:
+                    del self._in_flight[key]
+
+            future.add_done_callback(forget)
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
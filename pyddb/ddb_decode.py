@@ -0,0 +1,86 @@
+"""
+   Decode Service
+
+    Fast-path JSON decoding and trusted (non-validating) model construction
+    for responses returned by the DDB API.
+
+"""
+
+import json
+from typing import Any, Dict, Optional, Type
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None
+
+
+def loads(raw: bytes) -> Any:
+    """Decodes a JSON response body, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+_plans: Dict[Type[BaseModel], tuple] = {}
+
+
+def _model_type(field) -> Optional[type]:
+    candidates = [field.type_] + [f.type_ for f in field.sub_fields or []]
+    for candidate in candidates:
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+    return None
+
+
+def _plan(cls: Type[BaseModel]) -> tuple:
+    """Fields, nested model fields and private attributes of `cls`, computed once."""
+    plan = _plans.get(cls)
+    if plan is None:
+        nested = []
+        for name, field in cls.__fields__.items():
+            model = _model_type(field)
+            if model is not None:
+                nested.append((name, model, field.shape == SHAPE_LIST))
+        plan = _plans[cls] = (
+            tuple(cls.__fields__.items()),
+            tuple(nested),
+            bool(cls.__private_attributes__),
+        )
+    return plan
+
+
+def construct_trusted(cls: Type[BaseModel], data: Any) -> Any:
+    """Builds `cls` from server data without running validation.
+
+    Nested models (including lists of models) are constructed recursively and
+    missing optional fields take their defaults. Keys that are not fields of
+    `cls` are dropped, matching parse_obj. Only use this for data returned by
+    the API; user input must be validated.
+    """
+    if not isinstance(data, dict):
+        return data
+    fields, nested, private = _plan(cls)
+    values = {}
+    for name, field in fields:
+        if name in data:
+            values[name] = data[name]
+        elif not field.required:
+            values[name] = field.get_default()
+    fields_set = values.keys() & data.keys()
+    for name, model, is_list in nested:
+        value = values.get(name)
+        if value is None:
+            continue
+        if is_list:
+            values[name] = [construct_trusted(model, x) for x in value]
+        else:
+            values[name] = construct_trusted(model, value)
+    model = cls.__new__(cls)
+    object.__setattr__(model, "__dict__", values)
+    object.__setattr__(model, "__fields_set__", fields_set)
+    if private:
+        model._init_private_attributes()
+    return model
@@ -0,0 +1,220 @@
+"""
+   Frames Service
+
+    Builds typed pandas DataFrames straight from DDB API JSON payloads,
+    without creating a pydantic object per row.
+
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+# (column, path into the JSON object, dtype)
+# dtype is a pandas dtype, or "datetime" for ISO timestamps.
+ColumnSpec = Tuple[str, Tuple[Any, ...], str]
+
+PARAMETER_COLUMNS: List[ColumnSpec] = [
+    ("parameter_id", ("id",), "string"),
+    ("project_id", ("project_id",), "category"),
+    ("parameter_type_id", ("parameter_type", "id"), "category"),
+    ("parameter_type_name", ("parameter_type", "name"), "category"),
+    ("data_type", ("parameter_type", "data_type"), "category"),
+    ("asset_id", ("parents", 0, "id"), "string"),
+    ("asset_name", ("parents", 0, "name"), "string"),
+    ("asset_type_name", ("parents", 0, "asset_type", "name"), "category"),
+    ("revision_id", ("revision", "id"), "string"),
+    ("status", ("revision", "status"), "category"),
+    ("value", ("revision", "values", 0, "value"), "object"),
+    ("unit_id", ("revision", "values", 0, "unit", "id"), "category"),
+    ("unit_name", ("revision", "values", 0, "unit", "name"), "category"),
+    ("source_id", ("revision", "source", "id"), "category"),
+    ("source_title", ("revision", "source", "title"), "category"),
+    ("source_reference", ("revision", "source", "reference"), "category"),
+    ("revision_created_at", ("revision", "created_at"), "datetime"),
+    ("created_at", ("created_at",), "datetime"),
+    ("deleted_at", ("deleted_at",), "datetime"),
+]
+
+ASSET_COLUMNS: List[ColumnSpec] = [
+    ("asset_id", ("id",), "string"),
+    ("name", ("name",), "string"),
+    ("project_id", ("project_id",), "category"),
+    ("parent_id", ("parent_id",), "string"),
+    ("asset_type_id", ("asset_type", "id"), "category"),
+    ("asset_type_name", ("asset_type", "name"), "category"),
+    ("created_at", ("created_at",), "datetime"),
+    ("updated_at", ("updated_at",), "datetime"),
+    ("deleted_at", ("deleted_at",), "datetime"),
+]
+
+SOURCE_COLUMNS: List[ColumnSpec] = [
+    ("source_id", ("id",), "string"),
+    ("title", ("title",), "string"),
+    ("reference", ("reference",), "string"),
+    ("source_type_id", ("source_type_id",), "category"),
+    ("reference_id", ("reference_id",), "category"),
+    ("created_at", ("created_at",), "datetime"),
+    ("updated_at", ("updated_at",), "datetime"),
+    ("deleted_at", ("deleted_at",), "datetime"),
+]
+
+
+# Stands in for a missing or non-object value, so lookups below it give None
+_EMPTY: dict = {}
+
+
+def load_pandas():
+    """Imports pandas on first use, so that importing pyddb does not need it."""
+    import pandas
+
+    return pandas
+
+
+def _generate(paths: Tuple[Tuple[Any, ...], ...]) -> str:
+    """Source of a function reading `paths` from a list of JSON objects."""
+    # One local per nested object, keyed by its path from the record
+    objects: Dict[Tuple[Any, ...], str] = {(): "o0"}
+    steps: List[str] = []
+    leaves: Dict[str, List[Tuple[int, Any, Any]]] = {"o0": []}
+    for column, path in enumerate(paths):
+        parent, i = (), 0
+        while True:
+            key = path[i]
+            index = (
+                path[i + 1]
+                if i + 1 < len(path) and isinstance(path[i + 1], int)
+                else None
+            )
+            i += 1 if index is None else 2
+            if i >= len(path):
+                break
+            child = parent + ((key, index) if index is not None else (key,))
+            if child not in objects:
+                local = objects[child] = f"o{len(objects)}"
+                leaves[local] = []
+                steps.append(f"{local} = {objects[parent]}.get({key!r})")
+                if index is not None:
+                    steps.append(
+                        f"{local} = {local}[{index}] if type({local}) is list "
+                        f"and len({local}) > {index} else _EMPTY"
+                    )
+                # Anything but an object reads as missing from here down
+                steps.append(f"if type({local}) is not dict: {local} = _EMPTY")
+            parent = child
+        leaves[objects[parent]].append((column, key, index))
+
+    def read(local: str, key: Any, index: Any, fast: bool) -> str:
+        # A list read by index may be missing or short, so it always uses .get
+        if fast and index is None:
+            return f"{local}[{key!r}]"
+        value = f"{local}.get({key!r})"
+        return value if index is None else f"_item({value}, {index})"
+
+    body = [f"        {step}" for step in steps]
+    for local, reads in leaves.items():
+        if not reads:
+            continue
+        pad = "        "
+        if local != "o0":
+            # Columns start as None, so a missing object needs no writes
+            body.append(f"{pad}if {local} is not _EMPTY:")
+            pad += "    "
+        # Subscripts are the fast path; .get only runs once a key is missing
+        body.append(f"{pad}try:")
+        body += [
+            f"{pad}    c{column}[i] = {read(local, key, index, True)}"
+            for column, key, index in reads
+        ]
+        body.append(f"{pad}except KeyError:")
+        body += [
+            f"{pad}    c{column}[i] = {read(local, key, index, False)}"
+            for column, key, index in reads
+        ]
+
+    lines = ["def read(records):", "    n = len(records)"]
+    lines += [f"    c{i} = [None] * n" for i in range(len(paths))]
+    lines += [
+        "    for i, o0 in enumerate(records):",
+        "        if type(o0) is not dict: o0 = _EMPTY",
+    ]
+    lines += body or ["        pass"]
+    lines.append(f"    return [{', '.join(f'c{i}' for i in range(len(paths)))}]")
+    return "\n".join(lines) + "\n"
+
+
+def _item(value: Any, index: int) -> Any:
+    return value[index] if type(value) is list and len(value) > index else None
+
+
+class PathReader:
+    """Reads columns out of lists of JSON objects.
+
+    The paths are compiled once into a Python function that walks each
+    record a single time, looking up every nested object once however many
+    columns are read from it. Missing keys, short lists and anything but an
+    object along the way read as None, so every list gives the same columns.
+
+    Use `path_reader` to get one, rather than building it directly.
+
+    Args:
+        paths (Tuple[Tuple[Any, ...], ...]): Path of each column, as keys and
+            list indexes into the JSON object.
+    """
+
+    def __init__(self, paths: Tuple[Tuple[Any, ...], ...]):
+        self.paths = paths
+        self.source = _generate(paths)
+        namespace = {"_EMPTY": _EMPTY, "_item": _item}
+        exec(compile(self.source, "<path reader>", "exec"), namespace)
+        self._read = namespace["read"]
+
+    def __call__(self, records: Iterable[dict]) -> List[list]:
+        """One list of values per path, in the order of the paths."""
+        if not isinstance(records, list):
+            records = list(records)
+        return self._read(records)
+
+
+@lru_cache(maxsize=None)
+def path_reader(paths: Tuple[Tuple[Any, ...], ...]) -> PathReader:
+    """Cached PathReader for `paths`, so this is cheap to call per page."""
+    return PathReader(paths)
+
+
+class FrameBuilder:
+    """Accumulates JSON objects, page by page, into typed DataFrame columns.
+
+    Args:
+        columns (List[ColumnSpec]): Columns to extract, e.g. PARAMETER_COLUMNS.
+    """
+
+    def __init__(self, columns: List[ColumnSpec]):
+        self.columns = columns
+        self._read = path_reader(tuple(path for _, path, _ in columns))
+        self._data: Dict[str, list] = {name: [] for name, _, _ in columns}
+
+    def add_page(self, page: Iterable[dict]):
+        for (name, _, _), values in zip(self.columns, self._read(page)):
+            self._data[name].extend(values)
+
+    def to_frame(self):
+        pd = load_pandas()
+
+        series = {}
+        for name, _, dtype in self.columns:
+            values = self._data[name]
+            if dtype == "datetime":
+                series[name] = pd.to_datetime(
+                    pd.Series(values, dtype="object"), utc=True, errors="coerce"
+                )
+            else:
+                series[name] = pd.Series(values, dtype=dtype)
+        return pd.DataFrame(series)
+
+
+def build_frame(pages: Iterable[Iterable[dict]], columns: List[ColumnSpec]):
+    """Builds a DataFrame from pages of JSON objects."""
+    builder = FrameBuilder(columns)
+    for page in pages:
+        builder.add_page(page)
+    return builder.to_frame()
@@ -0,0 +1,128 @@
+"""
+   Query Service
+
+    Splits list filters across several requests so that no query string
+    grows past what the server and proxies in front of it accept.
+
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+# Bytes of query string per request, well under common 8KB URL limits
+MAX_QUERY_LENGTH = 4000
+
+# Room kept free for the page_limit, after and offset that paging adds
+PAGING_LENGTH = 100
+
+
+def param_length(key: str, value: Any) -> int:
+    """Encoded length of `key=value&` in a query string."""
+    return len(quote(key, safe="")) + len(quote(str(value), safe="")) + 2
+
+
+def chunk_filters(
+    items: Iterable[Dict[str, Any]],
+    fixed: Optional[Dict[str, Any]] = None,
+    max_length: int = MAX_QUERY_LENGTH,
+) -> List[Dict[str, List[Any]]]:
+    """Groups the filter values of `items` into URL-length-safe queries.
+
+    Each item gives the value it needs for each list filter, e.g.
+    `{"title": ..., "reference": ...}`. Items are added to a query until the
+    next one would push it past `max_length`, counting `fixed` filters and
+    values already in the query only once. An item is never split across
+    queries, so every item matches all of its values in one request.
+
+    Returns:
+        One dict of list filters per query, without the fixed filters.
+    """
+    fixed = fixed or {}
+    fixed_length = sum(param_length(key, value) for key, value in fixed.items())
+    chunks: List[Dict[str, List[Any]]] = []
+    seen: Dict[str, set] = {}
+    length = fixed_length
+    for item in items:
+        new_values = {
+            key: value for key, value in item.items() if value not in seen.get(key, ())
+        }
+        added = sum(param_length(key, value) for key, value in new_values.items())
+        if not chunks or (length + added > max_length and length > fixed_length):
+            chunks.append({})
+            seen = {}
+            length = fixed_length
+            new_values = dict(item)
+            added = sum(param_length(key, value) for key, value in item.items())
+        for key, value in new_values.items():
+            chunks[-1].setdefault(key, []).append(value)
+            seen.setdefault(key, set()).add(value)
+        length += added
+    return chunks
+
+
+def query_length(params: Dict[str, Any]) -> int:
+    """Encoded length of a query string, with list values as repeated keys."""
+    length = 0
+    for key, value in params.items():
+        if isinstance(value, (list, tuple, set)):
+            length += sum(param_length(key, v) for v in value)
+        elif value is not None:
+            length += param_length(key, value)
+    return length
+
+
+def dedupe_filters(params: Dict[str, Any]) -> Dict[str, Any]:
+    """`params` with repeated values dropped from list filters, keeping order."""
+    return {
+        key: (
+            list(dict.fromkeys(value))
+            if isinstance(value, (list, tuple, set))
+            else value
+        )
+        for key, value in params.items()
+    }
+
+
+def split_filters(
+    params: Dict[str, Any], max_length: int = MAX_QUERY_LENGTH
+) -> List[Dict[str, Any]]:
+    """Splits a query whose list filters are too long into several queries.
+
+    The longest list filter is spread over queries that each keep every
+    other filter, so together they match the same records as `params`. If
+    the other filters are too long on their own, the next longest is split
+    as well. List filters are deduplicated first.
+
+    Returns:
+        `params` alone if its query string fits in `max_length`.
+    """
+    params = dedupe_filters(params)
+    if query_length(params) <= max_length:
+        return [params]
+    splittable = [
+        key
+        for key, value in params.items()
+        if isinstance(value, list) and len(value) > 1
+    ]
+    if not splittable:
+        return [params]
+    key = max(splittable, key=lambda key: query_length({key: params[key]}))
+    rest = {k: v for k, v in params.items() if k != key}
+    queries = []
+    # Each chunk of `key` gets whatever length the other filters leave
+    for chunk in chunk_filters(
+        ({key: value} for value in params[key]),
+        max_length=max_length - query_length(rest),
+    ):
+        queries += split_filters({**rest, **chunk}, max_length)
+    return queries
+
+
+def merge_pages(pages: Iterable[List[Any]]) -> List[Any]:
+    """Results of split queries as one list, each record once, by its id."""
+    merged: Dict[Any, Any] = {}
+    for page in pages:
+        for record in page:
+            id = getattr(record, "id", None) or getattr(record, "project_id", None)
+            merged.setdefault(id if id is not None else object(), record)
+    return list(merged.values())
@@ -0,0 +1,107 @@
+"""
+   Scheduler Service
+
+    Bounds the number of in-flight requests and retries throttled or failed
+    requests with backoff.
+
+"""
+
+import asyncio
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional
+import aiohttp
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Converts a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff for the given (zero-based) attempt."""
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
+
+
+class RequestScheduler:
+    """Runs requests with a cap on how many are in flight at once.
+
+    Responses with a 429 status wait for the Retry-After header before being
+    retried. 5xx responses, connection errors and timeouts are retried with
+    jittered exponential backoff. The final response (or error) is returned
+    to the caller once retries are exhausted.
+
+    Args:
+        max_in_flight (int): Maximum number of requests in flight at once.
+        max_retries (int): Retries per request before giving up.
+        base_delay (float): Backoff delay in seconds for the first retry.
+        max_delay (float): Upper bound in seconds on any single wait.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 20,
+        max_retries: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self.throttled = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(
+        self,
+        send: Callable[[], Awaitable[aiohttp.ClientResponse]],
+        max_retries: Optional[int] = None,
+    ) -> aiohttp.ClientResponse:
+        """Calls `send` within the in-flight limit, retrying as needed."""
+        max_retries = self.max_retries if max_retries is None else max_retries
+        attempt = 0
+        while True:
+            try:
+                async with self._slots():
+                    response = await send()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= max_retries:
+                    raise
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+            else:
+                if response.status not in RETRY_STATUSES or attempt >= max_retries:
+                    return response
+                if response.status == 429:
+                    self.throttled += 1
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    delay = min(retry_after, self.max_delay)
+                else:
+                    delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
@@ -0,0 +1,162 @@
+"""
+   Session Service
+
+    A long-lived, pooled HTTP session shared by a DDB client and every
+    Project and Asset object it returns.
+
+"""
+
+import asyncio
+from typing import Dict, Optional, Union
+import aiohttp
+from .ddb_auth import TokenProvider, default_token_provider
+from .ddb_batching import AdaptiveBatcher
+from .ddb_cache import ResponseCache
+from .ddb_coalesce import SingleFlight
+from .ddb_scheduler import RequestScheduler
+
+
+class DDBSession:
+    """Owns a single aiohttp.ClientSession with a keep-alive connector pool.
+
+    The underlying session is opened lazily on first use (or explicitly with
+    `open`) and is re-created if the running event loop changes, so a client
+    built outside of a loop still works.
+
+    Args:
+        limit (int): Total number of simultaneous connections in the pool.
+        limit_per_host (int): Simultaneous connections to a single host.
+        keepalive_timeout (float): Seconds an idle connection is kept open.
+        ttl_dns_cache (int): Seconds resolved host names are cached for.
+        timeout (float): Total timeout in seconds for a single request.
+        scheduler (RequestScheduler): Limits in-flight requests and retries
+            throttled or failed ones. Defaults to a new RequestScheduler.
+        token_provider (TokenProvider): Supplies the bearer token for each
+            request. Defaults to the process-wide provider.
+        fast_decode (bool): Decode responses with orjson (when installed) and
+            build response models without pydantic validation.
+        coalesce (bool): Share identical GET requests that are in flight at
+            the same time. `single_flight` counts how many were shared.
+        cache (Union[ResponseCache, bool]): Caches reference data responses
+            such as units and types. True uses a ResponseCache in memory with
+            the default TTLs. Off by default.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 30,
+        keepalive_timeout: float = 30,
+        ttl_dns_cache: int = 300,
+        timeout: float = 300,
+        scheduler: Optional[RequestScheduler] = None,
+        token_provider: Optional[TokenProvider] = None,
+        fast_decode: bool = False,
+        coalesce: bool = True,
+        cache: Union[ResponseCache, bool] = False,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.timeout = timeout
+        self.scheduler = scheduler or RequestScheduler()
+        self._token_provider = token_provider
+        self.fast_decode = fast_decode
+        self.coalesce = coalesce
+        self.single_flight = SingleFlight()
+        if cache is True:
+            cache = ResponseCache()
+        self.cache: Optional[ResponseCache] = cache or None
+        self._client: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._batchers: Dict[str, AdaptiveBatcher] = {}
+
+    def batcher(self, endpoint: str) -> AdaptiveBatcher:
+        """Adaptive batcher for bulk posts to `endpoint`, kept for the session."""
+        if endpoint not in self._batchers:
+            self._batchers[endpoint] = AdaptiveBatcher()
+        return self._batchers[endpoint]
+
+    @property
+    def token_provider(self) -> TokenProvider:
+        if self._token_provider is None:
+            self._token_provider = default_token_provider()
+        return self._token_provider
+
+    async def headers(self) -> dict:
+        token = await self.token_provider.get_token()
+        return {"Authorization": "Bearer " + token, "version": "0"}
+
+    @property
+    def closed(self) -> bool:
+        return self._client is None or self._client.closed
+
+    async def open(self) -> aiohttp.ClientSession:
+        """Returns the pooled session, creating it for the running loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self.closed or self._loop is not loop:
+            if self._client is not None:
+                await self._discard(self._client, self._loop)
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.ttl_dns_cache,
+                use_dns_cache=True,
+                ssl=False,
+            )
+            self._client = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._loop = loop
+        return self._client
+
+    async def close(self):
+        """Closes the pooled session and all of its connections."""
+        if self._client is not None:
+            await self._discard(self._client, self._loop)
+        self._client = None
+        self._loop = None
+
+    @staticmethod
+    async def _discard(client: aiohttp.ClientSession, loop: asyncio.AbstractEventLoop):
+        """Closes a session, which may belong to another event loop."""
+        if client.closed:
+            return
+        if loop is not asyncio.get_running_loop() and loop.is_running():
+            # Still running on another thread, so close it there
+            asyncio.run_coroutine_threadsafe(client.close(), loop)
+            return
+        try:
+            await client.close()
+        except RuntimeError:
+            # Connections of an idle loop are closed, but their shutdown can
+            # only be awaited on that loop
+            pass
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        max_retries: Optional[int] = None,
+        **kwargs,
+    ) -> aiohttp.ClientResponse:
+        """Sends a request over the pooled session through the scheduler.
+
+        The response body is read before returning so the connection goes
+        straight back to the pool; `status`, `headers` and `json()` remain
+        usable on the returned response.
+        """
+        client = await self.open()
+
+        async def send():
+            headers = await self.headers()
+            async with client.request(
+                method, url, headers=headers, **kwargs
+            ) as response:
+                await response.read()
+            return response
+
+        return await self.scheduler.run(send, max_retries=max_retries)
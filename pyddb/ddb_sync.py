@@ -0,0 +1,183 @@
+"""
+   Sync Service
+
+    Blocking access to the client for synchronous hosts, such as Grasshopper
+    or Power BI scripts, from one event loop kept running on its own thread.
+
+"""
+
+import asyncio
+import inspect
+import threading
+from typing import Any, Awaitable, Iterator, Optional
+from .ddb_tree import AssetTree
+from .models import DDB
+
+
+class BackgroundLoop:
+    """An event loop running forever on a daemon thread.
+
+    Coroutines can be run on it from any other thread, which blocks until
+    they complete. The thread is started on first use.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="pyddb-loop", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    def run(self, awaitable: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Runs `awaitable` on the loop and waits for its result."""
+        if threading.current_thread() is self._thread:
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            raise RuntimeError("Blocking call made from the background event loop")
+        future = asyncio.run_coroutine_threadsafe(_awaited(awaitable), self.loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def stop(self):
+        """Stops the loop and waits for its thread to finish."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+async def _awaited(awaitable: Awaitable) -> Any:
+    return await awaitable
+
+
+def _unwrap(value: Any) -> Any:
+    if isinstance(value, SyncProxy):
+        return value.wrapped
+    if isinstance(value, (list, tuple)) and any(
+        isinstance(v, SyncProxy) for v in value
+    ):
+        return type(value)(_unwrap(v) for v in value)
+    return value
+
+
+class SyncProxy:
+    """Blocking view of a DDB, Project or Asset.
+
+    Async methods become blocking methods and async iterators become plain
+    iterators, all run on the proxy's background loop. Projects and assets
+    they return, including those in an AssetTree, are wrapped in turn.
+    Other attributes are read from the wrapped object, which is available
+    as `wrapped` for use in models such as `NewAsset(parent=asset.wrapped)`.
+    """
+
+    def __init__(
+        self, wrapped: Any, runner: BackgroundLoop, timeout: Optional[float] = None
+    ):
+        self.wrapped = wrapped
+        self._runner = runner
+        self._timeout = timeout
+
+    def __repr__(self) -> str:
+        return f"Sync{self.wrapped!r}"
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(dir(self.wrapped)))
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "wrapped":
+            # Not set yet, e.g. while being copied
+            raise AttributeError(name)
+        attribute = getattr(self.wrapped, name)
+        if not inspect.ismethod(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            args = [_unwrap(arg) for arg in args]
+            kwargs = {key: _unwrap(value) for key, value in kwargs.items()}
+            result = attribute(*args, **kwargs)
+            if inspect.isawaitable(result):
+                return self._wrap(self.run(result))
+            if hasattr(result, "__anext__"):
+                return self._iterate(result)
+            return result
+
+        call.__name__, call.__doc__ = name, attribute.__doc__
+        return call
+
+    def _wrap(self, result: Any) -> Any:
+        if isinstance(result, DDB):
+            return SyncProxy(result, self._runner, self._timeout)
+        if isinstance(result, list) and any(isinstance(x, DDB) for x in result):
+            return [self._wrap(x) for x in result]
+        if isinstance(result, AssetTree):
+            return AssetTree(self._wrap(list(result.by_id.values())))
+        return result
+
+    def _iterate(self, iterator) -> Iterator[Any]:
+        try:
+            while True:
+                try:
+                    item = self.run(iterator.__anext__())
+                except StopAsyncIteration:
+                    return
+                yield self._wrap(item)
+        finally:
+            self.run(iterator.aclose())
+
+    def run(self, awaitable: Awaitable) -> Any:
+        """Runs any awaitable on the background loop and returns its result."""
+        return self._runner.run(awaitable, self._timeout)
+
+
+class SyncDDB(SyncProxy):
+    """Blocking DDB client for synchronous code.
+
+    One event loop runs on a background thread for the life of the client,
+    so every call reuses the same pooled session and its open connections.
+    Calls may be made from several threads at once.
+
+    ```python
+    with SyncDDB(url=BaseURL.sandbox) as ddb:
+        [project] = ddb.get_projects(number="12345678")
+        parameters = project.get_parameters()
+    ```
+
+    Args:
+        ddb (DDB): Client to wrap. Built from `kwargs` if not given.
+        timeout (float): Seconds to wait for each call. None waits for ever.
+        **kwargs: Arguments for DDB, such as `url` and `session`.
+    """
+
+    def __init__(
+        self, ddb: Optional[DDB] = None, timeout: Optional[float] = None, **kwargs
+    ):
+        super().__init__(ddb or DDB(**kwargs), BackgroundLoop(), timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Closes the pooled session and stops the background loop."""
+        try:
+            self.run(self.wrapped.close())
+        finally:
+            self._runner.stop()
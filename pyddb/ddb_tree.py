@@ -0,0 +1,158 @@
+"""
+   Tree Service
+
+    Indexes the assets of a project once, so the asset hierarchy can be
+    walked and queried without a request per level.
+
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+
+def node_id(asset: Union[Any, str]) -> str:
+    """Id of an asset, or the id itself."""
+    return asset if isinstance(asset, str) else str(asset.id)
+
+
+def parent_of(asset: Any) -> Optional[str]:
+    return getattr(asset, "parent_id", None) or getattr(asset, "parent", None)
+
+
+class AssetTree:
+    """In-memory index of a project's asset hierarchy.
+
+    Built in one pass over the assets, in preorder, so every subtree is a
+    contiguous slice of `order`. Subtree, ancestor, path and per-type
+    queries are answered locally, in time proportional to what they return.
+    An asset whose parent is not among the assets is treated as a root.
+
+    Args:
+        assets (Iterable[Asset]): Every asset of the project.
+    """
+
+    def __init__(self, assets: Iterable[Any]):
+        self.by_id: Dict[str, Any] = {str(asset.id): asset for asset in assets}
+        self._children: Dict[Optional[str], List[Any]] = {}
+        for asset in self.by_id.values():
+            parent_id = parent_of(asset)
+            if parent_id not in self.by_id:
+                parent_id = None
+            self._children.setdefault(parent_id, []).append(asset)
+
+        self.order: List[Any] = []
+        self.depths: Dict[str, int] = {}
+        self._parents: Dict[str, Optional[str]] = {}
+        self._enter: Dict[str, int] = {}
+        self._exit: Dict[str, int] = {}
+        self._walk(self._children.get(None, []))
+        # Assets left over are in a parent cycle; the first of each becomes a root
+        for asset in list(self.by_id.values()):
+            if str(asset.id) not in self._enter:
+                self._walk([asset])
+
+        self._by_type: Dict[str, List[int]] = {}
+        for position, asset in enumerate(self.order):
+            asset_type = getattr(asset, "asset_type", None)
+            if asset_type is not None:
+                self._by_type.setdefault(asset_type.id, []).append(position)
+                if asset_type.name != asset_type.id:
+                    self._by_type.setdefault(asset_type.name, []).append(position)
+
+    def _walk(self, roots: List[Any]):
+        stack = [(asset, None, 0, False) for asset in reversed(roots)]
+        while stack:
+            asset, parent_id, depth, leaving = stack.pop()
+            id = str(asset.id)
+            if leaving:
+                self._exit[id] = len(self.order)
+                continue
+            if id in self._enter:
+                continue
+            self._enter[id] = len(self.order)
+            self.order.append(asset)
+            self.depths[id] = depth
+            self._parents[id] = parent_id
+            stack.append((asset, parent_id, depth, True))
+            stack.extend(
+                (child, id, depth + 1, False)
+                for child in reversed(self._children.get(id, []))
+                if str(child.id) not in self._enter
+            )
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __contains__(self, asset: Union[Any, str]) -> bool:
+        return node_id(asset) in self.by_id
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.order)
+
+    def get(self, id: str) -> Optional[Any]:
+        return self.by_id.get(id)
+
+    @property
+    def roots(self) -> List[Any]:
+        return [asset for asset in self.order if self._parents[str(asset.id)] is None]
+
+    def children(self, asset: Union[Any, str]) -> List[Any]:
+        id = node_id(asset)
+        return [
+            child
+            for child in self._children.get(id, [])
+            if self._parents[str(child.id)] == id
+        ]
+
+    def parent(self, asset: Union[Any, str]) -> Optional[Any]:
+        parent_id = self._parents[node_id(asset)]
+        return self.by_id[parent_id] if parent_id is not None else None
+
+    def depth(self, asset: Union[Any, str]) -> int:
+        """Number of ancestors of an asset; roots are at depth 0."""
+        return self.depths[node_id(asset)]
+
+    def ancestors(self, asset: Union[Any, str]) -> List[Any]:
+        """Ancestors of an asset, from its parent up to its root."""
+        ancestors = []
+        parent_id = self._parents[node_id(asset)]
+        while parent_id is not None:
+            ancestors.append(self.by_id[parent_id])
+            parent_id = self._parents[parent_id]
+        return ancestors
+
+    def path(self, asset: Union[Any, str]) -> List[Any]:
+        """Assets from the root down to and including `asset`."""
+        return self.ancestors(asset)[::-1] + [self.by_id[node_id(asset)]]
+
+    def subtree(self, asset: Union[Any, str], include_self: bool = True) -> List[Any]:
+        """An asset and all its descendants, in preorder."""
+        id = node_id(asset)
+        start = self._enter[id] + (0 if include_self else 1)
+        return self.order[start : self._exit[id]]
+
+    def is_ancestor(self, ancestor: Union[Any, str], asset: Union[Any, str]) -> bool:
+        """Whether `asset` is in the subtree below `ancestor`."""
+        ancestor_id, id = node_id(ancestor), node_id(asset)
+        return (
+            ancestor_id != id
+            and self._enter[ancestor_id] <= self._enter[id] < self._exit[ancestor_id]
+        )
+
+    def of_type(
+        self, asset_type: Union[Any, str], within: Union[Any, str, None] = None
+    ) -> List[Any]:
+        """Assets of a type, by asset type, id or name, in preorder.
+
+        Args:
+            asset_type (Union[AssetType, str]): Asset type, or its id or name.
+            within (Union[Asset, str]): Only assets in this asset's subtree.
+        """
+        key = asset_type if isinstance(asset_type, str) else asset_type.id
+        positions = self._by_type.get(key, [])
+        if within is None:
+            return [self.order[position] for position in positions]
+        id = node_id(within)
+        start = bisect_left(positions, self._enter[id])
+        end = bisect_left(positions, self._exit[id])
+        return [self.order[position] for position in positions[start:end]]
@@ -1,11 +1,44 @@
 import asyncio
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, List, Optional, Type, Union
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 from uuid import UUID, uuid4
-import aiohttp
-import pandas as pd
-from .ddb_auth import DDBAuth
-from pydantic import BaseModel, Field
+from .ddb_coalesce import normalise_params
+from .ddb_decode import construct_trusted, loads
+from .ddb_frames import (
+    ASSET_COLUMNS,
+    PARAMETER_COLUMNS,
+    SOURCE_COLUMNS,
+    ColumnSpec,
+    FrameBuilder,
+)
+from .ddb_query import (
+    MAX_QUERY_LENGTH,
+    PAGING_LENGTH,
+    chunk_filters,
+    merge_pages,
+    split_filters,
+)
+from .ddb_session import DDBSession
+from .ddb_tree import AssetTree
+from pydantic import BaseModel, Field, PrivateAttr
+
+
+async def collect(iterator: AsyncIterator) -> list:
+    """Collects all items of an async iterator into a list."""
+    return [item async for item in iterator]
 
 
 def split_list(list_a, chunk_size):
@@ -28,53 +61,310 @@ def generate_payload(**kwargs):
     return dict(kwargs.items())
 
 
+class PagingError(Exception):
+    """Raised when a list endpoint cannot be paged through to its end."""
+
+
+def next_page_cursor(result: dict) -> Optional[str]:
+    """Returns the cursor for the page after this response, if there is one.
+
+    List responses are expected to carry `{"paging": {"cursors": {"after": ...}}}`.
+    """
+    paging = result.get("paging") or {}
+    return (paging.get("cursors") or {}).get("after")
+
+
+def has_cursor_paging(result: dict) -> bool:
+    """Whether a response says where its pages end, with or without a next cursor."""
+    return "cursors" in (result.get("paging") or {})
+
+
 class DDB(BaseModel):
     url: Optional[str]
-    headers = {
-        "Authorization": "Bearer " + DDBAuth().acquire_new_access_content(),
-        "version": "0",
-    }
+    _session: Optional[DDBSession] = PrivateAttr(default=None)
 
-    async def get_request(self, endpoint: str, response_key: str, cls: Type, **kwargs):
+    def __init__(self, session: Optional[DDBSession] = None, **data):
+        super().__init__(**data)
+        self._session = session
+
+    @property
+    def session(self) -> DDBSession:
+        """Pooled HTTP session, shared with every Project and Asset returned."""
+        if self._session is None:
+            self._session = DDBSession()
+        return self._session
+
+    def _bind(self, obj: "DDB") -> "DDB":
+        """Points a returned Project or Asset at this client's url and session."""
+        setattr(obj, "url", self.url)
+        obj._session = self.session
+        return obj
+
+    async def __aenter__(self):
+        await self.session.open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Closes the pooled HTTP session."""
+        await self.session.close()
+
+    async def get_json(self, endpoint: str, **kwargs) -> dict:
         payload = generate_payload(**kwargs)
-        async with aiohttp.ClientSession() as session:
-            response = await session.get(
-                f"{self.url}{endpoint}",
-                params=payload,
-                headers=self.headers,
-                ssl=False,
+        response = await self.session.request(
+            "GET",
+            f"{self.url}{endpoint}",
+            params=payload,
+        )
+        if self.session.fast_decode:
+            return loads(await response.read())
+        return await response.json()
+
+    def parse_response(self, cls: Type, data: dict):
+        """Builds a response model, skipping validation in fast decode mode."""
+        if self.session.fast_decode:
+            return construct_trusted(cls, data)
+        return cls.parse_obj(data)
+
+    async def get_request(self, endpoint: str, response_key: str, cls: Type, **kwargs):
+        """Fetches and parses one list endpoint.
+
+        List filters are deduplicated, and split over URL-length-safe
+        requests that run concurrently if they are too long for one; their
+        results are merged without duplicates. Reference data endpoints are
+        served from the session's cache while fresh. Identical requests in
+        flight at the same time, from any client sharing the session, share
+        one request and one parse. Each caller gets its own list of the
+        shared objects.
+        """
+        queries = split_filters(kwargs)
+        if len(queries) > 1:
+            pages = await asyncio.gather(
+                *[
+                    self.get_request(endpoint, response_key, cls, **query)
+                    for query in queries
+                ]
             )
-            result = await response.json()
+            return merge_pages(pages)
+        kwargs = queries[0]
+        cache = self.session.cache
+        if cache is None or not cache.caches(endpoint):
+            return list(
+                await self._coalesced_request(endpoint, response_key, cls, **kwargs)
+            )
+        return list(
+            await cache.get(
+                (endpoint, self.url, normalise_params(kwargs)),
+                lambda: self._coalesced_request(endpoint, response_key, cls, **kwargs),
+                lambda record: self.parse_response(cls, record),
+            )
+        )
+
+    async def _coalesced_request(
+        self, endpoint: str, response_key: str, cls: Type, **kwargs
+    ) -> list:
+        if not self.session.coalesce:
+            return await self._get_request(endpoint, response_key, cls, **kwargs)
+        key = (
+            f"{self.url}{endpoint}",
+            normalise_params(kwargs),
+            response_key,
+            cls,
+            self.session.fast_decode,
+        )
+        return await self.session.single_flight.run(
+            key, lambda: self._get_request(endpoint, response_key, cls, **kwargs)
+        )
+
+    async def _get_request(
+        self, endpoint: str, response_key: str, cls: Type, **kwargs
+    ) -> list:
+        result = await self.get_json(endpoint, **kwargs)
         try:
-            return [cls.parse_obj(x) for x in result[response_key]]
+            return [self.parse_response(cls, x) for x in result[response_key]]
         except KeyError:
             return []
 
-    async def post_request(self, endpoint: str, body: dict):
-        async with aiohttp.ClientSession() as session:
-            return await session.post(
-                f"{self.url}{endpoint}",
-                json=body,
-                headers=self.headers,
-                ssl=False,
-            )
+    async def iter_request(
+        self,
+        endpoint: str,
+        response_key: str,
+        cls: Type,
+        page_limit: int = 1000,
+        prefetch: int = 2,
+        **kwargs,
+    ) -> AsyncIterator:
+        """Iterates over every object of a list endpoint, one page at a time.
+
+        Pages are fetched by a background task that follows the paging cursor
+        and stays up to `prefetch` pages ahead of the consumer. Each page is
+        parsed only when the consumer reaches it.
+
+        Args:
+            endpoint (str): Endpoint to page through.
+            response_key (str): Key of the object list in each response.
+            cls (Type): Model each object is parsed into.
+            page_limit (int): Number of objects requested per page.
+            prefetch (int): Number of pages fetched ahead of the consumer.
+            **kwargs: Filters passed through to the endpoint.
+
+        Yields:
+            Parsed objects in the order the API returns them.
+        """
+        async for page in self.iter_pages(
+            endpoint, response_key, page_limit=page_limit, prefetch=prefetch, **kwargs
+        ):
+            for x in page:
+                yield self.parse_response(cls, x)
+
+    async def iter_pages(
+        self,
+        endpoint: str,
+        response_key: str,
+        page_limit: int = 1000,
+        prefetch: int = 2,
+        **kwargs,
+    ) -> AsyncIterator[List[dict]]:
+        """Iterates over the raw JSON object lists of each page of a list endpoint.
+
+        Pages are followed by their `after` cursor until a short or empty
+        page, or a response whose paging has no next cursor. A full page
+        with no paging information at all is followed by offset instead,
+        and a longer one is taken as the complete result.
+
+        List filters too long for one URL are split over several queries,
+        paged through one after another. Objects an earlier query already
+        returned are dropped from later pages, and pages left empty are
+        skipped.
+
+        See `iter_request` for the arguments.
+
+        Raises:
+            PagingError: If a full page has no cursor and the endpoint
+                ignores the offset, as the results would be incomplete.
+        """
+        pages = asyncio.Queue(maxsize=max(prefetch, 1))
+        queries = split_filters(kwargs, MAX_QUERY_LENGTH - PAGING_LENGTH)
+        seen = set() if len(queries) > 1 else None
+
+        def unseen(page: List[dict]) -> List[dict]:
+            fresh = []
+            for record in page:
+                id = record.get("id") if isinstance(record, dict) else None
+                if id is None or id not in seen:
+                    seen.add(id)
+                    fresh.append(record)
+            return fresh
+
+        async def fetch_query(kwargs: dict):
+            after = kwargs.pop("after", None)
+            offset = None
+            first_id = None
+            while True:
+                if after:
+                    kwargs["after"] = after
+                if offset is not None:
+                    kwargs["offset"] = offset
+                result = await self.get_json(endpoint, page_limit=page_limit, **kwargs)
+                page = result.get(response_key) or []
+                if first_id is not None and page and page[0].get("id") == first_id:
+                    raise PagingError(
+                        f"{endpoint} returned a full page of {page_limit} "
+                        "without a cursor and ignored the offset, so it "
+                        "cannot be read past its first page"
+                    )
+                if seen is None:
+                    await pages.put(page)
+                elif page:
+                    fresh = unseen(page)
+                    if fresh:
+                        await pages.put(fresh)
+                if not page or len(page) < page_limit:
+                    break
+                after = next_page_cursor(result)
+                # More than a page without a cursor: the endpoint ignores
+                # page_limit and has returned everything
+                if not after and (has_cursor_paging(result) or len(page) > page_limit):
+                    break
+                if not after:
+                    # A full page with no paging information at all: fall
+                    # back to offsets rather than stop short
+                    kwargs.pop("after", None)
+                    offset = (offset or 0) + len(page)
+                    first_id = page[0].get("id")
+
+        async def fetch_pages():
+            try:
+                for query in queries:
+                    await fetch_query(query)
+            except Exception as error:
+                await pages.put(error)
+                return
+            await pages.put(None)
+
+        producer = asyncio.ensure_future(fetch_pages())
+        try:
+            while True:
+                page = await pages.get()
+                if page is None:
+                    break
+                if isinstance(page, Exception):
+                    raise page
+                yield page
+        finally:
+            producer.cancel()
+
+    async def get_frame(
+        self, endpoint: str, response_key: str, columns: List[ColumnSpec], **kwargs
+    ):
+        """Pages through a list endpoint straight into a typed pandas DataFrame.
+
+        No model object is created per row; each page of JSON is copied into
+        column lists as it arrives. Accepts `page_limit` and `prefetch` as
+        well as the endpoint's filters.
+        """
+        builder = FrameBuilder(columns)
+        async for page in self.iter_pages(endpoint, response_key, **kwargs):
+            builder.add_page(page)
+        return builder.to_frame()
+
+    async def post_request(
+        self, endpoint: str, body: dict, max_retries: Optional[int] = None
+    ):
+        response = await self.session.request(
+            "POST",
+            f"{self.url}{endpoint}",
+            max_retries=max_retries,
+            json=body,
+        )
+        self._invalidate_cache(endpoint)
+        return response
 
     async def delete_request(self, endpoint: str):
-        async with aiohttp.ClientSession() as session:
-            return await session.delete(
-                f"{self.url}{endpoint}",
-                headers=self.headers,
-                ssl=False,
-            )
+        response = await self.session.request(
+            "DELETE",
+            f"{self.url}{endpoint}",
+        )
+        self._invalidate_cache(endpoint)
+        return response
 
     async def patch_request(self, endpoint: str, body: dict):
-        async with aiohttp.ClientSession() as session:
-            return await session.delete(
-                f"{self.url}{endpoint}",
-                json=body,
-                headers=self.headers,
-                ssl=False,
-            )
+        response = await self.session.request(
+            "PATCH",
+            f"{self.url}{endpoint}",
+            json=body,
+        )
+        self._invalidate_cache(endpoint)
+        return response
+
+    def _invalidate_cache(self, endpoint: str):
+        """Drops cached responses of the collection an endpoint writes to."""
+        cache = self.session.cache
+        collection = endpoint.split("/", 1)[0]
+        if cache is not None and cache.caches(collection):
+            cache.invalidate(collection)
 
     async def get_sources(self, **kwargs):
 
@@ -97,6 +387,24 @@ class DDB(BaseModel):
             endpoint="sources", response_key="sources", cls=Source, **kwargs
         )
 
+    def iter_sources(self, **kwargs):
+        """Iterates over source objects page by page.
+
+        Accepts the same filters as `get_sources`, plus `page_limit` and `prefetch`.
+        """
+        return self.iter_request(
+            endpoint="sources", response_key="sources", cls=Source, **kwargs
+        )
+
+    async def get_sources_frame(self, **kwargs):
+        """Returns sources as a pandas DataFrame with one typed column per field.
+
+        Accepts the same filters as `get_sources`, plus `page_limit` and `prefetch`.
+        """
+        return await self.get_frame(
+            endpoint="sources", response_key="sources", columns=SOURCE_COLUMNS, **kwargs
+        )
+
     async def get_parameters(self, **kwargs):
         """Retreives list of all parameter objects.
 
@@ -126,6 +434,34 @@ class DDB(BaseModel):
             **kwargs,
         )
 
+    def iter_parameters(self, **kwargs):
+        """Iterates over parameter objects page by page.
+
+        Accepts the same filters as `get_parameters`, plus `page_limit` and `prefetch`.
+        """
+        return self.iter_request(
+            endpoint="parameters",
+            response_key="parameters",
+            cls=Parameter,
+            **kwargs,
+        )
+
+    async def get_parameters_frame(self, **kwargs):
+        """Returns parameters as a pandas DataFrame with one typed column per field.
+
+        Columns cover the parameter, its type, first parent asset and current
+        revision (value, unit, source, status). Timestamps are parsed as UTC
+        datetimes and repeated labels are stored as categoricals.
+
+        Accepts the same filters as `get_parameters`, plus `page_limit` and `prefetch`.
+        """
+        return await self.get_frame(
+            endpoint="parameters",
+            response_key="parameters",
+            columns=PARAMETER_COLUMNS,
+            **kwargs,
+        )
+
     async def get_assets(self, **kwargs):
         """Gets list of all asset instance objects.
 
@@ -144,58 +480,108 @@ class DDB(BaseModel):
             endpoint="assets", response_key="assets", cls=Asset, **kwargs
         )
         for asset in assets:
-            setattr(asset, "url", self.url)
+            self._bind(asset)
         return assets
 
-    async def post_sources(self, sources: List["NewSource"], reference_id: str):
-        source_bodies = []
-        existing_sources_to_return = []
-        results = None
-        existing_sources = await self.get_sources(
-            reference_id=reference_id,
-            source_type_id=list({source.source_type.id for source in sources}),
-            title=list({source.title for source in sources}),
-            reference=list({source.reference for source in sources}),
+    async def iter_assets(self, **kwargs):
+        """Iterates over asset objects page by page.
+
+        Accepts the same filters as `get_assets`, plus `page_limit` and `prefetch`.
+        """
+        async for asset in self.iter_request(
+            endpoint="assets", response_key="assets", cls=Asset, **kwargs
+        ):
+            yield self._bind(asset)
+
+    async def get_assets_frame(self, **kwargs):
+        """Returns assets as a pandas DataFrame with one typed column per field.
+
+        Accepts the same filters as `get_assets`, plus `page_limit` and `prefetch`.
+        """
+        return await self.get_frame(
+            endpoint="assets", response_key="assets", columns=ASSET_COLUMNS, **kwargs
         )
 
-        for source in sources:
+    async def post_sources(
+        self,
+        sources: List["NewSource"],
+        reference_id: str,
+        existing_sources: Optional[List["Source"]] = None,
+    ):
+        """Posts new sources, reusing any that already exist on the project.
+
+        Unless `existing_sources` are given, existing sources are looked up
+        in URL-length-safe chunks, fetched concurrently. They are matched on
+        (title, reference, source type id), and duplicate new sources are
+        posted once.
 
-            if source in existing_sources:
-                existing_sources_to_return.append(
-                    next(s for s in existing_sources if s == source)
-                )
-            else:
-                body = {
+        Returns:
+            One source per input source, in the same order.
+        """
+        unique_sources = dedupe(sources)
+        if existing_sources is None:
+            existing_sources = await self._find_sources(unique_sources, reference_id)
+
+        plan = SourcePlan.build(unique_sources, existing_sources)
+        sources_by_key = await self.execute_source_plan(plan, reference_id)
+        return [sources_by_key[source_key(source)] for source in sources]
+
+    async def _find_sources(
+        self, sources: Iterable["NewSource"], reference_id: str
+    ) -> List["Source"]:
+        """Looks up existing sources in URL-length-safe chunks, concurrently."""
+        queries = chunk_filters(
+            (
+                {
                     "source_type_id": source.source_type.id,
                     "title": source.title,
                     "reference": source.reference,
-                    "reference_id": reference_id,
-                    "reference_table": "projects",
-                    "reference_url": "https://ddb.arup.com/project",
                 }
-                source_bodies.append(body)
-
-        if source_bodies != []:
-            async with aiohttp.ClientSession() as session:
-                responses = await asyncio.gather(
-                    *[
-                        session.post(
-                            f"{self.url}sources",
-                            json=source_body,
-                            headers=self.headers,
-                            ssl=False,
-                        )
-                        for source_body in source_bodies
-                    ]
-                )
-                results = await asyncio.gather(
-                    *[response.json() for response in responses]
-                )
-        if results:
-            existing_sources_to_return += [
-                Source(**result["source"]) for result in results
+                for source in sources
+            ),
+            fixed={"reference_id": reference_id},
+        )
+
+        pages = await asyncio.gather(
+            *[
+                collect(self.iter_sources(reference_id=reference_id, **query))
+                for query in queries
             ]
-        return existing_sources_to_return
+        )
+        return [source for page in pages for source in page]
+
+    async def execute_source_plan(
+        self, plan: "SourcePlan", reference_id: str
+    ) -> Dict[tuple, "Source"]:
+        """Posts the sources a plan creates.
+
+        Returns:
+            Every source in the plan, existing or created, by `source_key`.
+        """
+        sources_by_key = {source_key(source): source for source in plan.existing}
+        if plan.create:
+            responses = await asyncio.gather(
+                *[
+                    self.post_request(
+                        endpoint="sources",
+                        body={
+                            "source_type_id": source.source_type.id,
+                            "title": source.title,
+                            "reference": source.reference,
+                            "reference_id": reference_id,
+                            "reference_table": "projects",
+                            "reference_url": "https://ddb.arup.com/project",
+                        },
+                    )
+                    for source in plan.create
+                ]
+            )
+            results = await asyncio.gather(*[response.json() for response in responses])
+            for source, result in zip(plan.create, results):
+                sources_by_key[source_key(source)] = self.parse_response(
+                    Source, result["source"]
+                )
+        return sources_by_key
 
     # async def post_sources(self, sources: List["NewSource"], reference_id: str):
 
@@ -224,211 +610,159 @@ class DDB(BaseModel):
                 asset_body["parent_id"] = str(asset.parent.id)
             body["assets"].append(asset_body)
 
-        async with aiohttp.ClientSession() as session:
-            response = await session.post(
-                f"{self.url}assets",
-                json=body,
-                headers=self.headers,
-                ssl=False,
+        response = await self.post_request(endpoint="assets", body=body)
+
+        if response.status == 201:
+            result = await response.json()
+            response_list = result["assets"]
+            return [self._bind(self.parse_response(Asset, x)) for x in response_list]
+        elif response.status == 422:
+            existing_assets = await project.get_assets(
+                asset_type_id=list({a.asset_type.id for a in assets})
             )
+            existing_by_key = {asset_key(asset): asset for asset in existing_assets}
 
-            if response.status == 201:
-                result = await response.json()
-                response_list = result["assets"]
-                return [Asset(**x) for x in response_list]
-            elif response.status == 422:
-                existing_assets = await project.get_assets(
-                    asset_type_id=list({a.asset_type.id for a in assets})
-                )
+            return [
+                existing_by_key[asset_key(new_asset)]
+                for new_asset in assets
+                if asset_key(new_asset) in existing_by_key
+            ]
+        else:
+            print("Error posting assets")
 
-                returned_assets = []
-                for new_asset in assets:
-                    returned_assets.extend(
-                        asset for asset in existing_assets if asset == new_asset
-                    )
+            print(response.status)
+            print(body)
+            return []
 
-                return returned_assets
-            else:
-                print("Error posting assets")
-
-                print(response.status)
-                print(body)
-                return []
-
-    async def post_assets(self, project: "Project", assets: List["NewAsset"]):
-        # ddb = DDB(url=BaseURL.sandbox)
-
-        # sort assets into hierarchy order
-        # asset_types = await ddb.get_asset_types()
-        # asset_types_order = [a.name for a in asset_types]
-
-        asset_types_order = [
-            "site",
-            "building",
-            "space type",
-            "space instance",
-            "building system",
-            "building envelope",
-            "network link",
-            "network asset",
-            "masterplanning site",
-            "plot",
-            "equipment type",
-            "equipment sub type",
-            "area",
-            "ground model",
-            "layer",
-            "case",
-            "assembly",
-            "2nd level sub component",
-            "3rd level sub component",
-            "bridge components",
-            "vehicles",
-            "railway",
-            "track type",
-            "wire run",
-            "overhead line engineering",
-            "bed formation",
-            "span",
-            "in span equipment",
-            "material",
-            "bridge",
-            "deck/support/non structural elements",
-            "span/support/ancillary",
-            "network asset element instance",
-            "network asset element type",
-            "track sub type",
-            "network asset component",
-            "building element instance",
-            "bridge element type",
-            "sub system",
-            "network asset sub element type",
-            "bridge component name",
-            "network asset system",
-            "network asset alignment",
-            "building sub frame material",
-            "building envelope material",
-            "building element sub type",
-            "track alignment",
-            "building envelope component",
-            "building sub frame",
-            "network asset sub element instance",
-            "building frame",
-            "masterplanning area",
-            "product type",
-            "generic",
-            "product",
-            "system group",
-            "building envelope system",
-            "network asset frame",
-            "network asset sub component",
-            "building element type",
-            "bridge component element",
-            "network asset element sub type",
-            "bridge panel",
-        ]
+    async def post_assets(
+        self, project: "Project", assets: List["NewAsset"], batch_size: int = 1000
+    ):
+        """Posts new assets, skipping any that already exist in the project.
 
-        sorted_new_assets = sorted(
-            assets,
-            key=lambda x: asset_types_order.index(x.asset_type.name),
-            reverse=False,
-        )
+        The hierarchy is planned up front with `AssetUploadPlan`, then posted
+        one depth level at a time. Each level is split into batches of
+        `batch_size` assets, which are posted concurrently.
 
-        existing_assets = await project.get_assets()
-        new_assets = []
-        returned_assets = []
+        Existing assets are taken from the project's snapshot, refreshed
+        first if it is older than `SNAPSHOT_MAX_AGE` seconds, so assets
+        created elsewhere since then may be posted again.
 
-        for asset in sorted_new_assets:
-            if isinstance(asset.parent, Asset) or asset.parent is None:
-                for existing_asset in existing_assets:
+        Returns:
+            Existing assets matched by the new ones, followed by the assets
+            created.
+        """
+        snapshot = await project.get_snapshot("assets", max_age=SNAPSHOT_MAX_AGE)
+        plan = AssetUploadPlan.build(assets, snapshot.assets)
+        return await self.execute_asset_plan(project, plan, batch_size=batch_size)
 
-                    if existing_asset.__eq__(asset):
-                        this_existing_asset = next(
-                            a for a in existing_assets if a == asset
-                        )
-                        returned_assets.append(this_existing_asset)
-                        for child in sorted_new_assets:
-                            if child.parent and child.parent.id == asset.id:
-                                child.parent = this_existing_asset
-
-            new_assets.append(
-                NewAsset(
-                    id=str(asset.id),
-                    asset_type=asset.asset_type,
-                    name=asset.name,
-                    parent=asset.parent,
-                )
-            )
+    async def execute_asset_plan(
+        self, project: "Project", plan: "AssetUploadPlan", batch_size: int = 1000
+    ):
+        """Posts the levels of a plan in order, each in concurrent batches.
 
-        if new_assets != []:
-            returned_assets += await self.handle_post_assets(
-                project=project, assets=new_assets
+        Returns:
+            The existing assets the plan matched, followed by the assets
+            created.
+        """
+        returned_assets = list(plan.existing)
+        for level in plan.levels:
+            results = await asyncio.gather(
+                *[
+                    self.handle_post_assets(project=project, assets=chunk)
+                    for chunk in split_list(level, batch_size)
+                ]
             )
+            for result in results:
+                returned_assets += result
+        project.update_snapshot("assets", returned_assets[len(plan.existing) :])
         return returned_assets
 
     async def post_parameters(
         self, project: "Project", parameters: List["NewParameter"]
-    ):
+    ) -> "ParameterPlan":
+        """Posts new parameters, and new revisions of existing ones that changed.
+
+        The project's existing parameters, from its snapshot, are reconciled
+        with `parameters` by `ParameterPlan`, in a single pass over each. The
+        snapshot is refreshed first if it is older than `SNAPSHOT_MAX_AGE`
+        seconds, so changes made elsewhere since then are not seen; call
+        `project.get_snapshot(refresh=True)` first to plan against the latest.
 
-        # Wow this entire function is just awful
-        project_parameters = await project.get_parameters(
-            page_limit=99999,
-            parameter_type_id=[p.parameter_type.id for p in parameters],
+        Returns:
+            The plan that was posted, with its counts.
+        """
+        snapshot = await project.get_snapshot("parameters", max_age=SNAPSHOT_MAX_AGE)
+        plan = ParameterPlan.build(parameters, snapshot.parameters)
+        await self.execute_parameter_plan(project, plan)
+        return plan
+
+    async def execute_parameter_plan(self, project: "Project", plan: "ParameterPlan"):
+        """Posts the parameters and revisions a plan creates."""
+        # Called through DDB, as Project overrides post_new_parameters
+        created, revised = await asyncio.gather(
+            DDB.post_new_parameters(self, project=project, parameters=plan.create),
+            self.post_new_revisions(parameters=plan.revise),
         )
-        existing_parameters = [
-            (p.parameter_type.id, p.parents[0].id if p.parents else None)
-            for p in project_parameters
-        ]
-        existing_revisions = [
-            (p.parameter_type.id, p.parents[0].id if p.parents else None, p.revision)
-            for p in project_parameters
-        ]
-        new_parameters = []
-        new_revisions = []
-        for parameter in parameters:
-            if (
-                parameter.parameter_type.id,
-                parameter.parent.id if parameter.parent else None,
-            ) in existing_parameters:
-
-                if (
-                    parameter.parameter_type.id,
-                    parameter.parent.id if parameter.parent else None,
-                    parameter.revision or None,
-                ) in existing_revisions:
-                    continue
-                if parameter.parent:
-                    setattr(
-                        parameter,
-                        "id",
-                        next(
-                            p.id
-                            for p in [x for x in project_parameters if x.parents != []]
-                            if p.parameter_type.id == parameter.parameter_type.id
-                            and p.parents[0].id == parameter.parent.id
-                        ),
-                    )
+        await self._update_parameter_snapshot(project, created or [], revised)
 
-                else:
-                    setattr(
-                        parameter,
-                        "id",
-                        next(
-                            p.id
-                            for p in project_parameters
-                            if p.parameter_type.id == parameter.parameter_type.id
-                            and not p.parents
-                        ),
+    async def _update_parameter_snapshot(
+        self, project: "Project", created: list, revised: dict
+    ):
+        """Merges the parameters and revisions we just posted into the snapshot."""
+        if not project.has_snapshot("parameters"):
+            return
+        try:
+            parameters = []
+            for response in created:
+                if response.status == 201:
+                    result = await response.json()
+                    parameters += [
+                        self.parse_response(Parameter, x) for x in result["parameters"]
+                    ]
+            revisions = {}
+            for parameter_id, response in revised.items():
+                if response.status == 201:
+                    result = await response.json()
+                    revisions[parameter_id] = self.parse_response(
+                        Revision, result["revision"]
                     )
+        except Exception:
+            # Unexpected response bodies are left to the next fetch
+            project.invalidate_snapshot("parameters")
+            return
+        project.update_snapshot("parameters", parameters)
+        project.update_snapshot_revisions(revisions)
+
+    async def get_snapshot(
+        self, project: "Project", *collections: str, refresh: bool = False
+    ) -> "ProjectSnapshot":
+        """The cached snapshot of a project; see `Project.get_snapshot`."""
+        return await project.get_snapshot(*collections, refresh=refresh)
+
+    async def plan_upload(
+        self,
+        project: "Project",
+        assets: Optional[List["NewAsset"]] = None,
+        sources: Optional[List["NewSource"]] = None,
+        parameters: Optional[List["NewParameter"]] = None,
+        snapshot: Optional["ProjectSnapshot"] = None,
+    ) -> "UploadPlan":
+        """Works out what an upload would change, without sending any writes.
 
-                new_revisions.append(parameter)
-            else:
-
-                new_parameters.append(parameter)
+        Args:
+            project (Project): Project to upload to.
+            assets (List[NewAsset]): Assets to upload.
+            sources (List[NewSource]): Sources to upload.
+            parameters (List[NewParameter]): Parameters to upload.
+            snapshot (ProjectSnapshot): Existing project data to plan against.
+                Defaults to the project's cached snapshot.
 
-        await asyncio.gather(
-            self.post_new_parameters(project=project, parameters=new_parameters),
-            self.post_new_revisions(parameters=new_revisions),
+        Returns:
+            The plan, to inspect, save or `execute`.
+        """
+        snapshot = snapshot or await project.get_snapshot()
+        return UploadPlan.build(
+            snapshot, assets=assets, sources=sources, parameters=parameters
         )
 
     async def post_new_parameters(
@@ -436,7 +770,12 @@ class DDB(BaseModel):
         project: "Project",
         parameters: List["NewParameter"],
     ):
+        """Posts parameters in adaptively sized batches.
 
+        Batch sizes adapt to the server's responses and carry over between
+        calls on the same session. `self.session.batcher("parameters")`
+        reports the batch size it settled on and the throughput.
+        """
         new_parameters = []
 
         for parameter in parameters:
@@ -470,18 +809,17 @@ class DDB(BaseModel):
             new_parameters.append(parameter_body)
 
         if new_parameters != []:
-            parameter_lists = list(split_list(new_parameters, 40))
-            tasks = []
-            for parameter_list in parameter_lists:
-                body = {"parameters": parameter_list}
-                tasks.append(
-                    self.post_request(
-                        endpoint="parameters",
-                        body=body,
-                    )
+            # Retries are left to the batcher, which re-sends in smaller batches
+            async def send(parameter_list):
+                return await self.post_request(
+                    endpoint="parameters",
+                    body={"parameters": parameter_list},
+                    max_retries=0,
                 )
 
-            responses = await asyncio.gather(*tasks)
+            responses = await self.session.batcher("parameters").run(
+                new_parameters, send
+            )
             for response in responses:
 
                 if response.status == 400:
@@ -509,21 +847,16 @@ class DDB(BaseModel):
             for parameter in parameters
         }
 
-        async with aiohttp.ClientSession() as session:
-
-            responses = await asyncio.gather(
-                *[
-                    session.post(
-                        f"{self.url}parameters/{parameter_id}/revision",
-                        json=revision_body,
-                        headers=self.headers,
-                        ssl=False,
-                    )
-                    for parameter_id, revision_body in revision_bodies.items()
-                ]
-            )
-
-            # return await response.json()
+        responses = await asyncio.gather(
+            *[
+                self.post_request(
+                    endpoint=f"parameters/{parameter_id}/revision",
+                    body=revision_body,
+                )
+                for parameter_id, revision_body in revision_bodies.items()
+            ]
+        )
+        return dict(zip(revision_bodies, responses))
 
     # async def post_new_revisions(self, parameters: List["NewParameter"]):
     #     return await asyncio.gather(
@@ -561,27 +894,112 @@ class DDB(BaseModel):
             endpoint="projects", response_key="projects", cls=Project, **kwargs
         )
         for project in projects:
-            setattr(project, "url", self.url)
+            self._bind(project)
         return projects
 
+    async def iter_projects(self, **kwargs):
+        """Iterates over project objects page by page."""
+        async for project in self.iter_request(
+            endpoint="projects", response_key="projects", cls=Project, **kwargs
+        ):
+            yield self._bind(project)
+
+    async def iter_project_results(
+        self,
+        collection: str = "parameters",
+        project_ids: Optional[Iterable[Union[str, "Project"]]] = None,
+        project_filters: Optional[dict] = None,
+        concurrency: int = 8,
+        **filters,
+    ) -> AsyncIterator["ProjectResult"]:
+        """Fetches a collection for many projects concurrently.
+
+        Each project's records are paged through by one of `concurrency`
+        workers, so no more than that many projects are fetched at once.
+        Results are yielded as each project completes, whatever order the
+        projects were given in. A project that fails is yielded with its
+        error, and does not stop the others.
+
+        Args:
+            collection (str): "parameters", "assets" or "sources".
+            project_ids (Iterable[Union[str, Project]]): Projects to fetch.
+            project_filters (dict): Filters for `iter_projects`, used to list
+                the projects when `project_ids` is not given.
+            concurrency (int): Projects fetched at once.
+            **filters: Filters passed to each project's query, plus
+                `page_limit` and `prefetch`.
+
+        Yields:
+            One `ProjectResult` per project, in completion order.
+        """
+        _, project_filter = SNAPSHOT_COLLECTIONS[collection]
+        # Called through DDB, as Project and Asset override the iterators
+        iterate = getattr(DDB, f"iter_{collection}")
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def feed():
+            try:
+                if project_ids is None:
+                    async for project in self.iter_projects(**(project_filters or {})):
+                        await queue.put(project.project_id)
+                else:
+                    for project in project_ids:
+                        await queue.put(
+                            project if isinstance(project, str) else project.project_id
+                        )
+            finally:
+                for _ in range(concurrency):
+                    await queue.put(None)
+
+        async def work():
+            while True:
+                project_id = await queue.get()
+                if project_id is None:
+                    return
+                try:
+                    records = await collect(
+                        iterate(self, **{project_filter: project_id}, **filters)
+                    )
+                    result = ProjectResult(project_id=project_id, records=records)
+                except Exception as error:
+                    result = ProjectResult(project_id=project_id, error=error)
+                await results.put(result)
+
+        workers = [asyncio.ensure_future(feed())] + [
+            asyncio.ensure_future(work()) for _ in range(concurrency)
+        ]
+
+        async def run():
+            try:
+                await asyncio.gather(*workers)
+            except Exception as error:
+                await results.put(error)
+            await results.put(done)
+
+        tasks = workers + [asyncio.ensure_future(run())]
+        try:
+            while True:
+                result = await results.get()
+                if result is done:
+                    break
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+
     async def post_project(self, project_number: str, confidential: bool = False):
         body = {"number": project_number, "confidential": confidential}
-        async with aiohttp.ClientSession() as session:
-            response = await session.post(
-                f"{self.url}projects",
-                json=body,
-                headers=self.headers,
-                ssl=False,
-            )
-            if response.status == 409:
-                print("Getting existing project...")
-                response = await self.get_projects(number=project_number)
-                return response[0]
-            result = await response.json()
-        projects = Project(**result["project"])
-        for project in projects:
-            setattr(project, "url", self.url)
-        return projects
+        response = await self.post_request(endpoint="projects", body=body)
+        if response.status == 409:
+            print("Getting existing project...")
+            response = await self.get_projects(number=project_number)
+            return response[0]
+        result = await response.json()
+        return self._bind(self.parse_response(Project, result["project"]))
 
     async def get_source_types(self, **kwargs):
         """Retreives list of source types objects."""
@@ -592,6 +1010,15 @@ class DDB(BaseModel):
             **kwargs,
         )
 
+    def iter_source_types(self, **kwargs):
+        """Iterates over source type objects page by page."""
+        return self.iter_request(
+            endpoint="source_types",
+            response_key="source_types",
+            cls=SourceType,
+            **kwargs,
+        )
+
     async def get_parameter_types(self, **kwargs):
         """Retreives list of parameter type objects.
 
@@ -612,6 +1039,15 @@ class DDB(BaseModel):
             **kwargs,
         )
 
+    def iter_parameter_types(self, **kwargs):
+        """Iterates over parameter type objects page by page."""
+        return self.iter_request(
+            endpoint="parameter_types",
+            response_key="parameter_types",
+            cls=ParameterType,
+            **kwargs,
+        )
+
     async def get_asset_types(self, **kwargs):
         """Returns list of all asset types objects.
 
@@ -629,6 +1065,12 @@ class DDB(BaseModel):
             endpoint="asset_types", response_key="asset_types", cls=AssetType, **kwargs
         )
 
+    def iter_asset_types(self, **kwargs):
+        """Iterates over asset type objects page by page."""
+        return self.iter_request(
+            endpoint="asset_types", response_key="asset_types", cls=AssetType, **kwargs
+        )
+
     async def get_asset_type_groups(self, **kwargs):
         """Returns all asset type groups.
 
@@ -645,6 +1087,15 @@ class DDB(BaseModel):
             **kwargs,
         )
 
+    def iter_asset_type_groups(self, **kwargs):
+        """Iterates over asset type group objects page by page."""
+        return self.iter_request(
+            endpoint="asset_type_groups",
+            response_key="asset_type_groups",
+            cls=AssetTypeGroup,
+            **kwargs,
+        )
+
     async def get_item_types(self, **kwargs):
         """Gets all item types.
 
@@ -665,6 +1116,12 @@ class DDB(BaseModel):
             **kwargs,
         )
 
+    def iter_item_types(self, **kwargs):
+        """Iterates over item type objects page by page."""
+        return self.iter_request(
+            endpoint="item_types", response_key="item_types", cls=ItemType, **kwargs
+        )
+
     async def get_units(self, **kwargs):
         """Gets all units.
 
@@ -680,6 +1137,12 @@ class DDB(BaseModel):
             endpoint="units", response_key="units", cls=Unit, **kwargs
         )
 
+    def iter_units(self, **kwargs):
+        """Iterates over unit objects page by page."""
+        return self.iter_request(
+            endpoint="units", response_key="units", cls=Unit, **kwargs
+        )
+
     async def get_unit_types(self, **kwargs):
         """Gets all unit types.
 
@@ -690,6 +1153,12 @@ class DDB(BaseModel):
             endpoint="unit_types", response_key="unit_types", cls=UnitType, **kwargs
         )
 
+    def iter_unit_types(self, **kwargs):
+        """Iterates over unit type objects page by page."""
+        return self.iter_request(
+            endpoint="unit_types", response_key="unit_types", cls=UnitType, **kwargs
+        )
+
     async def get_unit_systems(self, **kwargs):
         """Gets all unit systems.
 
@@ -703,6 +1172,15 @@ class DDB(BaseModel):
             **kwargs,
         )
 
+    def iter_unit_systems(self, **kwargs):
+        """Iterates over unit system objects page by page."""
+        return self.iter_request(
+            endpoint="unit_systems",
+            response_key="unit_systems",
+            cls=UnitSystem,
+            **kwargs,
+        )
+
     async def get_tags(self, **kwargs):
         """Gets all tags.
 
@@ -718,6 +1196,12 @@ class DDB(BaseModel):
             endpoint="tags", response_key="tags", cls=Tag, **kwargs
         )
 
+    def iter_tags(self, **kwargs):
+        """Iterates over tag objects page by page."""
+        return self.iter_request(
+            endpoint="tags", response_key="tags", cls=Tag, **kwargs
+        )
+
     async def get_tag_types(self, **kwargs):
         """Gets all tag types.
 
@@ -728,6 +1212,12 @@ class DDB(BaseModel):
             endpoint="tag_types", response_key="tag_types", cls=TagType, **kwargs
         )
 
+    def iter_tag_types(self, **kwargs):
+        """Iterates over tag type objects page by page."""
+        return self.iter_request(
+            endpoint="tag_types", response_key="tag_types", cls=TagType, **kwargs
+        )
+
 
 class UnitSystem(BaseModel):
     id: str
@@ -833,33 +1323,39 @@ class Asset(DDB):
     def __repr__(self) -> str:
         return repr(f"Name: {self.name}, Type: {self.asset_type.name}, ID: {self.id}")
 
+    @property
+    def identity(self) -> tuple:
+        """Key a new asset matches this asset on; see `asset_key`."""
+        return asset_key(self)
+
+    def __hash__(self):
+        return hash(self.id)
+
     def __eq__(self, other):
-        if isinstance(other, Asset) and other.id == self.id:
-            return True
-        elif (
-            isinstance(other, Asset)
-            or not isinstance(other, NewAsset)
-            and other == None
-        ):
-            return False
+        if isinstance(other, Asset):
+            return other.id == self.id
         elif isinstance(other, NewAsset):
-            other_parent = other.parent.id if other.parent else other.parent
-            return (
-                other_parent == self.parent
-                and other.asset_type == self.asset_type
-                and other.name == self.name
-            )
-
-        else:
-            print(type(other).__name__)
-            raise NotImplementedError
+            return other.identity == self.identity
+        return NotImplemented
 
     async def get_assets(self, **kwargs):
         return await super().get_assets(parent_id=[self.id], **kwargs)
 
+    def iter_assets(self, **kwargs):
+        return super().iter_assets(parent_id=[self.id], **kwargs)
+
+    async def get_assets_frame(self, **kwargs):
+        return await super().get_assets_frame(parent_id=[self.id], **kwargs)
+
     async def get_parameters(self, **kwargs):
         return await super().get_parameters(asset_id=self.id, **kwargs)
 
+    def iter_parameters(self, **kwargs):
+        return super().iter_parameters(asset_id=self.id, **kwargs)
+
+    async def get_parameters_frame(self, **kwargs):
+        return await super().get_parameters_frame(asset_id=self.id, **kwargs)
+
     async def post_sources(self, sources: List["NewSource"]):
 
         return await super().post_sources(sources=sources, reference_id=self.project_id)
@@ -898,11 +1394,13 @@ class ParameterType(BaseModel):
             f"Name: {self.name}, Data Type: {self.data_type}, ID: {self.id}, Unit Type:{self.unit_type or None}"
         )
 
+    def __hash__(self):
+        return hash(self.id)
+
     def __eq__(self, other):
         if isinstance(other, ParameterType):
             return other.id == self.id
-        else:
-            raise NotImplementedError
+        return NotImplemented
 
 
 class Source(BaseModel):
@@ -933,18 +1431,20 @@ class Source(BaseModel):
     def __repr__(self) -> str:
         return repr(f"Title: {self.title}, Reference: {self.reference}, ID: {self.id}")
 
+    @property
+    def identity(self) -> tuple:
+        """Key a new source matches this source on; see `source_key`."""
+        return source_key(self)
+
+    def __hash__(self):
+        return hash(self.id)
+
     def __eq__(self, other):
         if isinstance(other, Source):
             return other.id == self.id
         elif isinstance(other, NewSource):
-            return (
-                other.title == self.title
-                and other.reference == self.reference
-                and other.source_type.id == self.source_type_id
-            )
-
-        else:
-            raise NotImplementedError
+            return other.identity == self.identity
+        return NotImplemented
 
 
 class Value(BaseModel):
@@ -997,20 +1497,20 @@ class Revision(BaseModel):
             f"Value: {self.values[0].__repr__()}, Source: {self.source.__repr__()}, Status: {self.status}, ID: {self.id}"
         )
 
+    @property
+    def identity(self) -> tuple:
+        """Key a new revision matches this revision on; see `revision_key`."""
+        return revision_key(self)
+
+    def __hash__(self):
+        return hash(self.id)
+
     def __eq__(self, other):
         if isinstance(other, Revision):
             return other.id == self.id
         elif isinstance(other, NewRevision):
-            return (
-                str(other.value) == str(self.values[0].value)
-                and other.unit == self.values[0].unit
-                and other.source == self.source
-            )
-
-        elif other is None:
-            return False
-        else:
-            raise NotImplementedError
+            return other.identity == self.identity
+        return NotImplemented
 
 
 class Parameter(BaseModel):
@@ -1033,17 +1533,24 @@ class Parameter(BaseModel):
             f"Parameter Type: {self.parameter_type}, Revision: {self.revision.__repr__() if self.revision else None}, ID: {self.id}"
         )
 
+    @property
+    def identity(self) -> tuple:
+        """Key a new parameter matches this parameter on: its `parameter_key`
+        and revision identity."""
+        return (
+            *parameter_key(self),
+            self.revision.identity if self.revision else None,
+        )
+
+    def __hash__(self):
+        return hash(self.id)
+
     def __eq__(self, other):
         if isinstance(other, Parameter):
             return other.id == self.id
         elif isinstance(other, NewParameter):
-            return (
-                other.parameter_type == self.parameter_type
-                and other.revision == self.revision
-            )
-
-        else:
-            raise NotImplementedError
+            return other.identity == self.identity
+        return NotImplemented
 
 
 class ItemType(BaseModel):
@@ -1087,6 +1594,7 @@ class Project(DDB):
     created_at: str
     updated_at: str
     deleted_at: Optional[str]
+    _snapshot: Optional["ProjectSnapshot"] = PrivateAttr(default=None)
 
     def __str__(self) -> str:
         return str(f"Name: {self.job_name_short}, Project Number: {self.project_code}")
@@ -1099,26 +1607,133 @@ class Project(DDB):
     async def get_assets(self, **kwargs):
         return await super().get_assets(project_id=self.project_id, **kwargs)
 
+    def iter_assets(self, **kwargs):
+        return super().iter_assets(project_id=self.project_id, **kwargs)
+
+    async def get_assets_frame(self, **kwargs):
+        return await super().get_assets_frame(project_id=self.project_id, **kwargs)
+
     async def get_parameters(self, **kwargs):
         return await super().get_parameters(project_id=self.project_id, **kwargs)
 
-    async def post_sources(self, sources: List["NewSource"]):
+    def iter_parameters(self, **kwargs):
+        return super().iter_parameters(project_id=self.project_id, **kwargs)
 
-        return await super().post_sources(sources=sources, reference_id=self.project_id)
+    async def get_parameters_frame(self, **kwargs):
+        return await super().get_parameters_frame(project_id=self.project_id, **kwargs)
+
+    async def post_sources(self, sources: List["NewSource"]):
+        snapshot = await self.get_snapshot("sources", max_age=SNAPSHOT_MAX_AGE)
+        results = await super().post_sources(
+            sources=sources,
+            reference_id=self.project_id,
+            existing_sources=snapshot.sources,
+        )
+        self.update_snapshot("sources", results)
+        return results
 
     async def post_new_parameters(self, parameters: List["NewParameter"]):
         return await super().post_new_parameters(project=self, parameters=parameters)
 
-    async def post_assets(self, assets: List["NewAsset"]):
-        return await super().post_assets(project=self, assets=assets)
+    async def post_parameters(self, parameters: List["NewParameter"]):
+        return await super().post_parameters(project=self, parameters=parameters)
 
-    async def delete(self):
-        async with aiohttp.ClientSession() as session:
-            return await session.delete(
-                f"{self.url}projects/{self.project_id}",
-                headers=self.headers,
-                ssl=False,
+    async def post_assets(self, assets: List["NewAsset"], batch_size: int = 1000):
+        return await super().post_assets(
+            project=self, assets=assets, batch_size=batch_size
+        )
+
+    async def get_snapshot(
+        self,
+        *collections: str,
+        refresh: bool = False,
+        max_age: Optional[float] = None,
+    ) -> "ProjectSnapshot":
+        """Cached snapshot of the project's assets, parameters and sources.
+
+        Each collection is fetched the first time it is needed and then kept
+        up to date in place from this client's own writes, so repeated posts
+        to the project do not download it again. Changes made elsewhere are
+        only picked up when a collection is refreshed.
+
+        Args:
+            *collections (str): Any of "assets", "parameters" and "sources".
+                Defaults to all three.
+            refresh (bool): Bring the collections up to date with changes
+                made elsewhere. Only records whose version changed are
+                parsed.
+            max_age (float): Refresh collections synced more than this many
+                seconds ago. None keeps them however old they are.
+        """
+        if self._snapshot is None:
+            self._snapshot = ProjectSnapshot(
+                project_id=self.project_id,
+                taken_at=datetime.now(timezone.utc).isoformat(),
             )
+        stale = [
+            collection
+            for collection in collections or SNAPSHOT_COLLECTIONS
+            if refresh
+            or collection not in self._snapshot.synced_at
+            or (max_age is not None and self._snapshot.age(collection) > max_age)
+        ]
+        if stale:
+            await self._snapshot.refresh(self, stale)
+        return self._snapshot
+
+    async def get_asset_tree(self, refresh: bool = False) -> AssetTree:
+        """Every asset of the project, indexed as a tree.
+
+        The assets come from the project's snapshot, so the whole hierarchy
+        costs one paged listing rather than a request per parent, and
+        repeated calls reuse it. Subtrees, ancestors, paths and assets of a
+        type are then looked up locally.
+
+        Args:
+            refresh (bool): Bring the assets up to date with changes made
+                elsewhere first.
+        """
+        snapshot = await self.get_snapshot("assets", refresh=refresh)
+        return AssetTree(snapshot.assets)
+
+    def has_snapshot(self, collection: str) -> bool:
+        return self._snapshot is not None and collection in self._snapshot.synced_at
+
+    def update_snapshot(self, collection: str, records: list):
+        if self._snapshot is not None:
+            self._snapshot.update(collection, records)
+
+    def update_snapshot_revisions(self, revisions: Dict[str, "Revision"]):
+        if self._snapshot is not None:
+            self._snapshot.update_revisions(revisions)
+
+    def invalidate_snapshot(self, *collections: str):
+        """Drops collections from the snapshot, so they are fetched again."""
+        if self._snapshot is not None:
+            for collection in collections or SNAPSHOT_COLLECTIONS:
+                self._snapshot.synced_at.pop(collection, None)
+
+    async def plan_upload(self, **kwargs):
+        return await super().plan_upload(project=self, **kwargs)
+
+    async def delete(self):
+        self._snapshot = None
+        return await self.delete_request(endpoint=f"projects/{self.project_id}")
+
+
+class ProjectResult(BaseModel):
+    """Records of one project from `iter_project_results`, or its error."""
+
+    project_id: str
+    records: list = []
+    error: Optional[Exception] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 class TagType(BaseModel):
@@ -1151,7 +1766,40 @@ class Tag(BaseModel):
         return repr(f"Name: {self.name}, Tag Type: {self.tag_type}, ID: {self.id}")
 
 
-class NewSource(BaseModel):
+class NewModel(BaseModel):
+    """Base of the models of records that are not posted yet.
+
+    They match stored records by `identity`, which is worked out on first
+    use and kept until one of the model's fields is set, or it is copied.
+    Subclasses give it with `_identity_key`.
+    """
+
+    _identity: Optional[tuple] = PrivateAttr(None)
+
+    # Equal to stored records, which hash by id, so not hashable
+    __hash__ = None
+
+    @property
+    def identity(self) -> tuple:
+        if self._identity is None:
+            self._identity = self._identity_key()
+        return self._identity
+
+    def _identity_key(self) -> tuple:
+        raise NotImplementedError
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self.__fields__:
+            self._identity = None
+
+    def copy(self, **kwargs):
+        copy = super().copy(**kwargs)
+        copy._identity = None
+        return copy
+
+
+class NewSource(NewModel):
     source_type: SourceType
     title: str
     reference: str
@@ -1170,20 +1818,16 @@ class NewSource(BaseModel):
             f"Title: {self.title}, Reference: {self.reference}, Source Type: {self.source_type.name}"
         )
 
+    def _identity_key(self) -> tuple:
+        return source_key(self)
+
     def __eq__(self, other):
         if isinstance(other, (NewSource, Source)):
+            return other.identity == self.identity
+        return NotImplemented
 
-            return (
-                other.title == self.title
-                and other.reference == self.reference
-                and other.source_type == self.source_type
-            )
-
-        else:
-            raise NotImplementedError
 
-
-class NewRevision(BaseModel):
+class NewRevision(NewModel):
 
     value: Union[str, int, float, bool]
     unit: Optional[Unit]
@@ -1197,30 +1841,16 @@ class NewRevision(BaseModel):
     def __repr__(self) -> str:
         return repr(f"Value: {self.value}, Source: {self.source.__repr__()}")
 
-    def __eq__(self, other):
-        if isinstance(other, NewRevision):
-            return (
-                other.value == self.value
-                and other.unit == self.unit
-                and other.source == self.source
-            )
+    def _identity_key(self) -> tuple:
+        return revision_key(self)
 
-        elif isinstance(other, Revision):
-            return (
-                str(other.values[0].value) == str(self.value)
-                and other.values[0].unit == self.unit
-                and other.source == self.source
-            )
-
-        elif other == None:
-            return False
-        else:
-            print(type(other).__name__)
-            print(other)
-            raise NotImplementedError
+    def __eq__(self, other):
+        if isinstance(other, (NewRevision, Revision)):
+            return other.identity == self.identity
+        return NotImplemented
 
 
-class NewAsset(BaseModel):
+class NewAsset(NewModel):
     id: UUID = Field(default_factory=uuid4)
     asset_type: AssetType
     name: str
@@ -1232,22 +1862,134 @@ class NewAsset(BaseModel):
     def __repr__(self) -> str:
         return repr(f"Name: {self.name}, Type: {self.asset_type.name}, ID: {self.id}")
 
+    def _identity_key(self) -> tuple:
+        return asset_key(self)
+
     def __eq__(self, other):
         if isinstance(other, (Asset, NewAsset)):
+            return other.identity == self.identity
+        return NotImplemented
+
+
+def source_key(source: Union[Source, NewSource]) -> Tuple[str, str, str]:
+    """Identity of a source within a project: (title, reference, source type id)."""
+    if isinstance(source, NewSource):
+        return (source.title, source.reference, source.source_type.id)
+    return (source.title, source.reference, source.source_type_id)
+
+
+def asset_key(asset: Union["Asset", "NewAsset"]) -> Tuple[Optional[str], str, str]:
+    """Identity of an asset within a project: (parent id, asset type id, name)."""
+    if isinstance(asset, NewAsset):
+        parent_id = str(asset.parent.id) if asset.parent else None
+    else:
+        parent_id = asset.parent_id or asset.parent
+    asset_type_id = asset.asset_type.id if asset.asset_type else None
+    return (parent_id, asset_type_id, asset.name)
+
+
+class AssetUploadPlan(BaseModel):
+    """Order in which new assets are posted, worked out without any requests.
+
+    Assets are levelled by their depth in the `NewAsset.parent` hierarchy, so
+    each asset is posted after its parent whatever its asset type. A new
+    asset with the same parent, asset type and name as an existing asset is
+    not posted, and its children are attached to the existing asset. New
+    parents that were not passed in are planned too, and duplicate new assets
+    are posted once.
+
+    Attributes:
+        existing (List[Asset]): Existing assets matched by new ones.
+        levels (List[List[NewAsset]]): New assets to post, level by level,
+            with their parents resolved.
+        resolved (Dict[str, str]): Id of the asset each new asset id was
+            matched or planned as.
+    """
+
+    existing: List[Asset] = []
+    levels: List[List[NewAsset]] = []
+    resolved: Dict[str, str] = {}
+    _by_id: Optional[Dict[str, Union[Asset, NewAsset]]] = PrivateAttr(default=None)
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {
+            "create": sum(len(level) for level in self.levels),
+            "existing": len(self.existing),
+        }
 
-            return (
-                other.parent == self.parent
-                and other.asset_type == self.asset_type
-                and other.name == self.name
-            )
-
-        elif other == None:
-            return False
-        else:
-            raise NotImplementedError
+    def resolve(
+        self, asset: Union[Asset, NewAsset, None]
+    ) -> Union[Asset, NewAsset, None]:
+        """The existing or planned asset that a new asset was resolved to."""
+        if not isinstance(asset, NewAsset):
+            return asset
+        if self._by_id is None:
+            self._by_id = {asset.id: asset for asset in self.existing}
+            for level in self.levels:
+                self._by_id.update((str(asset.id), asset) for asset in level)
+        return self._by_id.get(self.resolved.get(str(asset.id)), asset)
+
+    @classmethod
+    def build(
+        cls, assets: List[NewAsset], existing_assets: List[Asset]
+    ) -> "AssetUploadPlan":
+        existing_by_key: Dict[tuple, Asset] = {}
+        for asset in existing_assets:
+            existing_by_key.setdefault(asset_key(asset), asset)
+
+        nodes: Dict[str, NewAsset] = {}
+        for asset in assets:
+            node = asset
+            while isinstance(node, NewAsset) and str(node.id) not in nodes:
+                nodes[str(node.id)] = node
+                node = node.parent
+
+        depths: Dict[str, int] = {}
+        for node in nodes.values():
+            chain, chain_ids = [], set()
+            while isinstance(node, NewAsset) and str(node.id) not in depths:
+                if str(node.id) in chain_ids:
+                    raise ValueError(f"Asset hierarchy contains a cycle at {node!r}")
+                chain.append(node)
+                chain_ids.add(str(node.id))
+                node = node.parent
+            depth = depths[str(node.id)] if isinstance(node, NewAsset) else -1
+            for node in reversed(chain):
+                depth += 1
+                depths[str(node.id)] = depth
+
+        plan = cls()
+        matched = set()
+        resolved: Dict[str, Union[Asset, NewAsset]] = {}
+        planned: Dict[tuple, NewAsset] = {}
+        level_of: Dict[str, int] = {}
+        for node in sorted(nodes.values(), key=lambda node: depths[str(node.id)]):
+            parent = node.parent
+            if isinstance(parent, NewAsset):
+                parent = resolved[str(parent.id)]
+            asset = node.copy(update={"parent": parent})
+            key = asset_key(asset)
+            if key in existing_by_key:
+                existing = resolved[str(node.id)] = existing_by_key[key]
+                if existing.id not in matched:
+                    matched.add(existing.id)
+                    plan.existing.append(existing)
+            elif key in planned:
+                resolved[str(node.id)] = planned[key]
+            else:
+                resolved[str(node.id)] = planned[key] = asset
+                level = level_of[str(asset.id)] = (
+                    level_of[str(parent.id)] + 1 if isinstance(parent, NewAsset) else 0
+                )
+                if level == len(plan.levels):
+                    plan.levels.append([])
+                plan.levels[level].append(asset)
+        plan.resolved = {id: str(asset.id) for id, asset in resolved.items()}
+        return plan
 
 
-class NewParameter(BaseModel):
+class NewParameter(NewModel):
     id: Optional[str]
     parameter_type: ParameterType
     revision: Optional[NewRevision]
@@ -1263,12 +2005,448 @@ class NewParameter(BaseModel):
             f"Parameter Type: {self.parameter_type}, Revision: {self.revision.__repr__() if self.revision else None}"
         )
 
+    def _identity_key(self) -> tuple:
+        return (
+            *parameter_key(self),
+            self.revision.identity if self.revision else None,
+        )
+
     def __eq__(self, other):
         if isinstance(other, (Parameter, NewParameter)):
-            return (
-                other.parameter_type == self.parameter_type
-                and other.revision == self.revision
+            return other.identity == self.identity
+        return NotImplemented
+
+
+def parameter_key(
+    parameter: Union[Parameter, NewParameter],
+) -> Tuple[str, Optional[str]]:
+    """Identity of a parameter within a project: (parameter type id, parent id)."""
+    if isinstance(parameter, NewParameter):
+        parent_id = str(parameter.parent.id) if parameter.parent else None
+    else:
+        parent_id = parameter.parents[0].id if parameter.parents else None
+    return (parameter.parameter_type.id, parent_id)
+
+
+def revision_key(revision: Union[Revision, NewRevision]) -> tuple:
+    """Identity of a revision: (value as text, unit id, source identity).
+
+    Values are compared as text, as the API returns every value as a string.
+    """
+    if isinstance(revision, Revision):
+        value = revision.values[0] if revision.values else Value(value=None)
+        return (
+            str(value.value),
+            value.unit.id if value.unit else None,
+            revision.source.identity,
+        )
+    return (
+        str(revision.value),
+        revision.unit.id if revision.unit else None,
+        revision.source.identity,
+    )
+
+
+def match_key(item: Any) -> Hashable:
+    """What an item is matched on: the identity of a new model, the id of a
+    stored record. Stored records with the same content are distinct."""
+    if isinstance(item, NewModel):
+        return item.identity
+    return item.id
+
+
+def dedupe(items: Iterable[Any]) -> List[Any]:
+    """Items without duplicates, keeping the first item of each `match_key`."""
+    unique = {}
+    for item in items:
+        unique.setdefault(match_key(item), item)
+    return list(unique.values())
+
+
+def match_existing(items: Iterable[Any], existing: Iterable[Any]) -> List[Any]:
+    """The existing record each item matches, or None.
+
+    New models match by identity, e.g. NewAssets against Assets, and stored
+    records by id. Where several existing records match, the first is used.
+    """
+    existing_by_identity, existing_by_key = {}, {}
+    for record in existing:
+        existing_by_identity.setdefault(record.identity, record)
+        existing_by_key.setdefault(match_key(record), record)
+    return [
+        (
+            existing_by_identity.get(item.identity)
+            if isinstance(item, NewModel)
+            else existing_by_key.get(item.id)
+        )
+        for item in items
+    ]
+
+
+def difference(items: Iterable[Any], existing: Iterable[Any]) -> List[Any]:
+    """Items that match none of the existing records; see `match_existing`."""
+    items = list(items)
+    return [
+        item
+        for item, record in zip(items, match_existing(items, existing))
+        if record is None
+    ]
+
+
+class ParameterPlan(BaseModel):
+    """Reconciliation of new parameters with a project's existing parameters.
+
+    Existing parameters are indexed by (parameter type id, parent id), and
+    each new parameter is classified in one pass: parameters that do not
+    exist yet are created, existing ones whose current revision differs get
+    a new revision, and the rest are unchanged. Where a parameter exists more
+    than once, the first one listed is used.
+
+    Attributes:
+        create (List[NewParameter]): Parameters to create.
+        revise (List[NewParameter]): Parameters to post a new revision for,
+            with `id` set to the existing parameter's id.
+        unchanged (List[NewParameter]): Parameters already up to date.
+    """
+
+    create: List[NewParameter] = []
+    revise: List[NewParameter] = []
+    unchanged: List[NewParameter] = []
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {
+            "create": len(self.create),
+            "revise": len(self.revise),
+            "unchanged": len(self.unchanged),
+        }
+
+    @classmethod
+    def build(
+        cls, parameters: List[NewParameter], existing_parameters: List[Parameter]
+    ) -> "ParameterPlan":
+        existing_by_key: Dict[tuple, Parameter] = {}
+        for parameter in existing_parameters:
+            existing_by_key.setdefault(parameter_key(parameter), parameter)
+        current_revisions = {
+            (key, parameter.revision.identity if parameter.revision else None)
+            for key, parameter in existing_by_key.items()
+        }
+
+        plan = cls()
+        for parameter in parameters:
+            key = parameter_key(parameter)
+            existing = existing_by_key.get(key)
+            if existing is None:
+                plan.create.append(parameter)
+            elif (
+                parameter.revision is None
+                or (key, parameter.revision.identity) in current_revisions
+            ):
+                plan.unchanged.append(parameter)
+            else:
+                plan.revise.append(parameter.copy(update={"id": existing.id}))
+        return plan
+
+    def __str__(self) -> str:
+        return str(
+            f"Create: {len(self.create)}, Revise: {len(self.revise)}, "
+            f"Unchanged: {len(self.unchanged)}"
+        )
+
+    def with_sources(self, sources_by_key: Dict[tuple, Source]) -> "ParameterPlan":
+        """A copy whose revisions point at posted sources instead of NewSources."""
+
+        def resolve(parameter: NewParameter) -> NewParameter:
+            revision = parameter.revision
+            if revision is None or not isinstance(revision.source, NewSource):
+                return parameter
+            source = sources_by_key[source_key(revision.source)]
+            return parameter.copy(
+                update={"revision": revision.copy(update={"source": source})}
             )
 
-        else:
-            raise NotImplementedError
+        return ParameterPlan(
+            create=[resolve(parameter) for parameter in self.create],
+            revise=[resolve(parameter) for parameter in self.revise],
+            unchanged=self.unchanged,
+        )
+
+
+class SourcePlan(BaseModel):
+    """Reconciliation of new sources with a project's existing sources.
+
+    Sources are matched on (title, reference, source type id), and duplicate
+    new sources are created once.
+
+    Attributes:
+        existing (List[Source]): Existing sources matched by new ones.
+        create (List[NewSource]): Sources to create.
+    """
+
+    existing: List[Source] = []
+    create: List[NewSource] = []
+
+    @property
+    def counts(self) -> Dict[str, int]:
+        return {"create": len(self.create), "existing": len(self.existing)}
+
+    @classmethod
+    def build(
+        cls, sources: Iterable[NewSource], existing_sources: Iterable[Source]
+    ) -> "SourcePlan":
+        sources = dedupe(sources)
+        plan = cls()
+        for source, existing in zip(sources, match_existing(sources, existing_sources)):
+            if existing is None:
+                plan.create.append(source)
+            else:
+                plan.existing.append(existing)
+        return plan
+
+
+# Model and project filter of each collection in a snapshot, by endpoint
+SNAPSHOT_COLLECTIONS = {
+    "assets": (Asset, "project_id"),
+    "parameters": (Parameter, "project_id"),
+    "sources": (Source, "reference_id"),
+}
+
+# Filter each collection accepts for "updated since", where the API supports
+# one. None is documented today, so refreshes list the whole collection and
+# only parse the records whose version changed.
+SNAPSHOT_SINCE_FILTERS: Dict[str, Optional[str]] = {
+    collection: None for collection in SNAPSHOT_COLLECTIONS
+}
+
+# Seconds a snapshot collection is planned against before the post methods
+# bring it up to date with changes made elsewhere
+SNAPSHOT_MAX_AGE = 300
+
+
+def record_version(record: Union[dict, BaseModel]) -> tuple:
+    """What changes when a record is updated: (updated_at, deleted_at).
+
+    Parameters have no updated_at, so their current revision id is used.
+    """
+    if isinstance(record, dict):
+        revision = record.get("revision") or {}
+        updated = record.get("updated_at", revision.get("id"))
+        return (updated, record.get("deleted_at"))
+    revision = getattr(record, "revision", None)
+    updated = getattr(record, "updated_at", revision.id if revision else None)
+    return (updated, record.deleted_at)
+
+
+class ProjectSnapshot(BaseModel):
+    """The assets, parameters and sources of a project at one point in time.
+
+    Uploads can be planned against a snapshot without fetching the project
+    again, and a snapshot can be saved to and loaded from a JSON file.
+
+    Attributes:
+        synced_at (Dict[str, str]): When each collection was last fetched or
+            refreshed. Collections missing from it have not been fetched.
+    """
+
+    project_id: str
+    taken_at: str
+    assets: List[Asset] = []
+    parameters: List[Parameter] = []
+    sources: List[Source] = []
+    synced_at: Dict[str, str] = {}
+
+    async def refresh(
+        self, project: Project, collections: Iterable[str] = SNAPSHOT_COLLECTIONS
+    ):
+        """Brings collections up to date with the API.
+
+        Records are compared with the snapshot by `record_version`, and only
+        new or changed ones are parsed. Records that are deleted or no longer
+        listed are dropped. Where a collection has a filter in
+        `SNAPSHOT_SINCE_FILTERS`, only records updated since it was last
+        synced are requested, and only deleted ones are dropped.
+        """
+        await asyncio.gather(
+            *[self._refresh(project, collection) for collection in collections]
+        )
+        self.taken_at = datetime.now(timezone.utc).isoformat()
+
+    async def _refresh(self, project: Project, collection: str):
+        cls, project_filter = SNAPSHOT_COLLECTIONS[collection]
+        synced_at = datetime.now(timezone.utc).isoformat()
+        filters = {project_filter: self.project_id}
+        since_filter = SNAPSHOT_SINCE_FILTERS.get(collection)
+        since = self.synced_at.get(collection)
+        if since_filter and since:
+            filters[since_filter] = since
+        records = {record.id: record for record in getattr(self, collection)}
+        versions = {id: record_version(record) for id, record in records.items()}
+        listed = set()
+        async for page in project.iter_pages(collection, collection, **filters):
+            for data in page:
+                id = data["id"]
+                if data.get("deleted_at"):
+                    records.pop(id, None)
+                    continue
+                listed.add(id)
+                if versions.get(id) != record_version(data):
+                    record = project.parse_response(cls, data)
+                    if isinstance(record, DDB):
+                        project._bind(record)
+                    records[id] = record
+        if since_filter not in filters:
+            records = {id: r for id, r in records.items() if id in listed}
+        setattr(self, collection, list(records.values()))
+        self.synced_at[collection] = synced_at
+
+    def age(self, collection: str) -> Optional[float]:
+        """Seconds since a collection was synced, or None if it never was."""
+        synced_at = self.synced_at.get(collection)
+        if synced_at is None:
+            return None
+        return (
+            datetime.now(timezone.utc) - datetime.fromisoformat(synced_at)
+        ).total_seconds()
+
+    def update(self, collection: str, records: list):
+        """Merges records written by this client into a fetched collection."""
+        if collection not in self.synced_at:
+            return
+        merged = {record.id: record for record in getattr(self, collection)}
+        for record in records:
+            if record.deleted_at:
+                merged.pop(record.id, None)
+            else:
+                merged[record.id] = record
+        setattr(self, collection, list(merged.values()))
+
+    def update_revisions(self, revisions: Dict[str, Revision]):
+        """Sets the current revision of parameters this client revised."""
+        if not revisions or "parameters" not in self.synced_at:
+            return
+        self.parameters = [
+            (
+                parameter.copy(update={"revision": revisions[parameter.id]})
+                if parameter.id in revisions
+                else parameter
+            )
+            for parameter in self.parameters
+        ]
+
+    def save(self, path: Union[str, Path]):
+        Path(path).write_text(self.json(), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "ProjectSnapshot":
+        return cls.parse_file(path)
+
+
+class UploadPlan(BaseModel):
+    """Every write an upload to a project needs, worked out offline.
+
+    Built from a `ProjectSnapshot` and the new assets, sources and parameters.
+    Parents and sources shared between the inputs are resolved across the
+    whole upload: a parameter on a new asset that matches an existing one is
+    reconciled against that asset's parameters, and sources used by new
+    revisions are planned with the other sources.
+
+    A plan can be saved and loaded as JSON, and `execute` sends only the
+    writes it lists.
+
+    Attributes:
+        project_id (str): Project the plan was built for.
+        sources (SourcePlan): Sources to create or reuse.
+        assets (AssetUploadPlan): Assets to create, level by level.
+        parameters (ParameterPlan): Parameters to create or revise.
+    """
+
+    project_id: str
+    sources: SourcePlan
+    assets: AssetUploadPlan
+    parameters: ParameterPlan
+
+    @property
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "sources": self.sources.counts,
+            "assets": self.assets.counts,
+            "parameters": self.parameters.counts,
+        }
+
+    def __str__(self) -> str:
+        return str(
+            ", ".join(
+                f"{name.capitalize()}: {counts}" for name, counts in self.counts.items()
+            )
+        )
+
+    @classmethod
+    def build(
+        cls,
+        snapshot: ProjectSnapshot,
+        assets: Optional[List[NewAsset]] = None,
+        sources: Optional[List[NewSource]] = None,
+        parameters: Optional[List[NewParameter]] = None,
+    ) -> "UploadPlan":
+        assets = list(assets or [])
+        sources = list(sources or [])
+        parameters = list(parameters or [])
+
+        asset_plan = AssetUploadPlan.build(
+            assets + [p.parent for p in parameters if isinstance(p.parent, NewAsset)],
+            snapshot.assets,
+        )
+        source_plan = SourcePlan.build(
+            sources
+            + [
+                p.revision.source
+                for p in parameters
+                if p.revision and isinstance(p.revision.source, NewSource)
+            ],
+            snapshot.sources,
+        )
+        parameters = [
+            (
+                parameter.copy(update={"parent": asset_plan.resolve(parameter.parent)})
+                if isinstance(parameter.parent, NewAsset)
+                else parameter
+            )
+            for parameter in parameters
+        ]
+        return cls(
+            project_id=snapshot.project_id,
+            sources=source_plan,
+            assets=asset_plan,
+            parameters=ParameterPlan.build(parameters, snapshot.parameters),
+        )
+
+    def save(self, path: Union[str, Path]):
+        Path(path).write_text(self.json(), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "UploadPlan":
+        return cls.parse_file(path)
+
+    async def execute(self, project: Project, batch_size: int = 1000) -> dict:
+        """Sends the writes in the plan: sources, then assets, then parameters.
+
+        Returns:
+            A dict of the "sources" and "assets" the plan used or created.
+        """
+        if project.project_id != self.project_id:
+            raise ValueError(
+                f"Plan was built for project {self.project_id}, "
+                f"not {project.project_id}"
+            )
+        sources_by_key = await project.execute_source_plan(
+            self.sources, reference_id=project.project_id
+        )
+        project.update_snapshot("sources", list(sources_by_key.values()))
+        assets = await project.execute_asset_plan(
+            project, self.assets, batch_size=batch_size
+        )
+        await project.execute_parameter_plan(
+            project, self.parameters.with_sources(sources_by_key)
+        )
+        return {"sources": list(sources_by_key.values()), "assets": assets}
@@ -0,0 +1,348 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from pydantic import BaseModel
+from pyddb.ddb_decode import construct_trusted, loads
+
+FORMAT_VERSION = 1
+
+# Max host parameters per statement on older SQLite builds is 999
+QUERY_CHUNK_SIZE = 900
+
+ZDICT_SIZE = 32 * 1024
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE dictionaries (
+    tbl TEXT PRIMARY KEY,
+    zdict BLOB NOT NULL
+);
+"""
+
+TABLE_SCHEMA = """
+CREATE TABLE {table} (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    name TEXT,
+    updated_at TEXT,
+    deleted_at TEXT,
+    data BLOB NOT NULL
+);
+CREATE INDEX {table}_by_name ON {table} (name, seq);
+"""
+
+SYNC_STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_state (
+    tbl TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at TEXT NOT NULL
+);
+"""
+
+
+class CatalogError(Exception):
+    pass
+
+
+def table_identifier(table: str) -> str:
+    if not table.isidentifier() or table.startswith("sqlite_"):
+        raise CatalogError(f"Invalid catalog table name: {table!r}")
+    return table
+
+
+def record_json(record: BaseModel) -> bytes:
+    return json.dumps(record.dict(), separators=(",", ":")).encode("utf-8")
+
+
+def build_zdict(encoded: List[bytes]) -> bytes:
+    """Preset compression dictionary for a table, taken from its own records.
+
+    Records of one type share most of their keys and many values (units,
+    asset type groups, ...), so a shared dictionary compresses them far
+    better than compressing each small record on its own.
+    """
+    return b"".join(encoded)[-ZDICT_SIZE:]
+
+
+def compress(data: bytes, zdict: bytes) -> bytes:
+    compressor = zlib.compressobj(9, zdict=zdict)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decode_record(cls, data: bytes, zdict: bytes) -> BaseModel:
+    # Records are written by pyddb from validated models, so they are trusted
+    decompressor = zlib.decompressobj(zdict=zdict)
+    raw = decompressor.decompress(data) + decompressor.flush()
+    return construct_trusted(cls, loads(raw))
+
+
+def record_row(seq: int, record: BaseModel, encoded: bytes, zdict: bytes) -> tuple:
+    return (
+        seq,
+        record.id,
+        getattr(record, "name", None),
+        getattr(record, "updated_at", None),
+        getattr(record, "deleted_at", None),
+        compress(encoded, zdict),
+    )
+
+
+def chunks(items: List, size: int = QUERY_CHUNK_SIZE) -> Iterator[List]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class CatalogStore:
+    """Read access to a versioned SQLite catalog file.
+
+    Each type table is an SQL table with one compressed row per record,
+    indexed by id and by name, so a lookup only touches the pages it needs.
+    The file is opened read-only and memory-mapped, so processes reading the
+    same catalog share its pages through the OS page cache. Each thread gets
+    its own connection.
+
+    Args:
+        path (Path): Catalog file to read.
+        mmap_size (int): Bytes of the file to memory-map.
+    """
+
+    def __init__(self, path: Path, mmap_size: int = 64 * 1024 * 1024):
+        self.path = Path(path)
+        self.mmap_size = mmap_size
+        self._local = threading.local()
+        self._meta: Optional[Dict[str, str]] = None
+
+    def connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if not self.path.exists():
+                raise CatalogError(f"No catalog found at {self.path}")
+            connection = sqlite3.connect(
+                f"{self.path.resolve().as_uri()}?mode=ro", uri=True
+            )
+            connection.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            self._local.connection = connection
+        return connection
+
+    def close(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+        self._meta = None
+
+    @property
+    def meta(self) -> Dict[str, str]:
+        """Catalog metadata: format_version, environment and generated_at."""
+        if self._meta is None:
+            meta = dict(self.connection().execute("SELECT key, value FROM meta"))
+            version = int(meta.get("format_version", 0))
+            if version != FORMAT_VERSION:
+                raise CatalogError(
+                    f"Catalog format version {version} is not supported "
+                    f"(expected {FORMAT_VERSION}), regenerate the catalog."
+                )
+            self._meta = meta
+        return self._meta
+
+    def tables(self) -> List[str]:
+        self.meta
+        rows = self.connection().execute("SELECT tbl FROM dictionaries")
+        return [tbl for (tbl,) in rows]
+
+    def zdict(self, table: str) -> bytes:
+        self.meta
+        row = (
+            self.connection()
+            .execute("SELECT zdict FROM dictionaries WHERE tbl = ?", [table])
+            .fetchone()
+        )
+        if row is None:
+            raise CatalogError(f"Table {table!r} is not in the catalog at {self.path}")
+        return row[0]
+
+    def _select(self, table: str, sql: str, params: Iterable = ()) -> sqlite3.Cursor:
+        try:
+            return self.connection().execute(sql, list(params))
+        except sqlite3.OperationalError as error:
+            if "no such table" not in str(error):
+                raise
+            raise CatalogError(
+                f"Table {table!r} is not in the catalog at {self.path}"
+            ) from error
+
+    def rows_by_id(self, table: str, ids: List[str]) -> Iterator[Tuple[str, bytes]]:
+        table = table_identifier(table)
+        for chunk in chunks(ids):
+            yield from self._select(
+                table,
+                f"SELECT id, data FROM {table} WHERE id IN "
+                f"({','.join('?' * len(chunk))})",
+                chunk,
+            )
+
+    def rows_by_name(
+        self, table: str, names: List[str]
+    ) -> Iterator[Tuple[str, str, bytes]]:
+        """Rows matching the names, in stored order so the first duplicate comes first."""
+        table = table_identifier(table)
+        for chunk in chunks(names):
+            yield from self._select(
+                table,
+                f"SELECT name, id, data FROM {table} WHERE name IN "
+                f"({','.join('?' * len(chunk))}) ORDER BY seq",
+                chunk,
+            )
+
+    def versions(self, table: str) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """(updated_at, deleted_at) of every record in the table, by id."""
+        if table not in self.tables():
+            return {}
+        table = table_identifier(table)
+        rows = self.connection().execute(
+            f"SELECT id, updated_at, deleted_at FROM {table}"
+        )
+        return {id: (updated_at, deleted_at) for id, updated_at, deleted_at in rows}
+
+    def watermark(self, table: str) -> Optional[str]:
+        """Latest updated_at/deleted_at seen when the table was last synced."""
+        self.meta
+        connection = self.connection()
+        exists = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sync_state'"
+        ).fetchone()
+        if not exists:
+            return None
+        row = connection.execute(
+            "SELECT watermark FROM sync_state WHERE tbl = ?", [table]
+        ).fetchone()
+        return row[0] if row else None
+
+    def all_rows(self, table: str) -> Iterator[Tuple[str, bytes]]:
+        table = table_identifier(table)
+        yield from self._select(table, f"SELECT id, data FROM {table} ORDER BY seq")
+
+
+def write_catalog(
+    path: Path,
+    tables: Dict[str, Iterable[BaseModel]],
+    environment: str,
+    generated_at: Optional[str] = None,
+):
+    """Writes a complete catalog file.
+
+    The file is built next to `path` and moved into place atomically, so
+    readers never see a partially written catalog.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    generated_at = generated_at or datetime.now(timezone.utc).isoformat()
+    handle, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(handle)
+    try:
+        connection = sqlite3.connect(temp_path)
+        with connection:
+            connection.executescript(SCHEMA)
+            connection.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [
+                    ("format_version", str(FORMAT_VERSION)),
+                    ("environment", environment),
+                    ("generated_at", generated_at),
+                ],
+            )
+            for table, records in tables.items():
+                table = table_identifier(table)
+                records = list(records)
+                encoded = [record_json(record) for record in records]
+                zdict = build_zdict(encoded)
+                connection.executescript(TABLE_SCHEMA.format(table=table))
+                connection.execute(
+                    "INSERT INTO dictionaries VALUES (?, ?)", [table, zdict]
+                )
+                connection.executemany(
+                    f"INSERT OR REPLACE INTO {table} VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        record_row(seq, record, data, zdict)
+                        for seq, (record, data) in enumerate(zip(records, encoded))
+                    ),
+                )
+        connection.execute("VACUUM")
+        connection.close()
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def apply_changes(
+    path: Path,
+    table: str,
+    upserts: List[BaseModel],
+    deletions: List[str],
+    watermark: Optional[str],
+    synced_at: Optional[str] = None,
+):
+    """Merges changed records and tombstones into one table of a catalog file.
+
+    Updated records keep their position; new records are appended. The
+    table's sync watermark and the catalog's generation time are updated in
+    the same transaction, so readers see either all of a sync or none of it.
+    """
+    table = table_identifier(table)
+    synced_at = synced_at or datetime.now(timezone.utc).isoformat()
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            connection.executescript(SYNC_STATE_SCHEMA)
+            row = connection.execute(
+                "SELECT zdict FROM dictionaries WHERE tbl = ?", [table]
+            ).fetchone()
+            encoded = [record_json(record) for record in upserts]
+            if row is None:
+                zdict = build_zdict(encoded)
+                connection.executescript(TABLE_SCHEMA.format(table=table))
+                connection.execute(
+                    "INSERT INTO dictionaries VALUES (?, ?)", [table, zdict]
+                )
+            else:
+                zdict = row[0]
+            (next_seq,) = connection.execute(
+                f"SELECT COALESCE(MAX(seq), -1) + 1 FROM {table}"
+            ).fetchone()
+            connection.executemany(
+                f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET name = excluded.name, "
+                "updated_at = excluded.updated_at, deleted_at = excluded.deleted_at, "
+                "data = excluded.data",
+                (
+                    record_row(seq, record, data, zdict)
+                    for seq, (record, data) in enumerate(
+                        zip(upserts, encoded), start=next_seq
+                    )
+                ),
+            )
+            for chunk in chunks(deletions):
+                connection.execute(
+                    f"DELETE FROM {table} WHERE id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+            connection.execute(
+                "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?)",
+                [table, watermark, synced_at],
+            )
+            connection.execute(
+                "UPDATE meta SET value = ? WHERE key = 'generated_at'", [synced_at]
+            )
+    finally:
+        connection.close()
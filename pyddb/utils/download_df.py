@@ -1,8 +1,15 @@
+import asyncio
 import pandas as pd
 
 
 async def download_df(df: pd.DataFrame, name: str):
+    """Saves a DataFrame as `<name>.csv`, writing in a worker thread.
 
-    df.to_csv(f"{name}.csv", index=False)
+    To export project data without building a DataFrame first, use
+    `pyddb.utils.export_file.export_projects`.
+    """
+    await asyncio.get_running_loop().run_in_executor(
+        None, lambda: df.to_csv(f"{name}.csv", index=False)
+    )
     print(f"Dataframe saved as {name}.csv")
     return
@@ -0,0 +1,180 @@
+import asyncio
+import csv
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from pyddb.ddb_frames import (
+    ASSET_COLUMNS,
+    PARAMETER_COLUMNS,
+    SOURCE_COLUMNS,
+    ColumnSpec,
+    load_pandas,
+    path_reader,
+)
+from pyddb.models import DDB, SNAPSHOT_COLLECTIONS
+
+EXPORT_COLUMNS: Dict[str, List[ColumnSpec]] = {
+    "parameters": PARAMETER_COLUMNS,
+    "assets": ASSET_COLUMNS,
+    "sources": SOURCE_COLUMNS,
+}
+
+
+def flatten_page(page: List[dict], columns: List[ColumnSpec]) -> Dict[str, list]:
+    """Column lists for one page of JSON objects.
+
+    Values of text columns are written as strings, so that every page of an
+    export has the same column types whatever values it holds.
+    """
+    read = path_reader(tuple(path for _, path, _ in columns))
+    data = {}
+    for (name, _, dtype), values in zip(columns, read(page)):
+        if dtype != "datetime":
+            values = [
+                value if value is None or isinstance(value, str) else str(value)
+                for value in values
+            ]
+        data[name] = values
+    return data
+
+
+class CsvWriter:
+    """Appends pages of columns to a CSV file, writing the header once."""
+
+    def __init__(self, path: Path, columns: List[ColumnSpec]):
+        self.names = [name for name, _, _ in columns]
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.names)
+
+    def write(self, data: Dict[str, list]):
+        self.writer.writerows(zip(*(data[name] for name in self.names)))
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Appends pages of columns to a Parquet file, one row group per page.
+
+    Timestamps are stored as UTC timestamps and every other column as text.
+    """
+
+    def __init__(self, path: Path, columns: List[ColumnSpec]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "Writing Parquet files needs pyarrow, install pyddb[parquet]"
+            ) from e
+
+        self.pa = pa
+        self.columns = columns
+        self.schema = pa.schema(
+            [
+                (
+                    name,
+                    (
+                        pa.timestamp("us", tz="UTC")
+                        if dtype == "datetime"
+                        else pa.string()
+                    ),
+                )
+                for name, _, dtype in columns
+            ]
+        )
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def timestamps(self, values: list):
+        pa = self.pa
+        try:
+            return pa.array(values, pa.string()).cast(pa.timestamp("us", tz="UTC"))
+        except pa.ArrowInvalid:
+            pd = load_pandas()
+            parsed = pd.to_datetime(
+                pd.Series(values, dtype="object"), utc=True, errors="coerce"
+            )
+            return pa.array(parsed, pa.timestamp("us", tz="UTC"))
+
+    def write(self, data: Dict[str, list]):
+        arrays = [
+            (
+                self.timestamps(data[name])
+                if dtype == "datetime"
+                else self.pa.array(data[name], self.pa.string())
+            )
+            for name, _, dtype in self.columns
+        ]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def open_writer(path: Path, columns: List[ColumnSpec]):
+    if path.suffix.lower() == ".parquet":
+        return ParquetWriter(path, columns)
+    return CsvWriter(path, columns)
+
+
+async def export_projects(
+    ddb: DDB,
+    project_ids: List[str],
+    path: Union[str, Path],
+    collection: str = "parameters",
+    page_limit: int = 1000,
+    prefetch: int = 2,
+    **filters,
+) -> Dict[str, int]:
+    """Exports a collection of one or many projects to a CSV or Parquet file.
+
+    Pages are fetched ahead by `iter_pages`, flattened as they arrive and
+    appended to the file in a worker thread, while the next page is fetched
+    and flattened. Only a few pages are held at once, however many projects
+    are exported. Rows of every project go into the same file, with columns
+    as in the `get_*_frame` methods.
+
+    Args:
+        ddb (DDB): Client to fetch with.
+        project_ids (List[str]): Projects to export, in order.
+        path (Union[str, Path]): A .csv or .parquet file, which is overwritten.
+        collection (str): "parameters", "assets" or "sources".
+        page_limit (int): Objects requested per page.
+        prefetch (int): Pages fetched ahead of the one being written.
+        **filters: Further filters passed to the endpoint.
+
+    Returns:
+        Number of rows written for each project.
+    """
+    columns = EXPORT_COLUMNS[collection]
+    _, project_filter = SNAPSHOT_COLLECTIONS[collection]
+    loop = asyncio.get_running_loop()
+    writer = await loop.run_in_executor(None, open_writer, Path(path), columns)
+    pending: Optional[asyncio.Future] = None
+    rows: Dict[str, int] = {}
+    try:
+        for project_id in project_ids:
+            rows[project_id] = 0
+            async for page in ddb.iter_pages(
+                collection,
+                collection,
+                page_limit=page_limit,
+                prefetch=prefetch,
+                **{project_filter: project_id},
+                **filters,
+            ):
+                if not page:
+                    continue
+                data = flatten_page(page, columns)
+                rows[project_id] += len(page)
+                # Pages are appended in order, one write at a time
+                if pending is not None:
+                    await pending
+                pending = loop.run_in_executor(None, writer.write, data)
+        if pending is not None:
+            await pending
+    finally:
+        if pending is not None and not pending.done():
+            await asyncio.wait([pending])
+        await loop.run_in_executor(None, writer.close)
+    return rows
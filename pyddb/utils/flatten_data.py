@@ -1,3 +1,11 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON
+from pyddb.ddb_frames import load_pandas, path_reader
+from pyddb.models import DDB
+
+
 def flatten_data(y):
     out = {}
 
@@ -15,3 +23,114 @@ def flatten_data(y):
 
     flatten(y)
     return out
+
+
+def _is_model(type_: Any) -> bool:
+    return isinstance(type_, type) and issubclass(type_, BaseModel)
+
+
+def schema_columns(
+    cls: Type[BaseModel], list_items: int = 1
+) -> List[Tuple[str, Tuple[Any, ...]]]:
+    """Every leaf column of a model, as (name, path into its JSON object).
+
+    Nested models are expanded and lists of models give their first
+    `list_items` items, named like `flatten_data` names them, e.g.
+    `revision_values_0_value`. A model nested inside itself is not expanded
+    again, and fields a model inherits from `DDB` are left out.
+    """
+    columns = []
+
+    def walk(cls, prefix: str, path: tuple, ancestors: tuple):
+        skip = DDB.__fields__ if issubclass(cls, DDB) else {}
+        for name, field in cls.__fields__.items():
+            if name in skip:
+                continue
+            expand = _is_model(field.type_) and field.type_ not in ancestors
+            if expand and field.shape == SHAPE_SINGLETON:
+                walk(
+                    field.type_, f"{prefix}{name}_", path + (name,), ancestors + (cls,)
+                )
+            elif expand and field.shape == SHAPE_LIST:
+                for i in range(list_items):
+                    walk(
+                        field.type_,
+                        f"{prefix}{name}_{i}_",
+                        path + (name, i),
+                        ancestors + (cls,),
+                    )
+            else:
+                columns.append((f"{prefix}{name}", path + (name,)))
+
+    walk(cls, "", (), ())
+    return columns
+
+
+class Flattener:
+    """Flattens batches of JSON objects of one model into column lists.
+
+    The model's schema is turned once into a `PathReader`, which reads each
+    nested object of a record once however many columns come from it.
+    Every batch gives the same columns whatever the records hold.
+
+    Use `compile_flattener` to get one, rather than building it directly.
+
+    Args:
+        columns (List[Tuple[str, Tuple[Any, ...]]]): Columns to read, as
+            given by `schema_columns`.
+    """
+
+    def __init__(self, columns: List[Tuple[str, Tuple[Any, ...]]]):
+        self.columns = [name for name, _ in columns]
+        self._read = path_reader(tuple(path for _, path in columns))
+
+    def __call__(self, records: Iterable[dict]) -> Dict[str, list]:
+        return dict(zip(self.columns, self._read(records)))
+
+    def to_frame(self, records: Iterable[dict]):
+        return load_pandas().DataFrame(self(records), columns=self.columns)
+
+
+@lru_cache(maxsize=None)
+def _compile(
+    cls: Type[BaseModel], fields: Optional[Tuple[str, ...]], list_items: int
+) -> Flattener:
+    columns = schema_columns(cls, list_items)
+    if fields is not None:
+        by_name = dict(columns)
+        unknown = [
+            field
+            for field in fields
+            if field not in by_name
+            and not any(name.startswith(f"{field}_") for name in by_name)
+        ]
+        if unknown:
+            raise ValueError(f"Unknown {cls.__name__} fields: {', '.join(unknown)}")
+        columns = [
+            (name, path)
+            for name, path in columns
+            if any(name == field or name.startswith(f"{field}_") for field in fields)
+        ]
+    return Flattener(columns)
+
+
+def compile_flattener(
+    cls: Type[BaseModel],
+    fields: Optional[Iterable[str]] = None,
+    list_items: int = 1,
+) -> Flattener:
+    """Flattener for JSON objects of a model, such as `Parameter`, `Asset` or `Source`.
+
+    Compiled flatteners are cached, so this is cheap to call per batch.
+
+    Args:
+        cls (Type[BaseModel]): Model whose JSON objects are flattened.
+        fields (Iterable[str]): Columns to read, by full name or by the name of
+            a nested object, e.g. ["id", "revision_values_0_value",
+            "parameter_type"]. All columns by default.
+        list_items (int): Items read from each list of objects.
+
+    Raises:
+        ValueError: If a field is not in the model's schema.
+    """
+    return _compile(cls, tuple(fields) if fields is not None else None, list_items)
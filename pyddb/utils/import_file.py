@@ -0,0 +1,397 @@
+import asyncio
+import math
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
+from pydantic import BaseModel
+from pyddb.ddb_frames import load_pandas
+from pyddb.ddb_query import MAX_QUERY_LENGTH, PAGING_LENGTH, chunk_filters
+from pyddb.models import (
+    SNAPSHOT_MAX_AGE,
+    Asset,
+    AssetUploadPlan,
+    NewAsset,
+    NewParameter,
+    NewRevision,
+    NewSource,
+    Parameter,
+    Project,
+    ProjectSnapshot,
+    UploadPlan,
+    parameter_key,
+)
+from pyddb.utils.read_data import Catalog, catalog as default_catalog
+
+
+class ImportColumns(BaseModel):
+    """Names of the file columns an import reads.
+
+    Each row is one parameter. Its asset is given by one column per level of
+    the asset hierarchy, named after the asset type of that level and holding
+    the asset's name, from the root down. The parameter belongs to the
+    deepest asset named in the row, or to the project if none is.
+
+    Attributes:
+        asset_types (List[str]): Asset type names of each level, from the root
+            down, e.g. ["site", "building"].
+    """
+
+    asset_types: List[str] = []
+    parameter_type: str = "parameter_type"
+    value: str = "value"
+    unit: str = "unit"
+    source_type: str = "source_type"
+    source_title: str = "source_title"
+    source_reference: str = "source_reference"
+    comment: str = "comment"
+    location_in_source: str = "location_in_source"
+
+
+class RowError(BaseModel):
+    """A row that was not imported. Rows are numbered from 1, after the header."""
+
+    row: int
+    message: str
+
+    def __str__(self) -> str:
+        return str(f"Row {self.row}: {self.message}")
+
+
+class ImportProgress(BaseModel):
+    """Running totals of an import, with the errors of the latest chunk."""
+
+    chunks: int = 0
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_failed: int = 0
+    assets_created: int = 0
+    parameters_created: int = 0
+    parameters_revised: int = 0
+    errors: List[RowError] = []
+
+    def __str__(self) -> str:
+        return str(
+            f"Chunks: {self.chunks}, Rows read: {self.rows_read}, "
+            f"Imported: {self.rows_imported}, Failed: {self.rows_failed}, "
+            f"Assets created: {self.assets_created}, "
+            f"Parameters created: {self.parameters_created}, "
+            f"Parameters revised: {self.parameters_revised}"
+        )
+
+
+def read_chunks(path: Union[str, Path], chunk_size: int) -> Iterator[List[dict]]:
+    """Reads a CSV or Parquet file as lists of row dicts, one chunk at a time."""
+    path = Path(path)
+    if path.suffix.lower() == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "Reading Parquet files needs pyarrow, install pyddb[parquet]"
+            ) from e
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+    else:
+        for frame in load_pandas().read_csv(
+            path, chunksize=chunk_size, dtype=str, keep_default_na=False
+        ):
+            yield frame.to_dict("records")
+
+
+def cell(row: dict, column: str) -> Optional[Any]:
+    """Value of a cell, with blanks, NaN and missing columns read as None."""
+    value = row.get(column)
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class RowBuilder:
+    """Turns rows into new records, resolving type names through the catalog.
+
+    Assets are kept by their path of names, so rows naming the same asset
+    share one record, and an asset created by an earlier chunk is replaced by
+    the stored asset once that chunk has been posted.
+    """
+
+    def __init__(self, columns: ImportColumns, catalog: Catalog):
+        self.columns = columns
+        self.catalog = catalog
+        asset_types = self.lookup("asset_types", columns.asset_types)
+        missing = [name for name in columns.asset_types if asset_types[name] is None]
+        if missing:
+            raise ValueError(f"Unknown asset types: {', '.join(missing)}")
+        self.asset_types = [asset_types[name] for name in columns.asset_types]
+        self.assets: Dict[Tuple[str, ...], Union[Asset, NewAsset]] = {}
+
+    def lookup(self, table: str, names: List[Any]) -> Dict[str, Any]:
+        names = list({str(name) for name in names if name is not None})
+        return dict(zip(names, self.catalog.table(table).get_many_by_name(names)))
+
+    def asset(self, path: Tuple[str, ...]) -> Union[Asset, NewAsset]:
+        asset = self.assets.get(path)
+        if asset is None:
+            asset = self.assets[path] = NewAsset(
+                asset_type=self.asset_types[len(path) - 1],
+                name=path[-1],
+                parent=self.asset(path[:-1]) if len(path) > 1 else None,
+            )
+        return asset
+
+    def build(
+        self, rows: List[dict], first_row: int
+    ) -> Tuple[List[Tuple[int, NewParameter]], List[RowError]]:
+        """New parameters for the rows of one chunk, by row number, and row errors."""
+        columns = self.columns
+        parameter_types = self.lookup(
+            "parameter_types", [cell(row, columns.parameter_type) for row in rows]
+        )
+        units = self.lookup("units", [cell(row, columns.unit) for row in rows])
+        source_types = self.lookup(
+            "source_types", [cell(row, columns.source_type) for row in rows]
+        )
+
+        parameters, errors = [], []
+        for number, row in enumerate(rows, start=first_row):
+            try:
+                parameters.append(
+                    (number, self.parameter(row, parameter_types, units, source_types))
+                )
+            except ValueError as e:
+                errors.append(RowError(row=number, message=str(e)))
+        return parameters, errors
+
+    def parameter(
+        self,
+        row: dict,
+        parameter_types: Dict[str, Any],
+        units: Dict[str, Any],
+        source_types: Dict[str, Any],
+    ) -> NewParameter:
+        columns = self.columns
+        name = cell(row, columns.parameter_type)
+        if name is None:
+            raise ValueError("No parameter type")
+        parameter_type = parameter_types[str(name)]
+        if parameter_type is None:
+            raise ValueError(f"Unknown parameter type {name!r}")
+
+        path: Tuple[str, ...] = ()
+        for level in columns.asset_types:
+            asset_name = cell(row, level)
+            if asset_name is None:
+                break
+            path += (str(asset_name),)
+        parent = self.asset(path) if path else None
+
+        value = cell(row, columns.value)
+        if value is None:
+            return NewParameter(parameter_type=parameter_type, parent=parent)
+
+        unit = None
+        unit_name = cell(row, columns.unit)
+        if unit_name is not None:
+            unit = units[str(unit_name)]
+            if unit is None:
+                raise ValueError(f"Unknown unit {unit_name!r}")
+
+        source_type_name = cell(row, columns.source_type)
+        title = cell(row, columns.source_title)
+        reference = cell(row, columns.source_reference)
+        if source_type_name is None or title is None or reference is None:
+            raise ValueError("A value needs a source type, title and reference")
+        source_type = source_types[str(source_type_name)]
+        if source_type is None:
+            raise ValueError(f"Unknown source type {source_type_name!r}")
+
+        revision = NewRevision(
+            value=value,
+            unit=unit,
+            source=NewSource(
+                source_type=source_type, title=str(title), reference=str(reference)
+            ),
+            comment=cell(row, columns.comment) or "Empty",
+            location_in_source=cell(row, columns.location_in_source) or "Empty",
+        )
+        return NewParameter(
+            parameter_type=parameter_type, parent=parent, revision=revision
+        )
+
+    def posted(self, plan: UploadPlan, assets: List[Asset]):
+        """Replaces new assets with the assets they were matched or posted as."""
+        by_id = {asset.id: asset for asset in assets}
+        for path, asset in self.assets.items():
+            if isinstance(asset, NewAsset):
+                resolved = plan.assets.resolve(asset)
+                self.assets[path] = by_id.get(str(resolved.id), asset)
+
+
+async def chunk_snapshot(
+    project: Project, parameters: List[NewParameter]
+) -> ProjectSnapshot:
+    """Snapshot to plan one chunk against.
+
+    It holds the project's cached assets and sources, but only the existing
+    parameters that the chunk's parameters could match: those of the same
+    parameter type on the same parent. They are fetched for each chunk, and
+    not kept in the project's snapshot, so they do not pile up over a file.
+    """
+    snapshot = await project.get_snapshot("assets", "sources", max_age=SNAPSHOT_MAX_AGE)
+    assets = AssetUploadPlan.build(
+        [p.parent for p in parameters if isinstance(p.parent, NewAsset)],
+        snapshot.assets,
+    )
+    keys = set()
+    for parameter in parameters:
+        parent = assets.resolve(parameter.parent)
+        if not isinstance(parent, NewAsset):
+            keys.add((parameter.parameter_type.id, parent.id if parent else None))
+    # A chunk can hold thousands of types, too many ids for one URL
+    queries = chunk_filters(
+        (
+            {"parameter_type_id": type_id}
+            for type_id in {type_id for type_id, _ in keys}
+        ),
+        fixed={"project_id": project.project_id},
+        max_length=MAX_QUERY_LENGTH - PAGING_LENGTH,
+    )
+
+    async def matching(query: dict) -> List[Parameter]:
+        return [
+            parameter
+            async for parameter in project.iter_parameters(**query)
+            if parameter_key(parameter) in keys
+        ]
+
+    pages = await asyncio.gather(*[matching(query) for query in queries])
+    return ProjectSnapshot(
+        project_id=snapshot.project_id,
+        taken_at=snapshot.taken_at,
+        assets=snapshot.assets,
+        sources=snapshot.sources,
+        parameters=[parameter for page in pages for parameter in page],
+        synced_at=snapshot.synced_at,
+    )
+
+
+_DONE = object()
+
+
+async def stream_import(
+    project: Project,
+    path: Union[str, Path],
+    columns: Optional[ImportColumns] = None,
+    chunk_size: int = 5000,
+    buffer_chunks: int = 2,
+    batch_size: int = 1000,
+    catalog: Optional[Catalog] = None,
+) -> AsyncIterator[ImportProgress]:
+    """Imports a CSV or Parquet file into a project, one chunk at a time.
+
+    The file is read in chunks of `chunk_size` rows in a worker thread, into
+    a queue that holds at most `buffer_chunks` chunks, so reading runs ahead
+    of posting without the whole file being loaded. Names are resolved
+    through the local catalog, and each chunk is planned against a
+    `chunk_snapshot` and posted with `UploadPlan`, through the batched write
+    paths. Memory use depends on the chunk size and the number of distinct
+    assets and sources, not on the number of rows.
+
+    A row whose names cannot be resolved is skipped and reported; if posting
+    a chunk fails, every row in it is reported and the import carries on.
+
+    Args:
+        project (Project): Project to import into.
+        path (Union[str, Path]): A .csv or .parquet file.
+        columns (ImportColumns): Columns to read, by default the
+            `ImportColumns` defaults with parameters on the project.
+        chunk_size (int): Rows per chunk.
+        buffer_chunks (int): Chunks read ahead of the one being posted.
+        batch_size (int): Assets per request.
+        catalog (Catalog): Catalog to resolve names in, the packaged one by
+            default.
+
+    Yields:
+        The progress after each chunk, with that chunk's row errors.
+    """
+    builder = RowBuilder(columns or ImportColumns(), catalog or default_catalog)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_chunks)
+
+    async def read():
+        loop = asyncio.get_running_loop()
+        chunks = read_chunks(path, chunk_size)
+        reading = None
+        try:
+            while True:
+                reading = loop.run_in_executor(None, next, chunks, _DONE)
+                # Shielded so that cancelling leaves the read to finish below
+                chunk = await asyncio.shield(reading)
+                await queue.put(chunk)
+                if chunk is _DONE:
+                    return
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            # A generator cannot be closed while next() runs in the worker
+            if reading is not None and not reading.done():
+                await asyncio.wait([reading])
+            chunks.close()
+
+    reader = asyncio.ensure_future(read())
+    progress = ImportProgress()
+    try:
+        while True:
+            rows = await queue.get()
+            if rows is _DONE:
+                break
+            if isinstance(rows, Exception):
+                raise rows
+
+            first_row = progress.rows_read + 1
+            progress.chunks += 1
+            progress.rows_read += len(rows)
+            parameters, errors = builder.build(rows, first_row)
+            if parameters:
+                try:
+                    new_parameters = [p for _, p in parameters]
+                    plan = UploadPlan.build(
+                        await chunk_snapshot(project, new_parameters),
+                        parameters=new_parameters,
+                    )
+                    result = await plan.execute(project, batch_size=batch_size)
+                    builder.posted(plan, result["assets"])
+                    progress.assets_created += plan.assets.counts["create"]
+                    progress.parameters_created += len(plan.parameters.create)
+                    progress.parameters_revised += len(plan.parameters.revise)
+                except Exception as e:
+                    errors += [
+                        RowError(row=number, message=f"Not posted: {e!r}")
+                        for number, _ in parameters
+                    ]
+                    parameters = []
+            errors.sort(key=lambda error: error.row)
+            progress.rows_imported += len(parameters)
+            progress.rows_failed += len(errors)
+            progress.errors = errors
+            yield progress.copy()
+    finally:
+        reader.cancel()
+        await asyncio.wait([reader])
+
+
+async def import_file(
+    project: Project, path: Union[str, Path], **kwargs
+) -> ImportProgress:
+    """Imports a file with `stream_import`, printing progress and row errors.
+
+    Returns:
+        The totals of the import.
+    """
+    progress = ImportProgress()
+    async for progress in stream_import(project, path, **kwargs):
+        for error in progress.errors:
+            print(error)
+        print(progress)
+    return progress
@@ -1,121 +1,252 @@
 import pickle
-from typing import List
-from pyddb import ParameterType, AssetType, SourceType, Unit, Tag, ItemType
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+from pyddb import (
+    models,
+    ParameterType,
+    AssetType,
+    SourceType,
+    Unit,
+    Tag,
+    ItemType,
+    UnitType,
+    UnitSystem,
+    TagType,
+)
+from pyddb.utils.catalog_store import CatalogStore, decode_record
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+CATALOG_PATH = DATA_DIR / "catalog.sqlite"
+
+TABLE_MODELS = {
+    "source_types": SourceType,
+    "parameter_types": ParameterType,
+    "asset_types": AssetType,
+    "unit_types": UnitType,
+    "unit_systems": UnitSystem,
+    "units": Unit,
+    "tags": Tag,
+    "tag_types": TagType,
+    "item_types": ItemType,
+}
+
+
+class CatalogUnpickler(pickle.Unpickler):
+    """Unpickles legacy .dat catalog files, mapping classes pickled from older
+    module layouts (e.g. `models.unit.Unit`) onto the current pyddb models."""
+
+    def find_class(self, module, name):
+        if module.split(".")[0] in ("models", "pyddb") and hasattr(models, name):
+            return getattr(models, name)
+        return super().find_class(module, name)
+
+
+def read_legacy_data(path: Path) -> List[Any]:
+    with open(path, "rb") as f:
+        return CatalogUnpickler(f).load()
 
 
 def read_data(filename):
-
-    PIK = f"data/{filename}.dat"
-
-    with open(PIK, "rb") as f:
-        return pickle.load(f)
+    return catalog.table(filename).records
+
+
+class TypeTable:
+    """One type table of the catalog, looked up by id or by name.
+
+    Records are decoded from the catalog only when first requested and then
+    kept in memory. Where names are duplicated, the first record wins, as
+    with a linear scan.
+    """
+
+    def __init__(self, store: CatalogStore, name: str):
+        self.store = store
+        self.name = name
+        self.cls = TABLE_MODELS[name]
+        self._by_id: Dict[str, Any] = {}
+        self._by_name: Dict[str, Any] = {}
+        self._records: Optional[List[Any]] = None
+        self._zdict: Optional[bytes] = None
+        self._lock = threading.Lock()
+
+    def _decode(self, id: str, data: bytes) -> Any:
+        record = self._by_id.get(id)
+        if record is None:
+            if self._zdict is None:
+                self._zdict = self.store.zdict(self.name)
+            record = self._by_id[id] = decode_record(self.cls, data, self._zdict)
+        return record
+
+    @property
+    def records(self) -> List[Any]:
+        """Every record in the table, in stored order."""
+        if self._records is None:
+            with self._lock:
+                self._records = [
+                    self._decode(id, data)
+                    for id, data in self.store.all_rows(self.name)
+                ]
+        return self._records
+
+    def get_by_id(self, id: str) -> Optional[Any]:
+        return self.get_many_by_id([id])[0]
+
+    def get_by_name(self, name: str) -> Optional[Any]:
+        return self.get_many_by_name([name])[0]
+
+    def get_many_by_id(self, ids: List[str]) -> List[Optional[Any]]:
+        by_id = self._by_id
+        missing = list({id for id in ids if id not in by_id})
+        if missing:
+            with self._lock:
+                for id, data in self.store.rows_by_id(self.name, missing):
+                    self._decode(id, data)
+        return [by_id.get(id) for id in ids]
+
+    def get_many_by_name(self, names: List[str]) -> List[Optional[Any]]:
+        by_name = self._by_name
+        missing = list({name for name in names if name not in by_name})
+        if missing:
+            with self._lock:
+                for name, id, data in self.store.rows_by_name(self.name, missing):
+                    if name not in by_name:
+                        by_name[name] = self._decode(id, data)
+        return [by_name.get(name) for name in names]
+
+
+class Catalog:
+    """Process-wide registry of the type tables in a catalog file.
+
+    Lookups only read the records they need from the catalog, and every
+    record is decoded at most once per process.
+    """
+
+    def __init__(self, path: Path = CATALOG_PATH):
+        self.path = path
+        self.store = CatalogStore(path)
+        self._tables: Dict[str, TypeTable] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def environment(self) -> str:
+        return self.store.meta["environment"]
+
+    @property
+    def generated_at(self) -> str:
+        return self.store.meta["generated_at"]
+
+    def table(self, name: str) -> TypeTable:
+        table = self._tables.get(name)
+        if table is None:
+            with self._lock:
+                table = self._tables.setdefault(name, TypeTable(self.store, name))
+        return table
+
+    def clear(self):
+        """Drops decoded records and connections so the file is re-read on next use."""
+        with self._lock:
+            self._tables.clear()
+            self.store.close()
+
+    def use(self, path: Union[str, Path]):
+        """Reads types from the catalog file at `path` from now on.
+
+        For catalogs refreshed into a writable location, as the packaged one
+        may be read-only.
+        """
+        with self._lock:
+            self._tables.clear()
+            self.store.close()
+            self.path = Path(path)
+            self.store = CatalogStore(self.path)
+
+
+catalog = Catalog()
 
 
 def get_parameter_types_by_name(names: List[str]) -> List[ParameterType]:
-    data = read_data("parameter_types")
-    return [next((x for x in data if x.name == name), None) for name in names]
+    return catalog.table("parameter_types").get_many_by_name(names)
 
 
 def get_parameter_types_by_id(ids: List[str]) -> List[ParameterType]:
-    data = read_data("parameter_types")
-    return [next((x for x in data if x.id == id), None) for id in ids]
+    return catalog.table("parameter_types").get_many_by_id(ids)
 
 
 def get_asset_types_by_name(names: List[str]) -> List[AssetType]:
-    data = read_data("asset_types")
-    return [next((x for x in data if x.name == name), None) for name in names]
+    return catalog.table("asset_types").get_many_by_name(names)
 
 
 def get_asset_types_by_id(ids: List[str]) -> List[AssetType]:
-    data = read_data("asset_types")
-    return [next((x for x in data if x.id == id), None) for id in ids]
+    return catalog.table("asset_types").get_many_by_id(ids)
 
 
 def get_source_types_by_name(names: List[str]) -> List[SourceType]:
-    data = read_data("source_types")
-    return [next((x for x in data if x.name == name), None) for name in names]
+    return catalog.table("source_types").get_many_by_name(names)
 
 
 def get_source_types_by_id(ids: List[str]) -> List[SourceType]:
-    data = read_data("source_types")
-    return [next((x for x in data if x.id == id), None) for id in ids]
+    return catalog.table("source_types").get_many_by_id(ids)
 
 
 def get_units_by_name(names: List[str]) -> List[Unit]:
-    data = read_data("units")
-    return [next((x for x in data if x.name == name), None) for name in names]
+    return catalog.table("units").get_many_by_name(names)
 
 
 def get_units_by_id(ids: List[str]) -> List[Unit]:
-    data = read_data("units")
-    return [next((x for x in data if x.id == id), None) for id in ids]
+    return catalog.table("units").get_many_by_id(ids)
 
 
 def get_tags_by_name(names: List[str]) -> List[Tag]:
-    data = read_data("tags")
-    return [next((x for x in data if x.name == name), None) for name in names]
+    return catalog.table("tags").get_many_by_name(names)
 
 
 def get_tags_by_id(ids: List[str]) -> List[Tag]:
-    data = read_data("tags")
-    return [next((x for x in data if x.id == id), None) for id in ids]
+    return catalog.table("tags").get_many_by_id(ids)
 
 
 def get_parameter_type_by_name(name: str) -> ParameterType:
-    data = read_data("parameter_types")
-    return next((x for x in data if x.name == name), None)
+    return catalog.table("parameter_types").get_by_name(name)
 
 
 def get_parameter_type_by_id(id: str) -> ParameterType:
-    data = read_data("parameter_types")
-    return next((x for x in data if x.id == id), None)
+    return catalog.table("parameter_types").get_by_id(id)
 
 
 def get_asset_type_by_name(name: str) -> AssetType:
-    data = read_data("asset_types")
-    return next((x for x in data if x.name == name), None)
+    return catalog.table("asset_types").get_by_name(name)
 
 
 def get_asset_type_by_id(id: str) -> AssetType:
-    data = read_data("asset_types")
-    return next((x for x in data if x.id == id), None)
+    return catalog.table("asset_types").get_by_id(id)
 
 
 def get_source_type_by_name(name: str) -> SourceType:
-    data = read_data("source_types")
-    return next((x for x in data if x.name == name), None)
+    return catalog.table("source_types").get_by_name(name)
 
 
 def get_source_type_by_id(id: str) -> SourceType:
-    data = read_data("source_types")
-    return next((x for x in data if x.id == id), None)
+    return catalog.table("source_types").get_by_id(id)
 
 
 def get_unit_by_name(name: str) -> Unit:
-    data = read_data("units")
-    return next((x for x in data if x.name == name), None)
+    return catalog.table("units").get_by_name(name)
 
 
 def get_unit_by_id(id: str) -> Unit:
-    data = read_data("units")
-    return next((x for x in data if x.id == id), None)
+    return catalog.table("units").get_by_id(id)
 
 
 def get_tag_by_name(name: str) -> Tag:
-    data = read_data("tags")
-    return next((x for x in data if x.name == name), None)
+    return catalog.table("tags").get_by_name(name)
 
 
 def get_tag_by_id(id: str) -> Tag:
-    data = read_data("tags")
-    return next((x for x in data if x.id == id), None)
+    return catalog.table("tags").get_by_id(id)
 
 
 def get_item_types_by_id(ids: List[str]) -> List[ItemType]:
-    data = read_data("item_types")
-    return [next((x for x in data if x.id == id), None) for id in ids]
+    return catalog.table("item_types").get_many_by_id(ids)
 
 
 def get_item_type_by_id(id: str) -> ItemType:
-    data = read_data("item_types")
-    return next((x for x in data if x.id == id), None)
+    return catalog.table("item_types").get_by_id(id)
@@ -1,10 +1,168 @@
-from pyddb.models import DDB, BaseURL
-from pyddb.utils.write_data import write_data
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel
+from pyddb.models import DDB, BaseURL, collect
+from pyddb.utils.catalog_store import CatalogError, CatalogStore, apply_changes
+from pyddb.utils.read_data import (
+    CATALOG_PATH,
+    TABLE_MODELS,
+    TypeTable,
+    catalog,
+)
+from pyddb.utils.write_data import write_tables
 import asyncio
 
+# Filter each endpoint accepts for "changed since", where the API supports one.
+# None of the type endpoints document such a filter today, so every table is
+# diffed locally against the versions stored in the catalog.
+SINCE_FILTERS: Dict[str, Optional[str]] = {table: None for table in TABLE_MODELS}
 
-async def regenerate_all_types():
+
+class SyncResult(BaseModel):
+    table: str
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    missing: int = 0
+    watermark: Optional[str]
+
+    def __str__(self) -> str:
+        return str(
+            f"{self.table}: {self.inserted} inserted, {self.updated} updated, "
+            f"{self.deleted} deleted, {self.unchanged} unchanged, "
+            f"{self.missing} missing"
+        )
+
+
+async def sync_table(
+    ddb: DDB,
+    table: str,
+    path: Path = CATALOG_PATH,
+    page_limit: int = 1000,
+    lock: Optional[asyncio.Lock] = None,
+) -> SyncResult:
+    """Brings one catalog table up to date with the API.
+
+    Records are compared with the catalog by (updated_at, deleted_at), and
+    only new or changed records are parsed and written. Only records that
+    come back with deleted_at set are removed. Records that are no longer
+    listed are kept and counted as missing, since a listing cut short would
+    otherwise empty the table; a full regenerate drops them. When the
+    endpoint supports a "changed since" filter, only records changed after
+    the stored watermark are requested.
+
+    Args:
+        lock (asyncio.Lock): Held while writing to the catalog, so that
+            tables synced concurrently write one at a time.
+    """
+    cls = TABLE_MODELS[table]
+    store = CatalogStore(path)
+    try:
+        versions = store.versions(table)
+        watermark = store.watermark(table)
+        since_filter = SINCE_FILTERS.get(table)
+        filters = {since_filter: watermark} if since_filter and watermark else {}
+        tracks_updates = "updated_at" in cls.__fields__
+        # Compared by content, read through the same connection
+        stored = TypeTable(store, table) if versions and not tracks_updates else None
+
+        result = SyncResult(table=table, watermark=watermark)
+        upserts: List[BaseModel] = []
+        deletions: List[str] = []
+        seen = set()
+        async for page in ddb.iter_pages(
+            table, table, page_limit=page_limit, **filters
+        ):
+            for data in page:
+                id = data["id"]
+                seen.add(id)
+                updated_at, deleted_at = data.get("updated_at"), data.get("deleted_at")
+                for timestamp in (updated_at, deleted_at):
+                    if timestamp and (
+                        result.watermark is None or timestamp > result.watermark
+                    ):
+                        result.watermark = timestamp
+                if deleted_at:
+                    if id in versions:
+                        deletions.append(id)
+                    continue
+                if id not in versions:
+                    upserts.append(cls.parse_obj(data))
+                    result.inserted += 1
+                elif tracks_updates and versions[id] == (updated_at, deleted_at):
+                    result.unchanged += 1
+                else:
+                    record = cls.parse_obj(data)
+                    if stored is not None and stored.get_by_id(id) == record:
+                        result.unchanged += 1
+                    else:
+                        upserts.append(record)
+                        result.updated += 1
+        if not filters:
+            result.missing = len([id for id in versions if id not in seen])
+        result.deleted = len(deletions)
+    finally:
+        store.close()
+
+    if upserts or deletions or result.watermark != watermark:
+        async with lock or asyncio.Lock():
+            await asyncio.get_running_loop().run_in_executor(
+                None, apply_changes, path, table, upserts, deletions, result.watermark
+            )
+    return result
+
+
+async def sync_all_types(
+    ddb: Optional[DDB] = None, path: Path = CATALOG_PATH
+) -> List[SyncResult]:
+    """Incrementally refreshes every table of an existing catalog.
+
+    Raises:
+        CatalogError: If there is no catalog at `path` or it was generated
+            from a different environment than `ddb`.
+    """
+    ddb = ddb or DDB(url=BaseURL.sandbox)
+    store = CatalogStore(path)
+    environment = store.meta["environment"]
+    store.close()
+    if environment != BaseURL(ddb.url).name:
+        raise CatalogError(
+            f"Catalog was generated from {environment}, not {BaseURL(ddb.url).name}"
+        )
+    # Tables are fetched concurrently but SQLite takes one writer at a time
+    lock = asyncio.Lock()
+    results = await asyncio.gather(
+        *[sync_table(ddb, table, path, lock=lock) for table in TABLE_MODELS]
+    )
+    if path == catalog.path:
+        catalog.clear()
+    return results
+
+
+async def regenerate_all_types(
+    incremental: bool = True, path: Union[str, Path] = CATALOG_PATH
+):
+    """Refreshes a type catalog from the sandbox environment.
+
+    By default only changes since the last sync are merged into the existing
+    catalog; a full download is made if there is no usable catalog yet.
+
+    Args:
+        incremental (bool): Merge changes into the existing catalog.
+        path (Union[str, Path]): Catalog file to refresh. Defaults to the
+            packaged catalog; pass a writable path for installed packages.
+    """
     ddb = DDB(url=BaseURL.sandbox)
+    path = Path(path)
+
+    if incremental:
+        try:
+            for result in await sync_all_types(ddb, path):
+                print(result)
+            return
+        except CatalogError as error:
+            print(f"{error}, downloading all types...")
 
     (
         source_types,
@@ -25,24 +183,25 @@ async def regenerate_all_types():
         ddb.get_units(),
         ddb.get_tags(),
         ddb.get_tag_types(),
-        ddb.get_item_types(page_limit=99999),
+        collect(ddb.iter_item_types()),
     )
 
-    # await write_data("source_types", data={1: 2})
-
-    await asyncio.gather(
-        write_data("source_types", source_types),
-        write_data("parameter_types", parameter_types),
-        write_data("asset_types", asset_types),
-        write_data("unit_types", unit_types),
-        write_data("unit_systems", unit_systems),
-        write_data("units", units),
-        write_data("tags", tags),
-        write_data("tag_types", tag_types),
-        write_data("item_types", item_types),
+    await write_tables(
+        {
+            "source_types": source_types,
+            "parameter_types": parameter_types,
+            "asset_types": asset_types,
+            "unit_types": unit_types,
+            "unit_systems": unit_systems,
+            "units": units,
+            "tags": tags,
+            "tag_types": tag_types,
+            "item_types": item_types,
+        },
+        environment=BaseURL(ddb.url).name,
+        path=path,
     )
 
 
 if __name__ == "__main__":
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(regenerate_all_types())
+    asyncio.run(regenerate_all_types())
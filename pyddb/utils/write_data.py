@@ -1,10 +1,69 @@
+import asyncio
 import pickle
+import warnings
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Dict, List, Union
+from pyddb.utils.catalog_store import write_catalog
+from pyddb.utils.read_data import (
+    CATALOG_PATH,
+    DATA_DIR,
+    TABLE_MODELS,
+    catalog,
+    read_legacy_data,
+)
+
+
+async def write_tables(
+    tables: Dict[str, List], environment: str, path: Union[str, Path]
+):
+    """Writes downloaded type tables to a catalog file at `path`.
+
+    Use a writable location for installed packages, then `catalog.use(path)`
+    to read types from it.
+    """
+    path = Path(path)
+    await asyncio.get_running_loop().run_in_executor(
+        None, write_catalog, path, tables, environment
+    )
+    if path == catalog.path:
+        catalog.clear()
 
 
 async def write_data(filename, data):
+    """Pickles one type table to data/<filename>.dat.
+
+    Deprecated: use `write_tables`, which writes every table to one catalog
+    file. Files written by this can be converted with `convert_legacy_data`.
+    """
+    warnings.warn(
+        "write_data(filename, data) is deprecated, use write_tables",
+        DeprecationWarning,
+        stacklevel=2,
+    )
     Path("data").mkdir(parents=True, exist_ok=True)
     PIK = f"data/{filename}.dat"
 
     with open(PIK, "wb") as f:
         pickle.dump(data, f)
+
+
+def convert_legacy_data(
+    data_dir: Path = DATA_DIR, environment: str = "sandbox", path: Path = CATALOG_PATH
+):
+    """Converts pickled <table>.dat files from older versions into a catalog file.
+
+    The files' latest modification time is used as the generation timestamp.
+    """
+    files = {
+        table: data_dir / f"{table}.dat"
+        for table in TABLE_MODELS
+        if (data_dir / f"{table}.dat").exists()
+    }
+    tables = {table: read_legacy_data(file) for table, file in files.items()}
+    generated_at = datetime.fromtimestamp(
+        max(file.stat().st_mtime for file in files.values()), timezone.utc
+    ).isoformat()
+    write_catalog(path, tables, environment, generated_at=generated_at)
+    if Path(path) == catalog.path:
+        catalog.clear()
@@ -15,7 +15,9 @@ setup(
     description=DESCRIPTION,
     long_description=LONG_DESCRIPTION,
     packages=find_packages(),
+    package_data={"pyddb": ["data/catalog.sqlite"]},
     install_requires=["pydantic", "aiohttp", "asyncio", "pandas", "ipykernel"],
+    extras_require={"fast": ["orjson"], "parquet": ["pyarrow"]},
     dependency_links=["https://github.com/arup-group/ddbpy_auth/tarball/master"],
     keywords=["python", "ddb", "digital", "design", "brief", "client", "api"],
     classifiers=[
@@ -0,0 +1,42 @@
+from pyddb.ddb_auth import TokenProvider
+import asyncio
+import pytest
+
+
+class FakeAuth:
+    def __init__(self, expires_in=3600):
+        self.expires_in = expires_in
+        self.calls = 0
+
+    def acquire_token(self):
+        self.calls += 1
+        return {"access_token": f"token-{self.calls}", "expires_in": self.expires_in}
+
+
+@pytest.mark.asyncio
+async def test_token_is_acquired_lazily_once():
+    auth = FakeAuth()
+    provider = TokenProvider(auth=auth)
+    assert auth.calls == 0
+    tokens = await asyncio.gather(*[provider.get_token() for _ in range(10)])
+    assert set(tokens) == {"token-1"}
+    assert auth.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_token_near_expiry_is_refreshed_in_background():
+    auth = FakeAuth(expires_in=60)
+    provider = TokenProvider(auth=auth, refresh_margin=120)
+    assert await provider.get_token() == "token-1"
+    assert await provider.get_token() == "token-1"
+    await asyncio.sleep(0.05)
+    assert await provider.get_token() == "token-2"
+
+
+@pytest.mark.asyncio
+async def test_invalidated_token_is_reacquired():
+    auth = FakeAuth()
+    provider = TokenProvider(auth=auth)
+    await provider.get_token()
+    provider.invalidate()
+    assert await provider.get_token() == "token-2"
@@ -0,0 +1,109 @@
+import asyncio
+import time
+from pyddb import ddb_batching
+from pyddb.ddb_batching import AdaptiveBatcher, payload_size
+from tests.fakes import FakeResponse
+import pytest
+
+
+def test_payload_size_counts_separator():
+    assert payload_size({"a": 1}) == len('{"a":1}') + 1
+
+
+@pytest.mark.asyncio
+async def test_batch_size_grows_while_healthy():
+    batcher = AdaptiveBatcher(batch_size=2, growth=2, concurrency=1)
+    sizes = []
+
+    async def send(batch):
+        sizes.append(len(batch))
+        return FakeResponse(201)
+
+    await batcher.run(list(range(30)), send)
+    assert sizes == [2, 4, 8, 16]
+    assert batcher.items == 30
+    assert batcher.batch_size == 32
+
+
+@pytest.mark.asyncio
+async def test_too_large_batches_are_split_and_resent():
+    batcher = AdaptiveBatcher(batch_size=8, concurrency=1, base_delay=0)
+    sent = []
+
+    async def send(batch):
+        if sum(payload_size(item) for item in batch) > 5:
+            return FakeResponse(413)
+        sent.extend(batch)
+        return FakeResponse(201)
+
+    responses = await batcher.run(list(range(8)), send)
+    assert sorted(sent) == list(range(8))
+    assert all(response.status == 201 for response in responses)
+    assert batcher.failures == 3
+    assert batcher.max_bytes == 5
+
+
+@pytest.mark.asyncio
+async def test_batches_are_cut_by_bytes():
+    item = "x" * 98
+    batcher = AdaptiveBatcher(
+        batch_size=100, max_bytes=3 * payload_size(item), concurrency=1
+    )
+    sizes = []
+
+    async def send(batch):
+        sizes.append(len(batch))
+        return FakeResponse(201)
+
+    await batcher.run([item] * 7, send)
+    assert sizes == [3, 3, 1]
+
+
+@pytest.mark.asyncio
+async def test_failure_returned_when_retries_exhausted():
+    batcher = AdaptiveBatcher(batch_size=1, max_retries=2, base_delay=0)
+
+    async def send(batch):
+        return FakeResponse(500)
+
+    [response] = await batcher.run([1], send)
+    assert response.status == 500
+    assert batcher.failures == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_wait_out_their_backoff(monkeypatch):
+    monkeypatch.setattr(ddb_batching, "backoff_delay", lambda *args: 0.05)
+    batcher = AdaptiveBatcher(batch_size=1, concurrency=2)
+    sent = []
+
+    async def send(batch):
+        sent.append((batch[0], time.monotonic()))
+        if sent == [(1, sent[0][1])]:
+            return FakeResponse(503)
+        return FakeResponse(201)
+
+    await batcher.run([1, 2, 3], send)
+    # The other worker sends 2 and 3 while 1 waits, not 1 again straight away
+    assert [item for item, _ in sent] == [1, 2, 3, 1]
+    assert sent[-1][1] - sent[0][1] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_first_error_cancels_the_other_batches():
+    batcher = AdaptiveBatcher(batch_size=1, concurrency=2)
+    cancelled = []
+
+    async def send(batch):
+        if batch == [1]:
+            raise ValueError("bad batch")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(batch)
+            raise
+        return FakeResponse(201)
+
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(batcher.run([1, 2], send), timeout=1)
+    assert cancelled == [[2]]
@@ -0,0 +1,132 @@
+from pyddb import DDBSession
+from pyddb.ddb_cache import CacheStore, MemoryStore, ResponseCache
+from tests.fakes import FakeResponse, FakeSession, ddb_with
+import asyncio
+import pytest
+
+
+class SourceTypes(FakeSession):
+    name = "Book"
+
+    async def respond(self, method, endpoint, params, json):
+        return FakeResponse(
+            200,
+            {
+                "source_types": [{"id": "s1", "name": self.name, "visible": True}],
+                "sources": [],
+            },
+        )
+
+
+def client(cache):
+    session = SourceTypes(cache=cache)
+    return ddb_with(session), session
+
+
+@pytest.mark.asyncio
+async def test_fresh_responses_are_served_from_memory():
+    ddb, session = client(ResponseCache())
+
+    first = await ddb.get_source_types(name=["Book", "Paper"])
+    second = await ddb.get_source_types(name=["Paper", "Book"])
+    await ddb.get_source_types(name="Report")
+
+    assert len(session.requests) == 2
+    assert first == second and first is not second
+    assert (session.cache.hits, session.cache.misses) == (1, 2)
+
+
+@pytest.mark.asyncio
+async def test_other_endpoints_are_not_cached():
+    ddb, session = client(ResponseCache())
+    await ddb.get_sources()
+    await ddb.get_sources()
+    assert len(session.requests) == 2
+    assert session.cache.misses == 0
+
+
+@pytest.mark.asyncio
+async def test_stale_responses_are_served_while_refreshed():
+    ddb, session = client(
+        ResponseCache(ttls={"source_types": 0}, stale_while_revalidate=60)
+    )
+    await ddb.get_source_types()
+    session.name = "Paper"
+
+    stale = await ddb.get_source_types()
+    assert stale[0].name == "Book"
+    assert session.cache.stale_hits == 1
+    await asyncio.sleep(0.01)
+    assert len(session.requests) == 2
+
+    session.cache.stale_while_revalidate = 0
+    assert (await ddb.get_source_types())[0].name == "Paper"
+    assert session.cache.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_an_endpoint():
+    ddb, session = client(ResponseCache())
+    await ddb.get_source_types()
+    session.cache.invalidate("units")
+    await ddb.get_source_types()
+    session.cache.invalidate("source_types")
+    await ddb.get_source_types()
+    assert len(session.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_writes_drop_the_collection_written_to():
+    ddb, session = client(ResponseCache())
+    await ddb.get_source_types()
+    await ddb.post_request("sources", {})
+    await ddb.get_source_types()
+    await ddb.patch_request("source_types/s1", {"name": "Paper"})
+    await ddb.get_source_types()
+    assert [method for method, *_ in session.requests] == [
+        "GET",
+        "POST",
+        "PATCH",
+        "GET",
+    ]
+
+
+def test_caching_is_opt_in():
+    assert DDBSession().cache is None
+    assert isinstance(DDBSession(cache=True).cache, ResponseCache)
+
+
+def test_stores_must_implement_every_method():
+    class Partial(CacheStore):
+        def get(self, key, parse):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_survives_a_new_cache(tmp_path):
+    ddb, session = client(ResponseCache(directory=str(tmp_path)))
+    await ddb.get_source_types(name="Book")
+
+    ddb, session = client(ResponseCache(directory=str(tmp_path)))
+    source_types = await ddb.get_source_types(name="Book")
+
+    assert session.requests == []
+    assert source_types[0].id == "s1"
+    assert session.cache.hits == 1
+
+    session.cache.invalidate()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_memory_store_drops_least_recently_used():
+    store = MemoryStore(max_entries=2)
+    for key in ["a", "b"]:
+        store.set((key, "", ()), key)
+    store.get(("a", "", ()), None)
+    store.set(("c", "", ()), "c")
+    assert store.get(("b", "", ()), None) is None
+    assert store.get(("a", "", ()), None) == "a"
+    assert len(store) == 2
@@ -0,0 +1,90 @@
+from pyddb import DDB
+from pyddb.ddb_coalesce import SingleFlight, normalise_params
+from tests.fakes import URL, FakeResponse, FakeSession, ddb_with
+import asyncio
+import pytest
+
+
+class SourceTypes(FakeSession):
+    async def respond(self, method, endpoint, params, json):
+        return FakeResponse(
+            200, {"source_types": [{"id": "s1", "name": "Book", "visible": True}]}
+        )
+
+
+def test_params_are_normalised():
+    assert normalise_params({"b": 1, "a": ["y", "x", "y"]}) == normalise_params(
+        {"a": ["x", "y"], "b": "1"}
+    )
+    assert normalise_params({"a": 1}) != normalise_params({"a": 2})
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_in_flight_share_one_call():
+    session = SourceTypes(delay=0.01)
+    ddb = ddb_with(session)
+    other = ddb_with(session)
+
+    results = await asyncio.gather(
+        ddb.get_source_types(name=["Book", "Paper"]),
+        ddb.get_source_types(name=["Paper", "Book"]),
+        other.get_source_types(name=["Book", "Paper"]),
+        ddb.get_source_types(name=["Report"]),
+    )
+
+    assert len(session.requests) == 2
+    assert session.single_flight.calls == 4
+    assert session.single_flight.coalesced == 2
+    assert results[0] == results[1] == results[2]
+    assert results[0] is not results[1]
+    assert results[0][0] is results[1][0]
+
+    # Once the call has finished, the next caller makes a new one
+    await ddb.get_source_types(name=["Book", "Paper"])
+    assert len(session.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_environments_are_not_shared():
+    session = SourceTypes(delay=0.01)
+    await asyncio.gather(
+        DDB(url=URL, session=session).get_source_types(),
+        DDB(url="https://dev.ddb.test/api/", session=session).get_source_types(),
+    )
+    assert len(session.requests) == 2
+    assert session.single_flight.coalesced == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "done"
+
+    first = asyncio.ensure_future(flight.run("key", call))
+    second = asyncio.ensure_future(flight.run("key", call))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "done"
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ConnectionError("no route")
+
+    results = await asyncio.gather(
+        flight.run("key", call), flight.run("key", call), return_exceptions=True
+    )
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert flight.coalesced == 1
@@ -0,0 +1,43 @@
+from pyddb import Asset, AssetType, ParameterType
+from pyddb.ddb_decode import construct_trusted, loads
+
+asset_data = {
+    "id": "1a6f1c3e-5f44-4a0b-a0b3-7a4d6c1b2e90",
+    "name": "My Building",
+    "project_id": "0f1e2d3c-4b5a-6978-8796-a5b4c3d2e1f0",
+    "parent": None,
+    "children": [],
+    "asset_type": {"id": "b0c1d2e3", "name": "building", "parent_id": None},
+    "not_a_field": "dropped",
+}
+
+parameter_type_data = {
+    "id": "c1d2e3f4",
+    "name": "Area",
+    "data_type": "number",
+    "global_parameter": True,
+    "default_unit": {"id": "u1", "name": "m²"},
+    "units": [{"id": "u1", "name": "m²"}, {"id": "u2", "name": "ft²"}],
+}
+
+
+def test_matches_validated_model():
+    trusted = construct_trusted(Asset, asset_data)
+    validated = Asset.parse_obj(asset_data)
+    assert trusted.dict() == validated.dict()
+    assert trusted.__fields_set__ == validated.__fields_set__
+
+
+def test_nested_models_are_constructed():
+    trusted = construct_trusted(Asset, asset_data)
+    assert isinstance(trusted.asset_type, AssetType)
+
+
+def test_lists_of_models_are_constructed():
+    trusted = construct_trusted(ParameterType, parameter_type_data)
+    assert [unit.name for unit in trusted.units] == ["m²", "ft²"]
+    assert trusted == ParameterType.parse_obj(parameter_type_data)
+
+
+def test_loads_decodes_bytes():
+    assert loads(b'{"units": [1, 2]}') == {"units": [1, 2]}
@@ -0,0 +1,140 @@
+"""Fakes of the HTTP session, shared by the tests that run offline."""
+
+import asyncio
+import json as jsonlib
+from typing import Any, Dict, List, Optional
+from pyddb import DDB, Project
+from pyddb.ddb_batching import AdaptiveBatcher
+from pyddb.ddb_coalesce import SingleFlight
+
+URL = "https://ddb.test/api/"
+CREATED_AT = "2022-01-01T00:00:00.000Z"
+
+
+class FakeResponse:
+    def __init__(self, status: int, body: Any = None, headers: Optional[dict] = None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def json(self):
+        return self.body
+
+    async def read(self) -> bytes:
+        return jsonlib.dumps(self.body).encode()
+
+
+def page(key: str, records: List[dict], after: Optional[str] = None) -> dict:
+    """A list response, with the cursor of the next page if there is one."""
+    return {key: records, "paging": {"cursors": {"after": after}}}
+
+
+def paged(key: str, records: List[dict], params: dict) -> dict:
+    """The page of `records` that `params` asks for, as the API pages them."""
+    start = int(params.get("after") or 0)
+    end = start + int(params.get("page_limit") or len(records) or 1)
+    return page(key, records[start:end], str(end) if end < len(records) else None)
+
+
+class FakeSession:
+    """Stands in for DDBSession, answering requests with `respond`.
+
+    Subclasses override `respond`. Every request is recorded in `requests`
+    as (method, endpoint, params, json).
+
+    Args:
+        delay (float): Seconds each request takes.
+        coalesce (bool): As for DDBSession.
+        cache (ResponseCache): As for DDBSession.
+    """
+
+    fast_decode = False
+
+    def __init__(self, delay: float = 0, coalesce: bool = True, cache=None):
+        self.delay = delay
+        self.coalesce = coalesce
+        self.cache = cache
+        self.single_flight = SingleFlight()
+        self.requests: List[tuple] = []
+        self.closed = False
+        self._batchers: Dict[str, AdaptiveBatcher] = {}
+
+    @property
+    def gets(self) -> List[tuple]:
+        return [request for request in self.requests if request[0] == "GET"]
+
+    @property
+    def posts(self) -> List[tuple]:
+        return [request for request in self.requests if request[0] != "GET"]
+
+    def batcher(self, endpoint: str) -> AdaptiveBatcher:
+        if endpoint not in self._batchers:
+            self._batchers[endpoint] = AdaptiveBatcher()
+        return self._batchers[endpoint]
+
+    async def request(
+        self, method, url, params=None, json=None, max_retries=None, **kwargs
+    ):
+        endpoint = url.rsplit("/api/", 1)[1]
+        params = dict(params or {})
+        self.requests.append((method, endpoint, params, json))
+        await asyncio.sleep(self.delay)
+        return await self.respond(method, endpoint, params, json)
+
+    async def respond(self, method: str, endpoint: str, params: dict, json: Any):
+        raise NotImplementedError
+
+    async def close(self):
+        self.closed = True
+
+
+def ddb_with(session: FakeSession) -> DDB:
+    return DDB(url=URL, session=session)
+
+
+def project_with(session: FakeSession, project_id: str = "p1") -> Project:
+    project = Project.construct(project_id=project_id, url=URL)
+    project._session = session
+    return project
+
+
+def asset_record(
+    id: str,
+    name: Optional[str] = None,
+    asset_type: Any = None,
+    parent: Optional[str] = None,
+    project_id: str = "p1",
+    **fields,
+) -> dict:
+    return dict(
+        {
+            "id": id,
+            "name": name or id,
+            "project_id": project_id,
+            "parent": parent,
+            "parent_id": parent,
+            "children": [],
+            "asset_type": asset_type.dict() if asset_type is not None else None,
+        },
+        **fields,
+    )
+
+
+def source_record(
+    id: str,
+    title: str,
+    source_type_id: str = "t1",
+    reference: str = "Rev A",
+    **fields,
+) -> dict:
+    return dict(
+        {
+            "id": id,
+            "created_at": CREATED_AT,
+            "updated_at": CREATED_AT,
+            "title": title,
+            "reference": reference,
+            "source_type_id": source_type_id,
+        },
+        **fields,
+    )
@@ -0,0 +1,66 @@
+from pyddb.ddb_frames import (
+    ASSET_COLUMNS,
+    PARAMETER_COLUMNS,
+    build_frame,
+    path_reader,
+)
+
+parameter = {
+    "id": "p1",
+    "project_id": "project",
+    "created_at": "2022-07-20T10:15:00.000Z",
+    "parameter_type": {"id": "t1", "name": "Area", "data_type": "number"},
+    "parents": [{"id": "a1", "name": "Block A", "asset_type": {"name": "building"}}],
+    "revision": {
+        "id": "r1",
+        "status": "answered",
+        "source": {"id": "s1", "title": "Brief", "reference": "Rev A"},
+        "values": [{"value": 12.5, "unit": {"id": "u1", "name": "m²"}}],
+        "created_at": "2022-07-21T10:15:00.000Z",
+    },
+}
+
+project_parameter = {
+    "id": "p2",
+    "project_id": "project",
+    "created_at": "2022-07-20T10:15:00.000Z",
+    "parameter_type": {"id": "t1", "name": "Area", "data_type": "number"},
+    "parents": [],
+    "revision": None,
+}
+
+
+def test_parameter_frame_columns():
+    df = build_frame([[parameter], [project_parameter]], PARAMETER_COLUMNS)
+    assert list(df.columns) == [name for name, _, _ in PARAMETER_COLUMNS]
+    assert list(df["parameter_id"]) == ["p1", "p2"]
+    assert df["value"][0] == 12.5
+    assert df["unit_name"][0] == "m²"
+    assert df["asset_name"].isna()[1]
+    assert str(df["created_at"].dtype).startswith("datetime64")
+    assert str(df["parameter_type_name"].dtype) == "category"
+
+
+def test_empty_frame_has_all_columns():
+    df = build_frame([], ASSET_COLUMNS)
+    assert len(df) == 0
+    assert list(df.columns) == [name for name, _, _ in ASSET_COLUMNS]
+
+
+def test_path_reader_reads_anything_missing_as_none():
+    paths = (
+        ("id",),
+        ("parents", 0, "name"),
+        ("parents", 0),
+        ("revision", "values", 0, "value"),
+        ("revision", "values", 1, "value"),
+    )
+    records = [parameter, project_parameter, {"parents": {}, "revision": "text"}, None]
+    assert path_reader(paths)(records) == [
+        ["p1", "p2", None, None],
+        ["Block A", None, None, None],
+        [parameter["parents"][0], None, None, None],
+        [12.5, None, None, None],
+        [None, None, None, None],
+    ]
+    assert path_reader(paths) is path_reader(paths)
@@ -0,0 +1,70 @@
+from pyddb import Asset, AssetUploadPlan, NewAsset, get_asset_type_by_name
+import pytest
+
+
+def existing_asset(id, name, asset_type, parent_id=None):
+    return Asset(
+        id=id,
+        name=name,
+        project_id="p1",
+        parent=parent_id,
+        parent_id=parent_id,
+        children=[],
+        asset_type=get_asset_type_by_name(asset_type),
+    )
+
+
+def new_asset(name, asset_type, parent=None):
+    return NewAsset(
+        asset_type=get_asset_type_by_name(asset_type), name=name, parent=parent
+    )
+
+
+def test_assets_are_levelled_by_hierarchy():
+    site = new_asset("Dalkeith Road", "site")
+    building = new_asset("Block A", "building", site)
+    # not in the hard-coded type order, and listed before its parent
+    material = new_asset("Steel", "material", building)
+    plan = AssetUploadPlan.build([material, building, site], [])
+    assert [[a.name for a in level] for level in plan.levels] == [
+        ["Dalkeith Road"],
+        ["Block A"],
+        ["Steel"],
+    ]
+    assert plan.existing == []
+
+
+def test_unlisted_new_parents_are_planned():
+    site = new_asset("Dalkeith Road", "site")
+    building = new_asset("Block A", "building", site)
+    plan = AssetUploadPlan.build([building], [])
+    assert [len(level) for level in plan.levels] == [1, 1]
+
+
+def test_existing_assets_are_matched_and_children_reattached():
+    site = existing_asset("s1", "Dalkeith Road", "site")
+    new_site = new_asset("Dalkeith Road", "site")
+    building = new_asset("Block A", "building", new_site)
+    plan = AssetUploadPlan.build([new_site, building], [site])
+    assert plan.existing == [site]
+    [[planned]] = plan.levels
+    assert planned.name == "Block A"
+    assert planned.parent.id == "s1"
+
+
+def test_duplicate_new_assets_are_posted_once():
+    site = new_asset("Dalkeith Road", "site")
+    duplicate = new_asset("Dalkeith Road", "site")
+    child = new_asset("Block A", "building", duplicate)
+    plan = AssetUploadPlan.build([site, duplicate, child], [])
+    [[planned_site], [planned_child]] = plan.levels
+    assert planned_site.id == site.id
+    assert planned_child.parent.id == site.id
+
+
+def test_cycles_are_rejected():
+    site = new_asset("Dalkeith Road", "site")
+    building = new_asset("Block A", "building", site)
+    site.parent = building
+    with pytest.raises(ValueError):
+        AssetUploadPlan.build([site], [])
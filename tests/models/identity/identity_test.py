@@ -0,0 +1,132 @@
+from pyddb import (
+    Asset,
+    NewAsset,
+    NewModel,
+    NewParameter,
+    NewRevision,
+    NewSource,
+    Source,
+    dedupe,
+    difference,
+    get_asset_type_by_name,
+    get_parameter_type_by_name,
+    get_source_type_by_name,
+    match_existing,
+)
+from tests.fakes import asset_record, source_record
+import pytest
+
+SOURCE_TYPE = get_source_type_by_name("Assumption")
+SITE = get_asset_type_by_name("site")
+AREA = get_parameter_type_by_name("Area")
+
+
+def source(id, title):
+    return Source(**source_record(id, title, SOURCE_TYPE.id))
+
+
+def new_source(title):
+    return NewSource(source_type=SOURCE_TYPE, title=title, reference="Rev A")
+
+
+def test_new_models_are_equal_by_identity_and_not_hashable():
+    assert new_source("Brief") == new_source("Brief")
+    assert new_source("Brief") == source("s1", "Brief")
+    assert source("s1", "Brief") == new_source("Brief")
+    with pytest.raises(TypeError):
+        hash(new_source("Brief"))
+
+
+def test_persisted_models_are_equal_and_hashed_by_id():
+    renamed = source("s1", "Renamed")
+    assert source("s1", "Brief") == renamed
+    assert hash(source("s1", "Brief")) == hash(renamed)
+    assert source("s1", "Brief") != source("s2", "Brief")
+    assert len({source("s1", "Brief"), source("s2", "Brief"), renamed}) == 2
+
+
+def test_unrelated_types_are_not_equal():
+    assert new_source("Brief") != None
+    assert new_source("Brief") != NewAsset(asset_type=SITE, name="Brief")
+
+
+def test_parameter_types_are_equal_by_id():
+    assert AREA == AREA.copy(update={"name": "Floor area"})
+    assert AREA != "Area"
+    assert len({AREA, AREA.copy()}) == 1
+
+
+def test_parameter_identity_includes_parent():
+    site = Asset(**asset_record("a1", "Site", SITE))
+    on_site = NewParameter(parameter_type=AREA, parent=site)
+    assert on_site.identity != NewParameter(parameter_type=AREA).identity
+    assert len(dedupe([NewParameter(parameter_type=AREA, parent=site)] * 2)) == 1
+    assert (
+        len(
+            dedupe(
+                [
+                    NewParameter(parameter_type=AREA, parent=site),
+                    NewParameter(parameter_type=AREA),
+                ]
+            )
+        )
+        == 2
+    )
+
+
+def test_dedupe_keeps_first_of_each_identity():
+    first = new_source("Brief")
+    assert dedupe([first, new_source("Report"), new_source("Brief")]) == [
+        first,
+        new_source("Report"),
+    ]
+    assert dedupe([first, new_source("Brief")])[0] is first
+
+
+def test_match_existing_and_difference():
+    existing = [source("s1", "Brief"), source("s2", "Drawings")]
+    items = [new_source("Brief"), new_source("Report")]
+    assert [s and s.id for s in match_existing(items, existing)] == ["s1", None]
+    assert difference(items, existing) == [new_source("Report")]
+
+
+def test_persisted_records_with_the_same_content_are_kept():
+    records = [source("s1", "Brief"), source("s2", "Brief"), source("s1", "Brief")]
+    assert [s.id for s in dedupe(records)] == ["s1", "s2"]
+    assert [s.id for s in difference(records, [source("s1", "Other")])] == ["s2"]
+    assert [s and s.id for s in match_existing(records[:2], records[1:2])] == [
+        None,
+        "s2",
+    ]
+
+
+def test_equality_agrees_with_identity():
+    site = Asset(**asset_record("a1", "Site", SITE))
+    brief = source("s1", "Brief")
+    revision = NewRevision(value=10, source=brief)
+    models = [
+        brief,
+        source("s2", "Brief"),
+        new_source("Brief"),
+        new_source("Spec"),
+        site,
+        NewAsset(asset_type=SITE, name="Site"),
+        NewAsset(asset_type=SITE, name="Site", parent=site),
+        revision,
+        NewRevision(value=20, source=brief),
+        NewParameter(parameter_type=AREA),
+        NewParameter(parameter_type=AREA, parent=site),
+        NewParameter(parameter_type=AREA, parent=site, revision=revision),
+    ]
+    for a in models:
+        for b in models:
+            if isinstance(a, NewModel) or isinstance(b, NewModel):
+                assert (a == b) == (a.identity == b.identity), (a, b)
+
+
+def test_identity_is_kept_until_a_field_changes():
+    asset = NewAsset(asset_type=SITE, name="Site")
+    assert asset.identity is asset.identity
+    asset.name = "Other site"
+    assert asset.identity == (None, SITE.id, "Other site")
+    assert asset.copy(update={"name": "Copy"}).identity[2] == "Copy"
@@ -0,0 +1,44 @@
+from pyddb import NewSource, get_source_type_by_name
+from tests.fakes import FakeResponse, FakeSession, ddb_with, page, source_record
+import pytest
+
+SOURCE_TYPE = get_source_type_by_name("Assumption")
+
+
+class Sources(FakeSession):
+    def __init__(self, existing):
+        super().__init__()
+        self.existing = existing
+
+    async def respond(self, method, endpoint, params, json):
+        if method == "GET":
+            titles = params["title"]
+            return FakeResponse(
+                200, page("sources", [s for s in self.existing if s["title"] in titles])
+            )
+        return FakeResponse(
+            201, {"source": source(f"s{len(self.posts)}", json["title"])}
+        )
+
+
+def source(id, title):
+    return source_record(id, title, source_type_id=SOURCE_TYPE.id)
+
+
+def new_source(title):
+    return NewSource(source_type=SOURCE_TYPE, title=title, reference="Rev A")
+
+
+@pytest.mark.asyncio
+async def test_existing_sources_are_reused_and_duplicates_posted_once():
+    session = Sources(existing=[source("e1", "Brief")])
+    ddb = ddb_with(session)
+    sources = [new_source("Brief"), new_source("Report"), new_source("Report")]
+
+    results = await ddb.post_sources(sources, reference_id="p1")
+
+    assert [s.id for s in results] == ["e1", "s1", "s1"]
+    assert [body["title"] for _, _, _, body in session.posts] == ["Report"]
+    [(_, _, query, _)] = session.gets
+    assert query["reference_id"] == "p1"
+    assert query["title"] == ["Brief", "Report"]
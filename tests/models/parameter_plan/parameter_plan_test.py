@@ -0,0 +1,81 @@
+from pyddb import (
+    NewParameter,
+    NewRevision,
+    NewSource,
+    Parameter,
+    ParameterPlan,
+    get_parameter_type_by_name,
+    get_source_type_by_name,
+    get_unit_by_name,
+)
+
+AREA = get_parameter_type_by_name("Area")
+SOURCE_TYPE = get_source_type_by_name("Assumption")
+SQUARE_METRE = get_unit_by_name("m²")
+NEW_SOURCE = NewSource(source_type=SOURCE_TYPE, title="Brief", reference="Rev A")
+
+
+def existing_parameter(id, value, parameter_type=AREA):
+    return Parameter.parse_obj(
+        {
+            "id": id,
+            "created_at": "2022-01-01T00:00:00.000Z",
+            "project_id": "p1",
+            "created_by": "someone",
+            "parameter_type": parameter_type.dict(),
+            "parents": [],
+            "revision": {
+                "id": f"r-{id}",
+                "status": "unanswered",
+                "source": {
+                    "id": "s1",
+                    "created_at": "2022-01-01T00:00:00.000Z",
+                    "updated_at": "2022-01-01T00:00:00.000Z",
+                    "title": "Brief",
+                    "reference": "Rev A",
+                    "source_type_id": SOURCE_TYPE.id,
+                },
+                "values": [{"value": value, "unit": SQUARE_METRE.dict()}],
+                "created_at": "2022-01-01T00:00:00.000Z",
+                "created_by": {
+                    "staff_id": 1,
+                    "staff_name": "Someone",
+                    "email": "someone@example.com",
+                    "company_centre_arup_unit": "Unit",
+                    "location_name": "London",
+                    "my_people_page_url": "https://example.com",
+                },
+            },
+        }
+    )
+
+
+def new_parameter(value, parameter_type=AREA):
+    return NewParameter(
+        parameter_type=parameter_type,
+        revision=NewRevision(value=value, unit=SQUARE_METRE, source=NEW_SOURCE),
+    )
+
+
+def test_parameters_are_classified_in_one_pass():
+    volume = get_parameter_type_by_name("Volume")
+    plan = ParameterPlan.build(
+        [new_parameter(20), new_parameter(30, volume)],
+        [existing_parameter("a1", 10)],
+    )
+    assert plan.counts == {"create": 1, "revise": 1, "unchanged": 0}
+    [revised] = plan.revise
+    assert revised.id == "a1"
+    assert plan.create[0].parameter_type == volume
+
+
+def test_same_value_and_source_is_unchanged():
+    plan = ParameterPlan.build([new_parameter(10)], [existing_parameter("a1", 10)])
+    assert plan.counts == {"create": 0, "revise": 0, "unchanged": 1}
+
+
+def test_parameter_without_revision_is_unchanged_when_it_exists():
+    plan = ParameterPlan.build(
+        [NewParameter(parameter_type=AREA)], [existing_parameter("a1", 10)]
+    )
+    assert plan.counts["unchanged"] == 1
@@ -0,0 +1,64 @@
+from tests.fakes import FakeResponse, FakeSession, asset_record, ddb_with, page
+import asyncio
+import pytest
+
+DELAYS = {"slow": 0.05, "fast": 0, "broken": 0, "medium": 0.02}
+
+
+class ProjectAssets(FakeSession):
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.most_in_flight = 0
+
+    async def respond(self, method, endpoint, params, json):
+        project_id = params["project_id"]
+        self.in_flight += 1
+        self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(DELAYS[project_id])
+            if project_id == "broken":
+                raise ConnectionError("no route")
+            return FakeResponse(
+                200,
+                page(
+                    "assets", [asset_record(f"{project_id}-1", project_id=project_id)]
+                ),
+            )
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_results_come_back_in_completion_order():
+    session = ProjectAssets()
+    ddb = ddb_with(session)
+
+    results = [
+        result
+        async for result in ddb.iter_project_results(
+            "assets", project_ids=["slow", "fast", "broken", "medium"], concurrency=4
+        )
+    ]
+
+    assert [r.project_id for r in results if r.ok] == ["fast", "medium", "slow"]
+    [failed] = [r for r in results if not r.ok]
+    assert failed.project_id == "broken"
+    assert isinstance(failed.error, ConnectionError)
+    assert results[-1].records[0].id == "slow-1"
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded():
+    session = ProjectAssets()
+    ddb = ddb_with(session)
+
+    results = [
+        result
+        async for result in ddb.iter_project_results(
+            "assets", project_ids=["slow", "medium"] * 5, concurrency=3
+        )
+    ]
+
+    assert len(results) == 10
+    assert session.most_in_flight == 3
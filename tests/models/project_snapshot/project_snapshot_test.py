@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+from pyddb import (
+    SNAPSHOT_MAX_AGE,
+    SNAPSHOT_SINCE_FILTERS,
+    NewAsset,
+    get_asset_type_by_name,
+)
+from tests.fakes import FakeResponse, FakeSession, asset_record, page, project_with
+import pytest
+
+SITE = get_asset_type_by_name("site")
+BUILDING = get_asset_type_by_name("building")
+T0 = "2022-01-01T00:00:00.000Z"
+T1 = "2022-06-01T00:00:00.000Z"
+
+
+def asset(id, name, asset_type=SITE, parent=None, updated_at=T0, deleted_at=None):
+    return asset_record(
+        id, name, asset_type, parent, updated_at=updated_at, deleted_at=deleted_at
+    )
+
+
+class Assets(FakeSession):
+    def __init__(self, assets):
+        super().__init__()
+        self.assets = assets
+
+    async def respond(self, method, endpoint, params, json):
+        if method == "GET":
+            return FakeResponse(200, page("assets", self.assets))
+        created = [
+            asset(a["asset_id"], a["name"], BUILDING, parent=a.get("parent_id"))
+            for a in json["assets"]
+        ]
+        self.assets = self.assets + created
+        return FakeResponse(201, {"assets": created})
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_fetched_once_and_updated_from_writes():
+    session = Assets([asset("a1", "Dalkeith Road")])
+    project = project_with(session)
+
+    snapshot = await project.get_snapshot("assets")
+    [site] = snapshot.assets
+    new_site = NewAsset(asset_type=SITE, name="Dalkeith Road")
+    await project.post_assets(
+        [NewAsset(asset_type=BUILDING, name="A", parent=new_site)]
+    )
+    await project.post_assets([NewAsset(asset_type=BUILDING, name="B", parent=site)])
+
+    assert len(session.gets) == 1
+    assert [a.name for a in snapshot.assets] == ["Dalkeith Road", "A", "B"]
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_parses_changed_records():
+    session = Assets(
+        [asset("a1", "Dalkeith Road"), asset("a2", "Haymarket"), asset("a3", "Leith")]
+    )
+    project = project_with(session)
+    snapshot = await project.get_snapshot("assets")
+    unchanged = snapshot.assets[0]
+
+    session.assets = [
+        asset("a1", "Dalkeith Road"),
+        asset("a2", "Haymarket Yards", updated_at=T1),
+        asset("a3", "Leith", deleted_at=T1),
+        asset("a4", "Granton"),
+    ]
+    snapshot = await project.get_snapshot("assets", refresh=True)
+
+    assert [a.name for a in snapshot.assets] == [
+        "Dalkeith Road",
+        "Haymarket Yards",
+        "Granton",
+    ]
+    assert snapshot.assets[0] is unchanged
+
+
+@pytest.mark.asyncio
+async def test_posts_refresh_a_snapshot_older_than_max_age():
+    session = Assets([asset("a1", "Dalkeith Road")])
+    project = project_with(session)
+    snapshot = await project.get_snapshot("assets")
+    session.assets = session.assets + [asset("a2", "Haymarket")]
+
+    await project.post_assets([NewAsset(asset_type=SITE, name="Haymarket")])
+    assert len(session.gets) == 1
+    assert len(session.posts) == 1
+
+    snapshot.synced_at["assets"] = (
+        datetime.now(timezone.utc) - timedelta(seconds=SNAPSHOT_MAX_AGE + 1)
+    ).isoformat()
+    await project.post_assets([NewAsset(asset_type=SITE, name="Haymarket")])
+    assert len(session.gets) == 2
+    assert len(session.posts) == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_requests_only_updates_where_supported(monkeypatch):
+    monkeypatch.setitem(SNAPSHOT_SINCE_FILTERS, "assets", "updated_since")
+    session = Assets([asset("a1", "Dalkeith Road"), asset("a2", "Haymarket")])
+    project = project_with(session)
+    snapshot = await project.get_snapshot("assets")
+    assert "updated_since" not in session.gets[0][2]
+
+    session.assets = [
+        asset("a2", "Haymarket Yards", updated_at=T1),
+        asset("a3", "Leith", deleted_at=T1),
+    ]
+    await project.get_snapshot("assets", refresh=True)
+
+    assert session.gets[1][2]["updated_since"]
+    assert [a.name for a in snapshot.assets] == ["Dalkeith Road", "Haymarket Yards"]
@@ -0,0 +1,143 @@
+from pyddb import (
+    NewAsset,
+    NewParameter,
+    NewRevision,
+    NewSource,
+    ProjectSnapshot,
+    UploadPlan,
+    get_asset_type_by_name,
+    get_parameter_type_by_name,
+    get_source_type_by_name,
+    get_unit_by_name,
+)
+from tests.fakes import (
+    CREATED_AT,
+    FakeResponse,
+    FakeSession,
+    asset_record,
+    project_with,
+    source_record,
+)
+import pytest
+
+AREA = get_parameter_type_by_name("Area")
+SITE = get_asset_type_by_name("site")
+BUILDING = get_asset_type_by_name("building")
+SOURCE_TYPE = get_source_type_by_name("Assumption")
+SQUARE_METRE = get_unit_by_name("m²")
+
+
+def source(id, title):
+    return source_record(id, title, source_type_id=SOURCE_TYPE.id)
+
+
+SITE_ASSET = asset_record("a1", "Dalkeith Road", SITE)
+
+SNAPSHOT = ProjectSnapshot.parse_obj(
+    {
+        "project_id": "p1",
+        "taken_at": CREATED_AT,
+        "assets": [SITE_ASSET],
+        "sources": [source("s1", "Brief")],
+        "parameters": [
+            {
+                "id": "pa1",
+                "created_at": CREATED_AT,
+                "project_id": "p1",
+                "created_by": "someone",
+                "parameter_type": AREA.dict(),
+                "parents": [SITE_ASSET],
+                "revision": {
+                    "id": "r1",
+                    "status": "unanswered",
+                    "source": source("s1", "Brief"),
+                    "values": [{"value": 10, "unit": SQUARE_METRE.dict()}],
+                    "created_at": CREATED_AT,
+                    "created_by": {
+                        "staff_id": 1,
+                        "staff_name": "Someone",
+                        "email": "someone@example.com",
+                        "company_centre_arup_unit": "Unit",
+                        "location_name": "London",
+                        "my_people_page_url": "https://example.com",
+                    },
+                },
+            }
+        ],
+    }
+)
+
+
+def area(value, parent, title="Brief"):
+    return NewParameter(
+        parameter_type=AREA,
+        parent=parent,
+        revision=NewRevision(
+            value=value,
+            unit=SQUARE_METRE,
+            source=NewSource(source_type=SOURCE_TYPE, title=title, reference="Rev A"),
+        ),
+    )
+
+
+def build_plan():
+    site = NewAsset(asset_type=SITE, name="Dalkeith Road")
+    building = NewAsset(asset_type=BUILDING, name="Block A", parent=site)
+    return UploadPlan.build(
+        SNAPSHOT,
+        assets=[site, building],
+        parameters=[area(10, site), area(20, building, title="Drawings")],
+    )
+
+
+def test_plan_is_computed_locally():
+    plan = build_plan()
+    assert plan.counts == {
+        "sources": {"create": 1, "existing": 1},
+        "assets": {"create": 1, "existing": 1},
+        "parameters": {"create": 1, "revise": 0, "unchanged": 1},
+    }
+    [[building]] = plan.assets.levels
+    assert building.parent.id == "a1"
+    [created] = plan.parameters.create
+    assert created.parent.id == building.id
+
+
+def test_plan_round_trips_through_json():
+    plan = build_plan()
+    loaded = UploadPlan.parse_raw(plan.json())
+    assert loaded.counts == plan.counts
+    assert loaded.assets.levels[0][0].id == plan.assets.levels[0][0].id
+
+
+class Writes(FakeSession):
+    async def respond(self, method, endpoint, params, json):
+        if endpoint == "sources":
+            return FakeResponse(201, {"source": source("s2", json["title"])})
+        if endpoint == "assets":
+            return FakeResponse(
+                201,
+                {
+                    "assets": [
+                        dict(SITE_ASSET, id=a["asset_id"], name=a["name"])
+                        for a in json["assets"]
+                    ]
+                },
+            )
+        return FakeResponse(201, {})
+
+
+@pytest.mark.asyncio
+async def test_executing_a_plan_sends_only_its_writes():
+    session = Writes()
+    project = project_with(session)
+
+    await build_plan().execute(project)
+
+    assert [(method, endpoint) for method, endpoint, _, _ in session.posts] == [
+        ("POST", "sources"),
+        ("POST", "assets"),
+        ("POST", "parameters"),
+    ]
+    [parameter] = session.posts[2][3]["parameters"]
+    assert parameter["revision"]["source_id"] == "s2"
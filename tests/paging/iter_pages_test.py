@@ -0,0 +1,107 @@
+from pyddb import PagingError
+from tests.fakes import FakeResponse, FakeSession, ddb_with, paged
+import asyncio
+import pytest
+
+RECORDS = [{"id": f"r{i}"} for i in range(7)]
+
+
+class Records(FakeSession):
+    def __init__(self, records=RECORDS, delay=0):
+        super().__init__(delay=delay)
+        self.records = records
+
+    async def respond(self, method, endpoint, params, json):
+        return FakeResponse(200, paged("records", self.records, params))
+
+
+async def walk(session, **kwargs):
+    ddb = ddb_with(session)
+    return [page async for page in ddb.iter_pages("records", "records", **kwargs)]
+
+
+def ids(pages):
+    return [record["id"] for page in pages for record in page]
+
+
+@pytest.mark.asyncio
+async def test_cursor_is_followed_across_pages():
+    session = Records()
+    pages = await walk(session, page_limit=3, project_id="p1")
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert ids(pages) == [record["id"] for record in RECORDS]
+    assert [params.get("after") for _, _, params, _ in session.gets] == [
+        None,
+        "3",
+        "6",
+    ]
+    assert all(params["project_id"] == "p1" for _, _, params, _ in session.gets)
+
+
+@pytest.mark.asyncio
+async def test_short_final_page_ends_without_another_request():
+    session = Records()
+    await walk(session, page_limit=5)
+    assert len(session.gets) == 2
+
+
+@pytest.mark.asyncio
+async def test_full_final_page_ends_on_an_empty_cursor():
+    session = Records(RECORDS[:6])
+    pages = await walk(session, page_limit=3)
+    assert [len(page) for page in pages] == [3, 3]
+    assert len(session.gets) == 2
+
+
+@pytest.mark.asyncio
+async def test_pages_are_fetched_ahead_of_the_consumer():
+    session = Records(delay=0.01)
+    ddb = ddb_with(session)
+    fetched_while_reading = []
+    async for _ in ddb.iter_pages("records", "records", page_limit=1, prefetch=2):
+        await asyncio.sleep(0.05)
+        fetched_while_reading.append(len(session.gets))
+
+    # While the first page is read, two pages wait in the queue and a third
+    # has been fetched; no more are requested until the consumer catches up
+    assert fetched_while_reading[:4] == [4, 5, 6, 7]
+    assert len(session.gets) == 7
+
+
+class NoPaging(FakeSession):
+    def __init__(self, honours_offset):
+        super().__init__()
+        self.honours_offset = honours_offset
+
+    async def respond(self, method, endpoint, params, json):
+        start = int(params.get("offset") or 0) if self.honours_offset else 0
+        limit = int(params["page_limit"])
+        return FakeResponse(200, {"records": RECORDS[start : start + limit]})
+
+
+@pytest.mark.asyncio
+async def test_full_pages_without_paging_fall_back_to_offsets():
+    session = NoPaging(honours_offset=True)
+    pages = await walk(session, page_limit=3)
+    assert ids(pages) == [record["id"] for record in RECORDS]
+    assert [params.get("offset") for _, _, params, _ in session.gets] == [None, 3, 6]
+
+
+@pytest.mark.asyncio
+async def test_ignored_offsets_raise_instead_of_stopping_short():
+    with pytest.raises(PagingError):
+        await walk(NoPaging(honours_offset=False), page_limit=3)
+
+
+class IgnoresPageLimit(FakeSession):
+    async def respond(self, method, endpoint, params, json):
+        return FakeResponse(200, {"records": RECORDS})
+
+
+@pytest.mark.asyncio
+async def test_pages_longer_than_the_limit_are_the_whole_result():
+    session = IgnoresPageLimit()
+    pages = await walk(session, page_limit=3)
+    assert ids(pages) == [record["id"] for record in RECORDS]
+    assert len(session.gets) == 1
@@ -0,0 +1,33 @@
+from pyddb.ddb_query import chunk_filters, param_length
+
+
+def test_param_length_counts_encoding():
+    assert param_length("title", "a b") == len("title=a%20b&")
+
+
+def test_small_queries_are_not_split():
+    items = [{"title": "A", "reference": "1"}, {"title": "B", "reference": "1"}]
+    assert chunk_filters(items) == [{"title": ["A", "B"], "reference": ["1"]}]
+
+
+def test_queries_are_split_by_length():
+    items = [{"title": f"Document {i:04}"} for i in range(1000)]
+    chunks = chunk_filters(items, fixed={"reference_id": "p1"}, max_length=500)
+    assert len(chunks) > 1
+    assert [title for chunk in chunks for title in chunk["title"]] == [
+        item["title"] for item in items
+    ]
+    for chunk in chunks:
+        length = param_length("reference_id", "p1") + sum(
+            param_length("title", title) for title in chunk["title"]
+        )
+        assert length <= 500
+
+
+def test_oversized_item_gets_its_own_query():
+    items = [{"title": "A"}, {"title": "x" * 100}, {"title": "B"}]
+    assert chunk_filters(items, max_length=50) == [
+        {"title": ["A"]},
+        {"title": ["x" * 100]},
+        {"title": ["B"]},
+    ]
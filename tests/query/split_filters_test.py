@@ -0,0 +1,88 @@
+from pyddb.ddb_query import (
+    MAX_QUERY_LENGTH,
+    dedupe_filters,
+    query_length,
+    split_filters,
+)
+from tests.fakes import FakeResponse, FakeSession, ddb_with, paged, source_record
+import pytest
+
+
+def test_list_filters_are_deduplicated():
+    assert dedupe_filters({"a": ["x", "y", "x"], "b": 1}) == {"a": ["x", "y"], "b": 1}
+    assert split_filters({"a": ["x", "x"]}) == [{"a": ["x"]}]
+
+
+def test_long_list_filters_are_split():
+    ids = [f"{i:036}" for i in range(2000)]
+    queries = split_filters({"parameter_id": ids, "project_id": "p1"})
+
+    assert len(queries) > 1
+    assert all(query["project_id"] == "p1" for query in queries)
+    assert all(query_length(query) <= MAX_QUERY_LENGTH for query in queries)
+    assert [id for query in queries for id in query["parameter_id"]] == ids
+
+
+def test_other_long_filters_are_split_too():
+    queries = split_filters(
+        {"a": [f"a{i:03}" for i in range(40)], "b": [f"b{i:03}" for i in range(20)]},
+        max_length=200,
+    )
+    assert all(query_length(query) <= 200 for query in queries)
+    pairs = {(a, b) for query in queries for a in query["a"] for b in query["b"]}
+    assert len(pairs) == 40 * 20
+
+
+class Sources(FakeSession):
+    async def respond(self, method, endpoint, params, json):
+        # Every request also returns the first source, as overlapping filters would
+        ids = ["s0000"] + params["source_id"]
+        return FakeResponse(
+            200,
+            {
+                "sources": [
+                    source_record(
+                        id,
+                        id,
+                        source_type={"id": "t1", "name": "Book", "visible": True},
+                    )
+                    for id in ids
+                ]
+            },
+        )
+
+
+@pytest.mark.asyncio
+async def test_get_request_merges_split_queries():
+    session = Sources()
+    ddb = ddb_with(session)
+    ids = [f"s{i:04}" for i in range(1500)]
+
+    sources = await ddb.get_sources(source_id=ids + ids[:10])
+
+    assert len(session.gets) > 1
+    assert all(
+        query_length(query) <= MAX_QUERY_LENGTH for _, _, query, _ in session.gets
+    )
+    assert [source.id for source in sources] == ids
+
+
+class PagedSources(Sources):
+    async def respond(self, method, endpoint, params, json):
+        response = await super().respond(method, endpoint, params, json)
+        return FakeResponse(200, paged("sources", response.body["sources"], params))
+
+
+@pytest.mark.asyncio
+async def test_iterators_split_queries_and_drop_repeated_records():
+    session = PagedSources()
+    ddb = ddb_with(session)
+    ids = [f"s{i:04}" for i in range(300)]
+
+    sources = [source async for source in ddb.iter_sources(source_id=ids)]
+
+    assert len(session.gets) > 1
+    assert all(
+        query_length(query) <= MAX_QUERY_LENGTH for _, _, query, _ in session.gets
+    )
+    assert [source.id for source in sources] == ["s0000"] + ids[1:]
@@ -0,0 +1,64 @@
+from pyddb.ddb_scheduler import RequestScheduler, backoff_delay, parse_retry_after
+from tests.fakes import FakeResponse
+import asyncio
+import pytest
+
+
+def test_retry_after_in_seconds():
+    assert parse_retry_after("3") == 3.0
+
+
+def test_retry_after_as_past_http_date():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+def test_missing_retry_after():
+    assert parse_retry_after(None) is None
+
+
+def test_backoff_delay_is_capped():
+    assert all(0 <= backoff_delay(10, 1, 2) <= 2 for _ in range(100))
+
+
+@pytest.mark.asyncio
+async def test_retries_server_errors_then_returns():
+    scheduler = RequestScheduler(base_delay=0, max_delay=0)
+    statuses = iter([503, 429, 201])
+
+    async def send():
+        return FakeResponse(next(statuses), headers={"Retry-After": "0"})
+
+    response = await scheduler.run(send)
+    assert response.status == 201
+    assert scheduler.retries == 2
+    assert scheduler.throttled == 1
+
+
+@pytest.mark.asyncio
+async def test_returns_last_response_when_retries_exhausted():
+    scheduler = RequestScheduler(max_retries=1, base_delay=0, max_delay=0)
+
+    async def send():
+        return FakeResponse(500)
+
+    response = await scheduler.run(send)
+    assert response.status == 500
+    assert scheduler.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_limits_requests_in_flight():
+    scheduler = RequestScheduler(max_in_flight=2)
+    in_flight = 0
+    peak = 0
+
+    async def send():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return FakeResponse(200)
+
+    await asyncio.gather(*[scheduler.run(send) for _ in range(10)])
+    assert peak == 2
@@ -0,0 +1,55 @@
+from pyddb import DDBSession
+import asyncio
+import threading
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_session_is_reused_within_a_loop():
+    session = DDBSession()
+    client = await session.open()
+    assert await session.open() is client
+    assert not session.closed
+    await session.close()
+
+
+@pytest.mark.asyncio
+async def test_close_closes_the_pool():
+    session = DDBSession()
+    client = await session.open()
+    await session.close()
+    assert client.closed
+    assert session.closed
+    assert await session.open() is not client
+    await session.close()
+
+
+def test_session_is_recreated_on_a_new_loop():
+    session = DDBSession()
+    first = asyncio.run(session.open())
+    second = asyncio.run(session.open())
+
+    assert second is not first
+    assert first.closed
+    assert not second.closed
+    asyncio.run(session.close())
+    assert second.closed
+
+
+def test_session_of_a_loop_still_running_is_closed_on_that_loop():
+    session = DDBSession()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        first = asyncio.run_coroutine_threadsafe(session.open(), loop).result()
+        second = asyncio.run(session.open())
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result()
+
+        assert second is not first
+        assert first.closed
+        asyncio.run(session.close())
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
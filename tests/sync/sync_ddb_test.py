@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+from pyddb import SyncDDB
+from pyddb.ddb_sync import SyncProxy
+from tests.fakes import (
+    URL,
+    FakeResponse,
+    FakeSession,
+    asset_record,
+    ddb_with,
+    page,
+    project_with,
+)
+import asyncio
+import threading
+import pytest
+
+
+class Assets(FakeSession):
+    def __init__(self):
+        super().__init__(coalesce=False)
+        self.threads = set()
+        self.loops = set()
+
+    async def respond(self, method, endpoint, params, json):
+        self.threads.add(threading.current_thread().name)
+        self.loops.add(asyncio.get_running_loop())
+        await asyncio.sleep(0.001)
+        return FakeResponse(
+            200, page("assets", [asset_record("a1"), asset_record("a2")])
+        )
+
+
+def test_calls_block_on_one_background_loop():
+    session = Assets()
+    with SyncDDB(url=URL, session=session) as ddb:
+        assets = ddb.get_assets(project_id="p1")
+        again = ddb.get_assets(project_id="p1")
+
+    assert [a.id for a in assets] == ["a1", "a2"] == [a.id for a in again]
+    assert assets[0].name == "a1"
+    assert session.threads == {"pyddb-loop"}
+    assert len(session.loops) == 1
+    assert session.closed
+
+
+def test_returned_objects_are_blocking_too():
+    session = Assets()
+    project = project_with(session)
+    with SyncDDB(ddb_with(session)) as ddb:
+        [synced] = ddb._wrap([project])
+        assert [a.id for a in synced.iter_assets(page_limit=2)] == ["a1", "a2"]
+        assert synced.wrapped is project
+        assert synced.project_id == "p1"
+
+
+def test_assets_of_an_asset_tree_are_blocking():
+    session = Assets()
+    project = project_with(session)
+    with SyncDDB(ddb_with(session)) as ddb:
+        [synced] = ddb._wrap([project])
+        tree = synced.get_asset_tree()
+        assert [a.id for a in tree.roots] == ["a1", "a2"]
+        assert isinstance(tree.get("a1"), SyncProxy)
+        assert [a.id for a in tree.get("a1").get_assets()] == ["a1", "a2"]
+
+
+def test_calls_from_many_threads():
+    session = Assets()
+    with SyncDDB(url=URL, session=session) as ddb:
+        with ThreadPoolExecutor(8) as pool:
+            results = list(
+                pool.map(lambda _: len(ddb.get_assets(project_id="p1")), range(32))
+            )
+    assert results == [2] * 32
+    assert len(session.loops) == 1
+
+
+def test_blocking_inside_the_loop_is_refused():
+    session = Assets()
+    with SyncDDB(url=URL, session=session) as ddb:
+
+        async def nested():
+            return ddb.get_assets()
+
+        with pytest.raises(RuntimeError):
+            ddb.run(nested())
@@ -0,0 +1,86 @@
+from pyddb import Asset, get_asset_type_by_name
+from pyddb.ddb_tree import AssetTree
+from tests.fakes import FakeResponse, FakeSession, asset_record, page, project_with
+import pytest
+
+SITE = get_asset_type_by_name("site")
+BUILDING = get_asset_type_by_name("building")
+
+
+def asset(id, name, asset_type, parent=None):
+    return asset_record(id, name, asset_type, parent)
+
+
+ASSETS = [
+    asset("a4", "Block B", BUILDING, "a1"),
+    asset("a1", "Dalkeith Road", SITE),
+    asset("a2", "Haymarket", SITE),
+    asset("a3", "Block A", BUILDING, "a1"),
+    asset("a5", "Annex", BUILDING, "a3"),
+    asset("a6", "Elsewhere", BUILDING, "not in project"),
+]
+
+
+@pytest.fixture
+def tree():
+    return AssetTree([Asset(**a) for a in ASSETS])
+
+
+def names(assets):
+    return [a.name for a in assets]
+
+
+def test_subtrees_are_preorder_slices(tree):
+    assert names(tree.subtree("a1")) == ["Dalkeith Road", "Block B", "Block A", "Annex"]
+    assert names(tree.subtree("a3", include_self=False)) == ["Annex"]
+    assert names(tree.roots) == ["Dalkeith Road", "Haymarket", "Elsewhere"]
+    assert names(tree.children("a1")) == ["Block B", "Block A"]
+
+
+def test_ancestors_paths_and_depths(tree):
+    assert names(tree.ancestors("a5")) == ["Block A", "Dalkeith Road"]
+    assert names(tree.path("a5")) == ["Dalkeith Road", "Block A", "Annex"]
+    assert tree.depth("a5") == 2
+    assert tree.parent("a1") is None
+    assert tree.is_ancestor("a1", "a5")
+    assert not tree.is_ancestor("a2", "a5")
+    assert not tree.is_ancestor("a5", "a5")
+
+
+def test_assets_of_a_type(tree):
+    assert names(tree.of_type("building", within="a1")) == [
+        "Block B",
+        "Block A",
+        "Annex",
+    ]
+    assert names(tree.of_type(SITE)) == ["Dalkeith Road", "Haymarket"]
+    assert tree.of_type(BUILDING.id, within="a2") == []
+
+
+def test_parent_cycles_are_broken():
+    tree = AssetTree(
+        [
+            Asset(**asset("a1", "One", SITE, "a2")),
+            Asset(**asset("a2", "Two", SITE, "a1")),
+        ]
+    )
+    assert len(tree) == 2
+    assert names(tree.roots) == ["One"]
+    assert names(tree.subtree("a1")) == ["One", "Two"]
+
+
+class Assets(FakeSession):
+    async def respond(self, method, endpoint, params, json):
+        return FakeResponse(200, page("assets", ASSETS))
+
+
+@pytest.mark.asyncio
+async def test_project_tree_is_fetched_once():
+    session = Assets()
+    project = project_with(session)
+
+    tree = await project.get_asset_tree()
+    await project.get_asset_tree()
+
+    assert len(session.gets) == 1
+    assert names(tree.path("a5")) == ["Dalkeith Road", "Block A", "Annex"]
@@ -0,0 +1,50 @@
+from pyddb import Unit
+from pyddb.utils.catalog_store import (
+    CatalogError,
+    CatalogStore,
+    FORMAT_VERSION,
+    write_catalog,
+)
+import sqlite3
+import pytest
+
+
+def test_catalog_records_environment_and_timestamp(tmp_path):
+    path = tmp_path / "catalog.sqlite"
+    write_catalog(
+        path,
+        {"units": [Unit(id="u1", name="m")]},
+        environment="dev",
+        generated_at="2022-07-20T00:00:00+00:00",
+    )
+    meta = CatalogStore(path).meta
+    assert meta["environment"] == "dev"
+    assert meta["generated_at"] == "2022-07-20T00:00:00+00:00"
+    assert meta["format_version"] == str(FORMAT_VERSION)
+
+
+def test_unsupported_format_version_is_rejected(tmp_path):
+    path = tmp_path / "catalog.sqlite"
+    write_catalog(path, {"units": []}, environment="dev")
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE meta SET value = '0' WHERE key = 'format_version'")
+    with pytest.raises(CatalogError):
+        CatalogStore(path).meta
+
+
+def test_invalid_table_names_are_rejected(tmp_path):
+    with pytest.raises(CatalogError):
+        write_catalog(tmp_path / "catalog.sqlite", {"units; --": []}, "dev")
+
+
+def test_tables_missing_from_the_catalog_raise_catalog_errors(tmp_path):
+    path = tmp_path / "catalog.sqlite"
+    write_catalog(path, {"units": []}, environment="dev")
+    store = CatalogStore(path)
+    for rows in (
+        store.rows_by_id("item_types", ["i1"]),
+        store.rows_by_name("item_types", ["Item"]),
+        store.all_rows("item_types"),
+    ):
+        with pytest.raises(CatalogError, match="item_types"):
+            list(rows)
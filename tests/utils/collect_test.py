@@ -0,0 +1,17 @@
+from pyddb.models import collect
+import pytest
+
+
+async def count_to(n):
+    for i in range(n):
+        yield i
+
+
+@pytest.mark.asyncio
+async def test_collect_returns_all_items():
+    assert await collect(count_to(4)) == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_collect_empty_iterator():
+    assert await collect(count_to(0)) == []
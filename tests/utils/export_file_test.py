@@ -0,0 +1,68 @@
+from pyddb.utils.export_file import export_projects
+import pandas as pd
+import pytest
+
+T0 = "2022-01-01T00:00:00.000Z"
+
+
+class FakeDDB:
+    def __init__(self, pages):
+        self.pages = pages
+        self.filters = []
+
+    async def iter_pages(self, endpoint, response_key, **kwargs):
+        self.filters.append(kwargs)
+        for page in self.pages[kwargs["project_id"]]:
+            yield page
+
+
+def asset(id, name, project_id):
+    return {
+        "id": id,
+        "name": name,
+        "project_id": project_id,
+        "parent_id": None,
+        "asset_type": {"id": "t1", "name": "site"},
+        "created_at": T0,
+        "updated_at": T0,
+        "deleted_at": None,
+    }
+
+
+PAGES = {
+    "p1": [[asset("a1", "Dalkeith Road", "p1"), asset("a2", "Haymarket", "p1")]],
+    "p2": [[asset("a3", "Leith", "p2")], [asset("a4", 1234, "p2")]],
+}
+
+
+@pytest.mark.asyncio
+async def test_projects_are_appended_to_one_csv(tmp_path):
+    path = tmp_path / "assets.csv"
+    ddb = FakeDDB(PAGES)
+
+    rows = await export_projects(ddb, ["p1", "p2"], path, collection="assets")
+
+    assert rows == {"p1": 2, "p2": 2}
+    assert [f["project_id"] for f in ddb.filters] == ["p1", "p2"]
+    df = pd.read_csv(path, dtype=str)
+    assert list(df["asset_id"]) == ["a1", "a2", "a3", "a4"]
+    assert list(df["asset_type_name"]) == ["site"] * 4
+
+
+@pytest.mark.asyncio
+async def test_pages_are_written_as_parquet_row_groups(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "assets.parquet"
+
+    await export_projects(FakeDDB(PAGES), ["p1", "p2"], path, collection="assets")
+
+    file = pq.ParquetFile(path)
+    assert file.metadata.num_row_groups == 3
+    table = file.read()
+    assert table.column("name").to_pylist() == [
+        "Dalkeith Road",
+        "Haymarket",
+        "Leith",
+        "1234",
+    ]
+    assert str(table.schema.field("created_at").type) == "timestamp[us, tz=UTC]"
@@ -0,0 +1,57 @@
+from pyddb import Asset, Parameter, Source
+from pyddb.utils.flatten_data import compile_flattener, flatten_data
+import pytest
+
+PARAMETER = {
+    "id": "p1",
+    "project_id": "project",
+    "parameter_type": {"id": "t1", "name": "Area", "units": [{"id": "u1"}]},
+    "parents": [{"id": "a1", "name": "Dalkeith Road", "asset_type": {"name": "site"}}],
+    "revision": {
+        "id": "r1",
+        "source": {"id": "s1", "title": "Brief"},
+        "values": [{"value": 10, "unit": {"id": "u1", "name": "m²"}}],
+    },
+}
+
+
+def test_columns_are_the_same_whatever_the_records_hold():
+    flatten = compile_flattener(Parameter)
+    columns = flatten(
+        [
+            PARAMETER,
+            {"id": "p2", "revision": None, "parents": []},
+            {"id": "p3", "parents": "not a list", "parameter_type": "not an object"},
+        ]
+    )
+    assert list(columns) == flatten.columns
+    assert columns["id"] == ["p1", "p2", "p3"]
+    assert columns["revision_values_0_value"] == [10, None, None]
+    assert columns["parents_0_asset_type_name"] == ["site", None, None]
+    assert "parents_1_id" not in columns
+    assert flatten([]) == {name: [] for name in flatten.columns}
+
+
+def test_column_names_match_flatten_data():
+    flat = flatten_data(PARAMETER)
+    columns = compile_flattener(Parameter)([PARAMETER])
+    for name, value in flat.items():
+        assert columns[name] == [value]
+
+
+def test_fields_project_columns_and_nested_objects():
+    flatten = compile_flattener(Parameter, ["id", "revision_source"])
+    assert flatten.columns[0] == "id"
+    assert all(name.startswith("revision_source_") for name in flatten.columns[1:])
+    assert flatten([PARAMETER])["revision_source_title"] == ["Brief"]
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(ValueError):
+        compile_flattener(Source, ["titel"])
+
+
+def test_flatteners_are_compiled_once_per_schema():
+    assert compile_flattener(Asset) is compile_flattener(Asset)
+    assert "url" not in compile_flattener(Asset).columns
+    assert compile_flattener(Parameter, list_items=2).columns.count("parents_1_id") == 1
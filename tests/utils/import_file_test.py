@@ -0,0 +1,205 @@
+import importlib
+import time
+from pyddb import (
+    NewParameter,
+    get_asset_type_by_name,
+    get_parameter_type_by_name,
+    get_source_type_by_name,
+)
+from pyddb.ddb_query import MAX_QUERY_LENGTH, query_length
+from pyddb.utils.import_file import ImportColumns, chunk_snapshot, stream_import
+from tests.fakes import (
+    FakeResponse,
+    FakeSession,
+    asset_record,
+    page,
+    project_with,
+    source_record,
+)
+import pandas as pd
+import pytest
+
+SITE = get_asset_type_by_name("site")
+SOURCE_TYPE = get_source_type_by_name("Assumption")
+
+ROWS = [
+    ["Dalkeith Road", "Block A", "Area", "10", "m²", "Assumption", "Brief", "Rev A"],
+    ["Dalkeith Road", "Block A", "Not a parameter", "10", "", "", "", ""],
+    ["Dalkeith Road", "Block B", "Area", "20", "m²", "", "", ""],
+    ["Dalkeith Road", "Block B", "Area", "30", "m²", "Assumption", "Brief", "Rev A"],
+    ["Dalkeith Road", "", "Area", "", "", "", "", ""],
+]
+COLUMNS = [
+    "site",
+    "building",
+    "parameter_type",
+    "value",
+    "unit",
+    "source_type",
+    "source_title",
+    "source_reference",
+]
+
+
+class Writes(FakeSession):
+    async def respond(self, method, endpoint, params, json):
+        if method == "GET":
+            return FakeResponse(200, page(endpoint, []))
+        if endpoint == "sources":
+            return FakeResponse(
+                201,
+                {
+                    "source": source_record(
+                        "s1",
+                        json["title"],
+                        json["source_type_id"],
+                        json["reference"],
+                    )
+                },
+            )
+        if endpoint == "assets":
+            return FakeResponse(
+                201,
+                {
+                    "assets": [
+                        asset_record(a["asset_id"], a["name"], SITE, a.get("parent_id"))
+                        for a in json["assets"]
+                    ]
+                },
+            )
+        return FakeResponse(201, {"parameters": []})
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "parameters.csv"
+    pd.DataFrame(ROWS, columns=COLUMNS).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.asyncio
+async def test_file_is_imported_chunk_by_chunk(path):
+    session = Writes()
+    project = project_with(session)
+
+    progress = [
+        p
+        async for p in stream_import(
+            project,
+            path,
+            columns=ImportColumns(asset_types=["site", "building"]),
+            chunk_size=2,
+        )
+    ]
+
+    assert [p.rows_read for p in progress] == [2, 4, 5]
+    assert [[e.row for e in p.errors] for p in progress] == [[2], [3], []]
+    assert "Unknown parameter type" in progress[0].errors[0].message
+    final = progress[-1]
+    assert (final.rows_imported, final.rows_failed) == (3, 2)
+
+    posted_assets = [
+        a["name"]
+        for _, endpoint, _, body in session.posts
+        if endpoint == "assets"
+        for a in body["assets"]
+    ]
+    assert posted_assets == ["Dalkeith Road", "Block A", "Block B"]
+    assert [endpoint for _, endpoint, _, _ in session.posts].count("sources") == 1
+    assert final.assets_created == 3
+    assert final.parameters_created == 3
+
+
+@pytest.mark.asyncio
+async def test_parquet_files_are_read_in_batches(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / "parameters.parquet"
+    pd.DataFrame(ROWS, columns=COLUMNS).to_parquet(path)
+    project = project_with(Writes())
+
+    progress = [p async for p in stream_import(project, path, chunk_size=4)]
+
+    assert [p.rows_read for p in progress] == [4, 5]
+    assert progress[-1].rows_imported == 3
+
+
+@pytest.mark.asyncio
+async def test_parameters_are_not_kept_between_chunks(tmp_path):
+    path = tmp_path / "parameters.csv"
+    rows = [
+        [
+            "Dalkeith Road",
+            f"Block {n % 2}",
+            "Area",
+            str(n),
+            "m²",
+            "Assumption",
+            "Brief",
+            "Rev A",
+        ]
+        for n in range(6)
+    ]
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(path, index=False)
+    session = Writes()
+    project = project_with(session)
+
+    async for progress in stream_import(
+        project,
+        path,
+        columns=ImportColumns(asset_types=["site", "building"]),
+        chunk_size=2,
+    ):
+        assert not project.has_snapshot("parameters")
+        assert project._snapshot.parameters == []
+
+    assert progress.parameters_created == 6
+    parameter_gets = [
+        params for _, endpoint, params, _ in session.gets if endpoint == "parameters"
+    ]
+    # The first chunk only posts to new assets, so has nothing to match
+    assert len(parameter_gets) == 2
+    assert all(params["parameter_type_id"] for params in parameter_gets)
+
+
+@pytest.mark.asyncio
+async def test_stopping_waits_for_the_chunk_being_read(path, monkeypatch):
+    module = importlib.import_module("pyddb.utils.import_file")
+    read_chunks = module.read_chunks
+    closed = []
+
+    def slow_chunks(path, chunk_size):
+        try:
+            for n, chunk in enumerate(read_chunks(path, chunk_size)):
+                if n:
+                    time.sleep(0.1)
+                yield chunk
+        finally:
+            closed.append(True)
+
+    monkeypatch.setattr(module, "read_chunks", slow_chunks)
+    imports = stream_import(project_with(Writes()), path, chunk_size=2, buffer_chunks=1)
+    await imports.__anext__()
+    await imports.aclose()
+    assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_chunk_parameters_are_fetched_in_url_safe_queries():
+    area = get_parameter_type_by_name("Area")
+    parameters = [
+        NewParameter(parameter_type=area.copy(update={"id": f"{n:036}"}))
+        for n in range(300)
+    ]
+    session = Writes()
+
+    snapshot = await chunk_snapshot(project_with(session), parameters)
+
+    parameter_gets = [
+        params for _, endpoint, params, _ in session.gets if endpoint == "parameters"
+    ]
+    assert len(parameter_gets) > 1
+    assert all(query_length(params) <= MAX_QUERY_LENGTH for params in parameter_gets)
+    assert sorted(
+        id for params in parameter_gets for id in params["parameter_type_id"]
+    ) == [parameter.parameter_type.id for parameter in parameters]
+    assert snapshot.parameters == []
@@ -0,0 +1,52 @@
+from pyddb import Unit, SourceType
+from pyddb.utils.catalog_store import write_catalog
+from pyddb.utils.read_data import (
+    Catalog,
+    catalog,
+    get_source_type_by_name,
+    get_unit_by_id,
+    get_units_by_name,
+)
+import pytest
+
+units = [
+    Unit(id="u1", name="m"),
+    Unit(id="u2", name="mm"),
+    Unit(id="u3", name="m"),
+]
+
+
+@pytest.fixture
+def units_table(tmp_path):
+    path = tmp_path / "catalog.sqlite"
+    write_catalog(path, {"units": units}, environment="sandbox")
+    return Catalog(path).table("units")
+
+
+def test_type_table_indexes_by_id_and_name(units_table):
+    assert units_table.get_by_id("u2").name == "mm"
+    assert units_table.get_by_name("mm").id == "u2"
+
+
+def test_type_table_first_duplicate_name_wins(units_table):
+    assert units_table.get_by_name("m").id == "u1"
+
+
+def test_type_table_batch_lookups_keep_order_and_misses(units_table):
+    found = units_table.get_many_by_name(["mm", "km", "m"])
+    assert [u and u.id for u in found] == ["u2", None, "u1"]
+
+
+def test_type_table_records_round_trip(units_table):
+    assert units_table.records == units
+
+
+def test_catalog_returns_the_same_record_objects(units_table):
+    assert units_table.get_by_id("u1") is units_table.get_by_name("m")
+
+
+def test_packaged_catalog_lookups():
+    source_type = get_source_type_by_name("Assumption")
+    assert isinstance(source_type, SourceType)
+    [unit] = get_units_by_name([catalog.table("units").records[0].name])
+    assert get_unit_by_id(unit.id) == unit
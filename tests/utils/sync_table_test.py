@@ -0,0 +1,130 @@
+import importlib
+import sqlite3
+import time
+from pyddb import DDB, BaseURL, Unit, SourceType
+from pyddb.utils.catalog_store import CatalogStore, write_catalog
+from pyddb.utils.read_data import Catalog
+from pyddb.utils.regenerate_all_types import sync_all_types, sync_table
+from tests.fakes import FakeResponse, FakeSession, ddb_with, paged
+import pytest
+
+T0 = "2022-01-01T00:00:00.000Z"
+T1 = "2022-06-01T00:00:00.000Z"
+
+
+class CatalogSession(FakeSession):
+    """Lists the records of each table, as the API pages them."""
+
+    def __init__(self, **tables):
+        super().__init__()
+        self.tables = tables
+
+    async def respond(self, method, endpoint, params, json):
+        return FakeResponse(200, paged(endpoint, self.tables.get(endpoint, []), params))
+
+
+def unit(id, name, updated_at=T0, deleted_at=None):
+    return {"id": id, "name": name, "updated_at": updated_at, "deleted_at": deleted_at}
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = tmp_path / "catalog.sqlite"
+    units = [
+        Unit(**unit("u1", "m")),
+        Unit(**unit("u2", "mm")),
+        Unit(**unit("u3", "km")),
+    ]
+    source_types = [SourceType(id="s1", name="Assumption", visible=True)]
+    write_catalog(path, {"units": units, "source_types": source_types}, "sandbox")
+    return path
+
+
+@pytest.mark.asyncio
+async def test_only_changes_are_merged(path):
+    session = CatalogSession(
+        units=[
+            unit("u1", "m"),
+            unit("u2", "millimetre", updated_at=T1),
+            unit("u4", "cm"),
+            unit("u3", "km", deleted_at=T1),
+        ]
+    )
+    result = await sync_table(ddb_with(session), "units", path, page_limit=2)
+    assert (result.inserted, result.updated, result.deleted, result.unchanged) == (
+        1,
+        1,
+        1,
+        1,
+    )
+    assert len(session.gets) == 2
+    assert result.watermark == T1
+    table = Catalog(path).table("units")
+    assert [u.name for u in table.records] == ["m", "millimetre", "cm"]
+    assert CatalogStore(path).watermark("units") == T1
+
+
+@pytest.mark.asyncio
+async def test_records_no_longer_listed_are_kept(path):
+    session = CatalogSession(units=[unit("u1", "m")])
+    result = await sync_table(ddb_with(session), "units", path)
+    assert (result.deleted, result.missing, result.unchanged) == (0, 2, 1)
+    assert [u.id for u in Catalog(path).table("units").records] == ["u1", "u2", "u3"]
+
+
+@pytest.mark.asyncio
+async def test_tables_without_timestamps_are_compared_by_content(path):
+    session = CatalogSession(
+        source_types=[{"id": "s1", "name": "Assumption", "visible": False}]
+    )
+    result = await sync_table(ddb_with(session), "source_types", path)
+    assert (result.updated, result.unchanged) == (1, 0)
+    result = await sync_table(ddb_with(session), "source_types", path)
+    assert (result.updated, result.unchanged) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_tables_are_written_one_at_a_time(path, monkeypatch):
+    module = importlib.import_module("pyddb.utils.regenerate_all_types")
+    apply_changes = module.apply_changes
+    writing, overlaps = [], []
+
+    def apply_slowly(*args):
+        overlaps.append(bool(writing))
+        writing.append(args[1])
+        time.sleep(0.05)
+        try:
+            apply_changes(*args)
+        finally:
+            writing.remove(args[1])
+
+    monkeypatch.setattr(module, "apply_changes", apply_slowly)
+    session = CatalogSession(
+        units=[unit("u4", "cm")],
+        source_types=[{"id": "s2", "name": "Drawing", "visible": True}],
+    )
+    ddb = DDB(url=BaseURL.sandbox, session=session)
+    results = await sync_all_types(ddb, path)
+    assert overlaps == [False, False]
+    assert sum(result.inserted for result in results) == 2
+
+
+@pytest.mark.asyncio
+async def test_catalog_connections_are_closed(path, monkeypatch):
+    connections = []
+    connection = CatalogStore.connection
+
+    def tracked(self):
+        connections.append(connection(self))
+        return connections[-1]
+
+    monkeypatch.setattr(CatalogStore, "connection", tracked)
+    session = CatalogSession(
+        source_types=[{"id": "s1", "name": "Assumption", "visible": False}]
+    )
+    await sync_table(ddb_with(session), "source_types", path)
+
+    assert connections
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
@@ -0,0 +1,37 @@
+from pyddb import Unit
+from pyddb.utils.catalog_store import write_catalog
+from pyddb.utils.read_data import Catalog, read_legacy_data
+from pyddb.utils.write_data import write_data, write_tables
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_tables_are_written_to_the_given_path(tmp_path):
+    path = tmp_path / "cache" / "catalog.sqlite"
+    await write_tables({"units": [Unit(id="u1", name="m")]}, "sandbox", path)
+
+    assert Catalog(path).table("units").get_by_name("m").id == "u1"
+
+
+def test_catalog_can_switch_files(tmp_path):
+    first, second = tmp_path / "first.sqlite", tmp_path / "second.sqlite"
+    write_catalog(first, {"units": [Unit(id="u1", name="m")]}, "sandbox")
+    write_catalog(second, {"units": [Unit(id="u2", name="m")]}, "dev")
+    catalog = Catalog(first)
+    assert catalog.table("units").get_by_name("m").id == "u1"
+
+    catalog.use(second)
+
+    assert catalog.table("units").get_by_name("m").id == "u2"
+    assert catalog.environment == "dev"
+
+
+@pytest.mark.asyncio
+async def test_write_data_still_writes_legacy_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    units = [Unit(id="u1", name="m")]
+
+    with pytest.deprecated_call():
+        await write_data("units", units)
+
+    assert read_legacy_data(tmp_path / "data" / "units.dat") == units